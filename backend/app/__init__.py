@@ -6,8 +6,16 @@ from flask_jwt_extended import JWTManager
 from flask_mail import Mail
 from flask_cors import CORS
 from config import Config
+from app.utils.aws import aws_clients
+from app.utils.job_queue import job_manager
+from app.utils.dynamodb_writer import batch_writer
+from app.utils.translation_cache import translation_cache
+from app.utils.mockup import mockup_cache, source_image_cache
+from app.utils.sql_metrics import sql_metrics
+from app.utils.db_routing import RoutingSession, replica_router
+from app.utils.json_provider import make_json_provider
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # 読み取り専用のリクエストはレプリカへ
 migrate = Migrate()
 jwt = JWTManager()
 mail = Mail()  # 追加
@@ -16,6 +24,9 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # JSONレスポンスのシリアライズ（orjson が無ければ Flask の既定）
+    app.json = make_json_provider(app)
+
     print("=== Application Configuration ===")
     print(f"MAILGUN_API_KEY: {'*' * 8 if app.config.get('MAILGUN_API_KEY') else 'Not Set'}")
     print(f"MAILGUN_DOMAIN: {app.config.get('MAILGUN_DOMAIN') or 'Not Set'}")
@@ -24,12 +35,30 @@ def create_app(config_class=Config):
     
     # Initialize extensions
     db.init_app(app)
+    replica_router.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     CORS(app)
 
     # メール設定の初期化
     mail.init_app(app)
+
+    # AWSクライアントの共有設定
+    aws_clients.init_app(app)
+    batch_writer.init_app(app)
+
+    # バックグラウンドジョブの初期化
+    job_manager.init_app(app)
+    translation_cache.init_app(app)
+    mockup_cache.max_bytes = app.config['MOCKUP_CACHE_MAX_BYTES']
+    source_image_cache.max_bytes = app.config['MOCKUP_SOURCE_CACHE_MAX_BYTES']
+
+    # SQLの計測（Server-Timing ヘッダー / N+1の検出）
+    sql_metrics.init_app(app)
+
+    # 注文テーブルの先の月のパーティション（PostgreSQLでパーティション化している場合）
+    from app.models.partitions import ensure_future_partitions
+    ensure_future_partitions(app)
     
     # Register blueprints
     from app.api.auth import bp as auth_bp
@@ -3,9 +3,21 @@ from flask import jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt
 from app.models.order import Order, OrderItem
 from app.models.user import User
+from app.models.design import DesignContent
+from app.models.stats import GRANULARITIES, record_status_change, timeseries, totals as rollup_totals
 from app import db
+from app.utils.translation_cache import translation_cache
+from app.utils.mockup import mockup_cache
+from app.utils.sql_metrics import sql_metrics
+from app.utils.db_routing import read_only
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from app.models.queries import item_counts
+from app.models.serializers import serialize_order, serialize_orders
+from app.utils.search import user_search_filter, order_search_filter, exact_order_id
+from app.utils.pagination import keyset_paginate, pagination_args, count_rows, PaginationError
 from functools import wraps
+from datetime import date, datetime, timedelta
 from app.api.admin import bp
 
 def admin_required():
@@ -20,24 +32,68 @@ def admin_required():
         return decorator
     return wrapper
 
+def _user_order_stats(user_ids=None):
+    """ユーザーごとの注文数・累計購入額・最終注文日（1つのGROUP BYサブクエリ）"""
+    stats = db.session.query(
+        Order.user_id.label('user_id'),
+        func.count(Order.id).label('orders_count'),
+        func.sum(Order.total_amount).label('total_spent'),
+        func.max(Order.created_at).label('last_order_at')
+    )
+    if user_ids is not None:
+        stats = stats.filter(Order.user_id.in_(user_ids))
+    return stats.group_by(Order.user_id).subquery()
+
+USER_SORTS = ('orders_count', 'spend', 'created_at')
+
 @bp.route('/users', methods=['GET'])
 @admin_required()
+@read_only
 def get_users():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        cursor, limit, total_mode = pagination_args(default_limit=10, default_total='estimate')
         search = request.args.get('search', '')
+        sort = request.args.get('sort')
+        direction = request.args.get('order', 'desc')
+
+        if sort is not None and sort not in USER_SORTS:
+            return jsonify({'error': f'sort must be one of {", ".join(USER_SORTS)}'}), 400
+        if direction not in ('asc', 'desc'):
+            return jsonify({'error': 'order must be asc or desc'}), 400
 
         query = User.query
         if search:
-            query = query.filter(
-                db.or_(
-                    User.username.ilike(f'%{search}%'),
-                    User.email.ilike(f'%{search}%')
-                )
-            )
+            query = query.filter(user_search_filter(search))
+
+        total = count_rows(query, total_mode)
+        descending = bool(sort) and direction == 'desc'
 
-        users = query.paginate(page=page, per_page=per_page, error_out=False)
+        if sort in ('orders_count', 'spend'):
+            # 集計値での並び替えはDB側で行う（全ユーザー分の集計が必要）
+            stats = _user_order_stats()
+            orders_count = func.coalesce(stats.c.orders_count, 0).label('orders_count')
+            total_spent = func.coalesce(stats.c.total_spent, 0).label('total_spent')
+            sort_column = orders_count if sort == 'orders_count' else total_spent
+            page = keyset_paginate(
+                query.outerjoin(stats, stats.c.user_id == User.id).add_columns(
+                    orders_count, total_spent, stats.c.last_order_at
+                ),
+                (sort_column, User.id), cursor=cursor, limit=limit, descending=descending,
+                key_of=lambda row: [getattr(row, sort_column.key), row[0].id]
+            )
+            rows = page.items
+        else:
+            # 表示するページのユーザー分だけ集計する（注文テーブルの件数に依存しない）
+            keys = (User.created_at, User.id) if sort == 'created_at' else (User.id,)
+            page = keyset_paginate(query, keys, cursor=cursor, limit=limit, descending=descending)
+            user_ids = [user.id for user in page.items]
+            stats = {}
+            if user_ids:
+                stats = {row.user_id: row for row in db.session.query(_user_order_stats(user_ids)).all()}
+            rows = []
+            for user in page.items:
+                row = stats.get(user.id)
+                rows.append((user, row.orders_count, row.total_spent, row.last_order_at) if row else (user, 0, 0, None))
 
         return jsonify({
             'users': [{
@@ -46,43 +102,65 @@ def get_users():
                 'email': user.email,
                 'is_admin': user.is_admin,
                 'is_active': True,
-                'orders_count': user.orders.count(),
+                'orders_count': orders_count,
+                'total_spent': float(total_spent),
+                'last_order_at': last_order_at.isoformat() if last_order_at else None,
                 'created_at': user.created_at.isoformat() if user.created_at else None
-            } for user in users.items],
-            'total': users.total,
-            'pages': users.pages,
-            'current_page': page
+            } for user, orders_count, total_spent, last_order_at in rows],
+            'next_cursor': page.next_cursor,
+            'has_more': page.has_more,
+            'total': total
         }), 200
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         import traceback
         print("Error in get_users:", str(e))
         print("Traceback:", traceback.format_exc())
         return jsonify({"error": str(e)}), 500
 
+def _created_at_range(query, start, end):
+    """
+    注文日（from / to、両端を含む）での絞り込み
+    created_at の範囲条件のため、パーティション化している場合は対象の月のパーティションだけを読む
+    """
+    if start is not None:
+        query = query.filter(Order.created_at >= datetime.combine(start, datetime.min.time()))
+    if end is not None:
+        query = query.filter(Order.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    return query
+
 @bp.route('/orders/search', methods=['GET'])
 @admin_required()
+@read_only
 def search_orders():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        cursor, limit, total_mode = pagination_args(default_limit=10, default_total='estimate')
         status = request.args.get('status')
         query = request.args.get('query')
+        try:
+            start = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+            end = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+        except ValueError:
+            return jsonify({'error': 'from and to must be YYYY-MM-DD'}), 400
 
-        order_query = Order.query
+        order_query = _created_at_range(Order.query, start, end)
         if status:
             order_query = order_query.filter_by(status=status)
         if query:
-            order_query = order_query.join(User).filter(
-                db.or_(
-                    Order.id.like(f'%{query}%'),
-                    User.email.like(f'%{query}%')
-                )
-            )
+            # '#123' 形式は注文IDの完全一致として主キーで直接取得する
+            order_id = exact_order_id(query)
+            if order_id is not None:
+                order_query = order_query.filter(Order.id == order_id)
+            else:
+                order_query = order_query.filter(order_search_filter(query))
 
-        orders = order_query.order_by(Order.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        page = keyset_paginate(
+            order_query.options(joinedload(Order.customer)),
+            (Order.created_at, Order.id), cursor=cursor, limit=limit, total=total_mode
         )
+        counts = item_counts(page.items)
 
         return jsonify({
             'orders': [{
@@ -94,13 +172,13 @@ def search_orders():
                 'total_amount': float(order.total_amount),
                 'status': order.status,
                 'created_at': order.created_at.isoformat(),
-                'items_count': order.order_items.count()  # order_itemsを使用
-            } for order in orders.items],
-            'total': orders.total,
-            'pages': orders.pages,
-            'current_page': page
+                'items_count': counts.get(order.id, 0)
+            } for order in page.items],
+            **page.meta()
         }), 200
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         import traceback
         print("Error in search_orders:", str(e))
@@ -116,51 +194,116 @@ def update_order_status(order_id):
             return jsonify({'error': 'Status is required'}), 400
 
         order = Order.query.get_or_404(order_id)
+        old_status = order.status
         order.status = data['status']
         order.updated_at = datetime.utcnow()
-        
+        # 売上集計も同じトランザクションで更新
+        record_status_change(order, old_status)
+
         db.session.commit()
 
         return jsonify({
             'message': 'Order status updated',
-            'order': order.to_dict()
+            'order': serialize_order(order)
         }), 200
 
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+RECENT_ORDERS_DAYS = 90
+
 @bp.route('/stats', methods=['GET'])
 @admin_required()
+@read_only
 def get_stats():
     try:
-        # 売上統計
-        total_sales = db.session.query(func.sum(Order.total_amount)).scalar() or 0
-        total_orders = Order.query.count()
+        # 売上統計（集計テーブルから取得）
+        sales = rollup_totals()
         total_users = User.query.count()
 
-        # 直近の注文
-        recent_orders = Order.query.order_by(
-            Order.created_at.desc()
-        ).limit(5).all()
-
-        # ステータス別の注文数
-        status_counts = db.session.query(
-            Order.status, func.count(Order.id)
-        ).group_by(Order.status).all()
+        # 直近の注文（期間を絞って新しい月のパーティションだけを読む）
+        recent_orders = Order.query.filter(
+            Order.created_at >= datetime.utcnow() - timedelta(days=RECENT_ORDERS_DAYS)
+        ).order_by(Order.created_at.desc(), Order.id.desc()).limit(5).all()
 
         return jsonify({
-            'total_sales': float(total_sales),
-            'total_orders': total_orders,
+            'total_sales': sales['total_sales'],
+            'total_orders': sales['total_orders'],
             'total_users': total_users,
-            'status_counts': dict(status_counts),
-            'recent_orders': [order.to_dict() for order in recent_orders]
+            'status_counts': sales['status_counts'],
+            'recent_orders': serialize_orders(recent_orders)
         }), 200
         
     except Exception as e:
         print("Error in get_stats:", str(e))
         return jsonify({"error": str(e)}), 500
 
+TIMESERIES_MAX_DAYS = 366 * 3
+
+@bp.route('/stats/timeseries', methods=['GET'])
+@admin_required()
+@read_only
+def get_stats_timeseries():
+    try:
+        granularity = request.args.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            return jsonify({'error': f'granularity must be one of {", ".join(GRANULARITIES)}'}), 400
+
+        try:
+            end = date.fromisoformat(request.args['to']) if request.args.get('to') else datetime.utcnow().date()
+            start = date.fromisoformat(request.args['from']) if request.args.get('from') else end - timedelta(days=29)
+        except ValueError:
+            return jsonify({'error': 'from and to must be YYYY-MM-DD'}), 400
+        if start > end:
+            return jsonify({'error': 'from must be before to'}), 400
+        if (end - start).days > TIMESERIES_MAX_DAYS:
+            return jsonify({'error': f'Range must be at most {TIMESERIES_MAX_DAYS} days'}), 400
+
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'granularity': granularity,
+            'series': timeseries(start, end, granularity)
+        }), 200
+
+    except Exception as e:
+        print("Error in get_stats_timeseries:", str(e))
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/cache-stats', methods=['GET'])
+@admin_required()
+@read_only
+def get_cache_stats():
+    try:
+        # 生成画像の再利用率（登録数 = ミス数、hit_countの合計 = ヒット数）
+        entries, hits = db.session.query(
+            func.count(DesignContent.id),
+            func.coalesce(func.sum(DesignContent.hit_count), 0)
+        ).one()
+        lookups = entries + hits
+
+        return jsonify({
+            'translation': translation_cache.stats(),
+            'mockup': mockup_cache.stats(),
+            'design_dedup': {
+                'entries': entries,
+                'hits': int(hits),
+                'hit_rate': hits / lookups if lookups else 0.0
+            }
+        }), 200
+
+    except Exception as e:
+        print("Error in get_cache_stats:", str(e))
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/sql-metrics', methods=['GET'])
+@admin_required()
+def get_sql_metrics():
+    if not sql_metrics.enabled:
+        return jsonify({'enabled': False, 'endpoints': {}}), 200
+    return jsonify({'enabled': True, 'endpoints': sql_metrics.snapshot()}), 200
+
 @bp.route('/users/manage', methods=['POST'])
 @admin_required()
 def manage_user():
@@ -195,12 +338,13 @@ def manage_user():
         
 @bp.route('/orders/<int:order_id>', methods=['GET'])
 @admin_required()
+@read_only
 def get_order_details(order_id):
     try:
-        order = Order.query.get_or_404(order_id)
-        
-        # Orderモデルのto_dict()メソッドを使用して詳細情報を取得
-        order_data = order.to_dict()
+        order = Order.query.options(joinedload(Order.customer)).filter_by(id=order_id).first_or_404()
+
+        # アイテム・デザインは一括で取得してdictに変換
+        order_data = serialize_order(order)
         
         # ユーザー情報を追加
         order_data['user'] = {
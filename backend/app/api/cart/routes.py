@@ -4,28 +4,23 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.order import CartItem
 from app.models.design import Design
+from app.models.queries import cart_item_for_user
+from app.models.serializers import serialize_cart_items
+from app.models.versions import cart_version
+from app.models.pricing import unit_price
+from app.utils.conditional import conditional
 from app.api.cart import bp
 
 @bp.route('/items', methods=['GET'])
 @jwt_required()
+@conditional(lambda: cart_version(get_jwt_identity()))
 def get_cart():
     try:
         current_user_id = get_jwt_identity()
-        cart_items = CartItem.query.filter_by(user_id=current_user_id).all()
+        cart_items = serialize_cart_items(current_user_id)
 
         return jsonify({
-            'cart_items': [{
-                'id': item.id,
-                'design': {
-                    'id': item.design.id,
-                    'image_url': item.design.image_url,
-                    'prompt': item.design.prompt
-                },
-                'quantity': item.quantity,
-                'size': item.size,
-                'color': item.color,
-                'design_config': item.design_config
-            } for item in cart_items]
+            'cart_items': cart_items
         }), 200
 
     except Exception as e:
@@ -33,26 +28,15 @@ def get_cart():
 
 @bp.route('/items/<int:item_id>', methods=['GET'])
 @jwt_required()
+@conditional(lambda item_id: cart_version(get_jwt_identity(), item_id=item_id))
 def get_cart_item(item_id):
     try:
         current_user_id = get_jwt_identity()
-        cart_item = CartItem.query.filter_by(
-            id=item_id,
-            user_id=current_user_id
-        ).first_or_404()
+        cart_items = serialize_cart_items(current_user_id, item_id=item_id)
+        if not cart_items:
+            return jsonify({'error': 'Cart item not found'}), 404
 
-        return jsonify({
-            'id': cart_item.id,
-            'design': {
-                'id': cart_item.design.id,
-                'image_url': cart_item.design.image_url,
-                'prompt': cart_item.design.prompt
-            },
-            'quantity': cart_item.quantity,
-            'size': cart_item.size,
-            'color': cart_item.color,
-            'design_config': cart_item.design_config
-        }), 200
+        return jsonify(cart_items[0]), 200
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -70,6 +54,11 @@ def add_to_cart():
         current_user_id = get_jwt_identity()
         design = Design.query.get_or_404(data['design_id'])
 
+        # 価格表にないサイズ・カラーはカートに入れられない
+        price = unit_price(data['size'], data['color'])
+        if price is None:
+            return jsonify({'error': 'Size or color is not available'}), 400
+
         cart_item = CartItem(
             user_id=current_user_id,
             design_id=design.id,
@@ -90,7 +79,8 @@ def add_to_cart():
                 'quantity': cart_item.quantity,
                 'size': cart_item.size,
                 'color': cart_item.color,
-                'design_config': cart_item.design_config
+                'design_config': cart_item.design_config,
+                'unit_price': price
             }
         }), 201
 
@@ -129,10 +119,7 @@ def update_cart_item(item_id):
             return jsonify({'error': 'No data provided'}), 400
 
         current_user_id = get_jwt_identity()
-        cart_item = CartItem.query.filter_by(
-            id=item_id, 
-            user_id=current_user_id
-        ).first_or_404()
+        cart_item = cart_item_for_user(item_id, current_user_id)
 
         # 更新可能なフィールド
         if 'quantity' in data:
@@ -143,10 +130,14 @@ def update_cart_item(item_id):
             cart_item.color = data['color']
         if 'design_config' in data:
             cart_item.design_config = data['design_config']
+        if unit_price(cart_item.size, cart_item.color) is None:
+            db.session.rollback()
+            return jsonify({'error': 'Size or color is not available'}), 400
 
         db.session.commit()
 
-        # 更新されたアイテムの情報を返す
+        # 更新されたアイテムの情報を返す（コミットで失効した属性をデザインごと1クエリで再取得）
+        cart_item = cart_item_for_user(item_id, current_user_id)
         return jsonify({
             'message': 'Cart item updated',
             'cart_item': {
@@ -154,6 +145,7 @@ def update_cart_item(item_id):
                 'design': {
                     'id': cart_item.design.id,
                     'image_url': cart_item.design.image_url,
+                    'srcset': cart_item.design.srcset(),
                     'prompt': cart_item.design.prompt
                 },
                 'quantity': cart_item.quantity,
@@ -1,25 +1,36 @@
 # app/api/designs/routes.py
-from flask import jsonify, request
+from flask import jsonify, request, current_app, send_file
 import requests
-import os
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import uuid
-import openai
+import json
+from io import BytesIO
 from app import db
-from app.models.design import Design
+from app.models.design import Design, DesignContent
 from app.utils.dynamodb import DynamoDBClient
-from app.utils.stable_diffusion import StableDiffusionClient
+from app.utils.stable_diffusion import StableDiffusionClient, content_key
+from app.utils.openai_client import OpenAIClient
 from app.utils.s3 import S3Client
+from app.utils.renditions import render_and_upload
+from app.utils.mockup import render_mockup, mockup_cache_key, mockup_cache, source_image_cache
+from app.utils.job_queue import job_manager, JobQueueFull
+from app.utils.translation_cache import translation_cache
+from app.utils.pagination import keyset_paginate, pagination_args, PaginationError
+from app.utils.db_routing import read_only, replica_router
+from app.utils.conditional import conditional
+from app.models.versions import designs_version, design_version
 from app.api.designs import bp
 from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def translate_text(text):
-    try:
-        openai.api_key = os.getenv('OPEN_API_KEY')
-        system_prompt = """
+# システムプロンプトを変更した場合はバージョンを上げて翻訳キャッシュを無効化する
+SYSTEM_PROMPT_VERSION = '1'
+SYSTEM_PROMPT = """
                 あなたはプロのプロンプトエンジニアです。あなたはもともとデザイナーとして活躍していました。
                 漫画風、アニメ、イラスト、写実風などあらゆる分野に精通しており、数々の賞を受賞してきました。
                 以下の要件に従って、入力された日本語プロンプトを適切な英語のプロンプトに変換してください：
@@ -30,115 +41,361 @@ def translate_text(text):
                 出力形式：変換後の英語プロンプトのみを出力してください。説明は不要です。
                 """
 
-        completion = openai.chat.completions.create(
+def translate_text(text):
+    cached = translation_cache.get(text, SYSTEM_PROMPT_VERSION)
+    if cached is not None:
+        print(f"Translation cache hit: {cached}")  # デバッグ用ログ
+        return cached
+
+    try:
+        translated_text = OpenAIClient().chat_completion(
             model="gpt-4o",
             messages=[
-                {"role": "developer", "content": system_prompt},
+                {"role": "developer", "content": SYSTEM_PROMPT},
                 {
                     "role": "user",
                     "content": text
                 }
             ]
         )
-    
-
-        translated_text = completion.choices[0].message.content
         print(f"OpenAI translation response: {translated_text}")  # デバッグ用ログ
+        if translated_text:
+            translation_cache.set(text, SYSTEM_PROMPT_VERSION, translated_text)
         return translated_text
 
     except Exception as e:
         print(f"Translation error: {str(e)}")  # デバッグ用ログ
         return None  # エラー時はNoneを返す
 
-@bp.route('/generate', methods=['POST'])
-@jwt_required()
-def generate_design():
-    try:
-        # リクエストデータの取得と検証
-        data = request.get_json()
-        if not data or not data.get('prompt'):
-            return jsonify({'error': 'Prompt is required'}), 400
+def find_design_content(key):
+    """コンテンツキーで生成済み画像を検索し、ヒット数を記録（ヒットしなければNone）"""
+    content = DesignContent.query.filter_by(content_key=key).first()
+    if content is None:
+        return None
 
-        print(f"翻訳前: {data['prompt']}")
-        # 使用例
-        text_to_translate = data['prompt']
+    image_url, s3_key = content.image_url, content.s3_key
+    DesignContent.query.filter_by(id=content.id).update({
+        DesignContent.hit_count: DesignContent.hit_count + 1,
+        DesignContent.last_hit_at: datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    return image_url, s3_key
 
-        translated_text = translate_text(text_to_translate)
-        print(f"翻訳結果: {translated_text}")
-        print(type(data['prompt']))
+def register_design_content(key, prompt, params, image_url, s3_key):
+    """生成した画像をコンテンツキーのインデックスに登録"""
+    try:
+        db.session.add(DesignContent(
+            content_key=key,
+            prompt=prompt,
+            params=params,
+            image_url=image_url,
+            s3_key=s3_key,
+            hit_count=0
+        ))
+        db.session.commit()
+    except IntegrityError:
+        # 同じキーが並行して登録された場合は先に登録された方を残す
+        db.session.rollback()
 
-        current_user_id = get_jwt_identity()
-        request_id = str(uuid.uuid4())
+def _enqueue_renditions(design_ids):
+    """派生画像（WebPサムネイル）の生成ジョブを登録（失敗してもデザイン生成は成功扱い）"""
+    for design_id in design_ids:
+        try:
+            job_manager.submit('design.renditions', f'renditions-{design_id}', {'design_id': design_id})
+        except Exception as e:
+            # 派生画像はベストエフォート。キュー溢れ・ジョブID重複などは
+            # 呼び出し元のジョブを失敗させず、scripts/backfill_renditions.py で後から生成する
+            print(f"Renditions job skipped for design {design_id}: {e}")
 
-        # DynamoDBに生成リクエストを保存
-        dynamodb_client = DynamoDBClient()
-        dynamodb_client.store_design_request(
-            request_id=request_id,
-            user_id=str(current_user_id),
-            prompt=data['prompt']
+@job_manager.task('design.renditions')
+def process_renditions_job(job_id, payload):
+    """派生画像をS3に保存し、Design.renditionsに記録（ワーカースレッドで実行）"""
+    design = db.session.get(Design, payload['design_id'])
+    if design is None or design.renditions:
+        return
+
+    # 同じ画像を共有するデザイン（dedupで再利用）に生成済みの派生画像があればそれを使う
+    shared = Design.query.filter(
+        Design.s3_key == design.s3_key,
+        Design.renditions.isnot(None)
+    ).first()
+    if shared is not None:
+        design.renditions = shared.renditions
+    else:
+        design.renditions = render_and_upload(
+            S3Client(), design.s3_key, current_app.config['DESIGN_RENDITION_WIDTHS']
         )
+    db.session.commit()
+
+@job_manager.task('design.generate')
+def process_design_job(request_id, payload):
+    """
+    デザイン生成パイプライン（ワーカースレッドで実行）
+    翻訳 → Stable Diffusion → S3アップロード → RDS保存
+    """
+    user_id = payload['user_id']
+    dynamodb_client = DynamoDBClient()
+    dynamodb_client.update_design_request_status(request_id, str(user_id), 'running')
+
+    try:
+        translated_text = translate_text(payload['prompt'])
+        print(f"翻訳結果: {translated_text}")
+        if not translated_text:
+            raise Exception('Translation failed')
 
-        # Stable Diffusionで画像生成
         sd_client = StableDiffusionClient()
-        image_data = sd_client.generate_image(translated_text)
-        
-        # S3に画像をアップロード
-        s3_client = S3Client()
-        s3_key = f'designs/{current_user_id}/{request_id}.png'
-        image_url = s3_client.upload_design(image_data, s3_key)
+        params = sd_client.generation_params(seed=payload.get('seed', 0))
+
+        # 同じプロンプト・パラメータで生成済みの画像があれば再利用する（seed指定時のみ）
+        key = content_key(translated_text, params) if payload.get('dedup') else None
+        content = find_design_content(key) if key is not None else None
+
+        if content is not None:
+            image_url, s3_key = content
+        else:
+            # Stable Diffusionで画像生成
+            image_data = sd_client.generate_image(translated_text, seed=params['seed'])
+
+            # S3に画像をアップロード
+            s3_client = S3Client()
+            s3_key = f'designs/{user_id}/{request_id}.png'
+            image_url = s3_client.upload_design(image_data, s3_key)
+
+            if key is not None:
+                register_design_content(key, translated_text, params, image_url, s3_key)
 
         # デザイン情報をRDSに保存
         design = Design(
-            user_id=current_user_id,
-            prompt=data['prompt'],
+            user_id=user_id,
+            prompt=payload['prompt'],
             image_url=image_url,
             s3_key=s3_key,
-            position_x=data.get('position_x', 0),
-            position_y=data.get('position_y', 0),
-            scale=data.get('scale', 1.0)
+            position_x=payload.get('position_x', 0),
+            position_y=payload.get('position_y', 0),
+            scale=payload.get('scale', 1.0)
         )
-        
+
         db.session.add(design)
         db.session.commit()
+        # 生成直後の一覧はプライマリから読む
+        replica_router.mark_write(user_id)
 
         # 生成されたデザインをキャッシュ
         dynamodb_client.cache_design(str(design.id), image_url)
+        _enqueue_renditions([design.id])
 
-        return jsonify({
-            'message': 'Design generated successfully',
-            'design': {
-                'id': design.id,
-                'image_url': design.image_url,
-                'prompt': design.prompt,
-                'created_at': design.created_at.isoformat()
-            }
-        }), 201
+        dynamodb_client.update_design_request_status(
+            request_id, str(user_id), 'done', design_id=design.id
+        )
 
     except Exception as e:
         db.session.rollback()
+        dynamodb_client.update_design_request_status(
+            request_id, str(user_id), 'failed', error=str(e)
+        )
+        raise
+
+@job_manager.task('design.generate_batch')
+def process_design_batch_job(request_id, payload):
+    """
+    バリエーション一括生成（ワーカースレッドで実行）
+    1回のAPI呼び出しでN枚生成し、S3へは並列アップロード、RDSへは一括INSERT
+    """
+    user_id = payload['user_id']
+    dynamodb_client = DynamoDBClient()
+    dynamodb_client.update_design_request_status(request_id, str(user_id), 'running')
+
+    try:
+        translated_text = translate_text(payload['prompt'])
+        print(f"翻訳結果: {translated_text}")
+        if not translated_text:
+            raise Exception('Translation failed')
+
+        sd_client = StableDiffusionClient()
+        images = sd_client.generate_images(
+            translated_text, samples=payload['count'], seed=payload.get('seed', 0)
+        )
+
+        # S3への並列アップロード（boto3のクライアントはスレッドセーフ）
+        s3_client = S3Client()
+        s3_keys = [f'designs/{user_id}/{request_id}_{index}.png' for index in range(len(images))]
+        max_workers = min(len(images), current_app.config.get('DESIGN_UPLOAD_WORKERS', 4))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            image_urls = list(executor.map(s3_client.upload_design, images, s3_keys))
+
+        # 全バリエーションを1つのINSERT文で保存
+        designs = db.session.scalars(
+            insert(Design).returning(Design, sort_by_parameter_order=True),
+            [{
+                'user_id': user_id,
+                'prompt': payload['prompt'],
+                'image_url': image_url,
+                's3_key': s3_key,
+                'position_x': payload.get('position_x', 0),
+                'position_y': payload.get('position_y', 0),
+                'scale': payload.get('scale', 1.0),
+                'created_at': datetime.utcnow()
+            } for image_url, s3_key in zip(image_urls, s3_keys)]
+        ).all()
+        design_ids = [design.id for design in designs]
+        db.session.commit()
+        replica_router.mark_write(user_id)
+
+        for design_id, image_url in zip(design_ids, image_urls):
+            dynamodb_client.cache_design(str(design_id), image_url)
+        _enqueue_renditions(design_ids)
+
+        dynamodb_client.update_design_request_status(
+            request_id, str(user_id), 'done', design_ids=design_ids
+        )
+
+    except Exception as e:
+        db.session.rollback()
+        dynamodb_client.update_design_request_status(
+            request_id, str(user_id), 'failed', error=str(e)
+        )
+        raise
+
+def _design_summary(design):
+    return {
+        'id': design.id,
+        'image_url': design.image_url,
+        'srcset': design.srcset(),
+        'prompt': design.prompt,
+        'created_at': design.created_at.isoformat()
+    }
+
+def _enqueue_design_job(name, data, **extra):
+    """生成リクエストを保存してジョブを登録（レスポンスを返す）"""
+    current_user_id = get_jwt_identity()
+    request_id = str(uuid.uuid4())
+
+    # DynamoDBに生成リクエストを保存（status: pending、失敗した場合は202を返さずエラーにする）
+    dynamodb_client = DynamoDBClient()
+    dynamodb_client.store_design_request(
+        request_id=request_id,
+        user_id=str(current_user_id),
+        prompt=data['prompt']
+    )
+
+    # 生成処理はワーカーに任せて即座にレスポンスを返す
+    try:
+        job_manager.submit(name, request_id, {
+            'user_id': current_user_id,
+            'prompt': data['prompt'],
+            'position_x': data.get('position_x', 0),
+            'position_y': data.get('position_y', 0),
+            'scale': data.get('scale', 1.0),
+            'seed': data.get('seed', 0),
+            **extra
+        })
+    except JobQueueFull:
+        dynamodb_client.update_design_request_status(
+            request_id, str(current_user_id), 'failed', error='Job queue is full'
+        )
+        return jsonify({'error': 'Too many pending requests. Please try again later.'}), 503
+
+    return jsonify({
+        'message': 'Design generation started',
+        'request_id': request_id,
+        'status': 'pending'
+    }), 202
+
+@bp.route('/generate', methods=['POST'])
+@jwt_required()
+def generate_design():
+    try:
+        # リクエストデータの取得と検証
+        data = request.get_json()
+        if not data or not data.get('prompt'):
+            return jsonify({'error': 'Prompt is required'}), 400
+
+        return _enqueue_design_job(
+            'design.generate', data,
+            dedup=data.get('dedup', current_app.config.get('DESIGN_DEDUP_ENABLED', False))
+        )
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/generate-batch', methods=['POST'])
+@jwt_required()
+def generate_design_batch():
+    try:
+        # リクエストデータの取得と検証
+        data = request.get_json()
+        if not data or not data.get('prompt'):
+            return jsonify({'error': 'Prompt is required'}), 400
+
+        count = data.get('count', 4)
+        max_count = current_app.config.get('DESIGN_BATCH_MAX_SAMPLES', 4)
+        # bool は int のサブクラスなので type で判定する（true が 1 と扱われないように）
+        if type(count) is not int or not 1 <= count <= max_count:
+            return jsonify({'error': f'count must be between 1 and {max_count}'}), 400
+
+        return _enqueue_design_job('design.generate_batch', data, count=count)
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/requests/<request_id>', methods=['GET'])
+@jwt_required()
+def get_design_request(request_id):
+    try:
+        current_user_id = get_jwt_identity()
+
+        # DesignRequestsのキーにuser_idが含まれるため、他ユーザーのリクエストは取得できない
+        dynamodb_client = DynamoDBClient()
+        item = dynamodb_client.get_design_request(request_id, str(current_user_id))
+        if not item:
+            return jsonify({'error': 'Request not found'}), 404
+
+        response = {
+            'request_id': request_id,
+            'status': item.get('status')
+        }
+        if item.get('status') == 'failed':
+            response['error'] = item.get('error')
+        if item.get('status') == 'done' and item.get('design_id') is not None:
+            design = db.session.get(Design, int(item['design_id']))
+            response['design'] = _design_summary(design) if design else None
+        if item.get('status') == 'done' and item.get('design_ids'):
+            design_ids = [int(design_id) for design_id in item['design_ids']]
+            designs = Design.query.filter(Design.id.in_(design_ids)).order_by(Design.id).all()
+            response['designs'] = [_design_summary(design) for design in designs]
+
+        return jsonify(response), 200
+
+    except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/designs', methods=['GET'])
 @jwt_required()
+@read_only
+@conditional(lambda: designs_version(get_jwt_identity()))
 def get_user_designs():
     try:
         current_user_id = get_jwt_identity()
-        designs = Design.query.filter_by(user_id=current_user_id).order_by(Design.created_at.desc()).all()
-        
+        cursor, limit, total = pagination_args()
+        page = keyset_paginate(
+            Design.query.filter_by(user_id=current_user_id),
+            (Design.created_at, Design.id), cursor=cursor, limit=limit, total=total
+        )
+
         return jsonify({
-            'designs': [{
-                'id': design.id,
-                'image_url': design.image_url,
-                'prompt': design.prompt,
-                'created_at': design.created_at.isoformat()
-            } for design in designs]
+            'designs': [_design_summary(design) for design in page.items],
+            **page.meta()
         }), 200
 
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/designs/<int:design_id>', methods=['GET'])
 @jwt_required()
+@read_only
+@conditional(lambda design_id: design_version(design_id, get_jwt_identity()))
 def get_design(design_id):
     try:
         current_user_id = get_jwt_identity()
@@ -151,6 +408,7 @@ def get_design(design_id):
         return jsonify({
             'id': design.id,
             'image_url': design.image_url,
+            'srcset': design.srcset(),
             'prompt': design.prompt,
             'position_x': design.position_x,
             'position_y': design.position_y,
@@ -160,3 +418,41 @@ def get_design(design_id):
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@bp.route('/<int:design_id>/mockup', methods=['GET'])
+@jwt_required()
+def get_design_mockup(design_id):
+    try:
+        current_user_id = get_jwt_identity()
+        design = Design.query.get_or_404(design_id)
+
+        # 所有者チェック
+        if design.user_id != current_user_id:
+            return jsonify({'error': 'Unauthorized access'}), 403
+
+        color = request.args.get('color', 'white')
+        size = request.args.get('size', current_app.config['MOCKUP_DEFAULT_SIZE'], type=int)
+        if not 64 <= size <= current_app.config['MOCKUP_MAX_SIZE']:
+            return jsonify({'error': 'Invalid size'}), 400
+        try:
+            config = json.loads(request.args['config']) if request.args.get('config') else None
+            key = mockup_cache_key(design.id, design.s3_key, color, config, size)
+        except (ValueError, TypeError, AttributeError) as e:
+            return jsonify({'error': f'Invalid mockup parameters: {str(e)}'}), 400
+
+        image = mockup_cache.get(key)
+        if image is None:
+            source = source_image_cache.get(design.s3_key)
+            if source is None:
+                source = S3Client().download_design(design.s3_key)
+                source_image_cache.set(design.s3_key, source)
+            image = render_mockup(source, color, config, size)
+            mockup_cache.set(key, image)
+
+        response = send_file(BytesIO(image), mimetype='image/png')
+        response.headers['Cache-Control'] = 'private, max-age=86400'
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
\ No newline at end of file
@@ -6,17 +6,28 @@ from app.models.order import Order, OrderItem
 from app.models.user import User
 from datetime import datetime
 from app.utils.email import EmailService
+from app.models.queries import order_with_items
+from app.utils.db_routing import read_only
+from app.utils.conditional import conditional
+from app.models.versions import order_version
 from app.api.orders import bp
 
+def _order_version(order_id):
+    # 管理者はすべての注文、それ以外は自分の注文のみ
+    user_id = None if get_jwt().get('is_admin', False) else get_jwt_identity()
+    return order_version(order_id, user_id)
+
 @bp.route('/<int:order_id>', methods=['GET'])
 @jwt_required()
+@read_only
+@conditional(_order_version)
 def get_order_details(order_id):
     try:
         current_user_id = get_jwt_identity()
         claims = get_jwt()
         is_admin = claims.get('is_admin', False)
 
-        order = Order.query.get_or_404(order_id)
+        order = order_with_items(order_id)
         
         # 管理者でない場合、自分の注文のみアクセス可能
         if not is_admin and order.user_id != current_user_id:
@@ -38,9 +49,10 @@ def get_order_details(order_id):
                     'price': item.price,
                     'design': {
                         'image_url': item.design.image_url,
+                        'srcset': item.design.srcset(),
                         'prompt': item.design.prompt
                     }
-                } for item in order.order_items]
+                } for item in order.items]
             }
         }), 200
 
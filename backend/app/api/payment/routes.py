@@ -2,10 +2,17 @@
 from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models.order import Order, OrderItem, CartItem
+from app.models.order import Order
 from app.models.user import User
 from app.utils.stripe import StripeService
 from app.utils.email import EmailService
+from app.models.queries import orders_with_items
+from app.models.checkout import checkout, CheckoutError
+from app.models.pricing import cart_totals, PricingError
+from app.models.serializers import serialize_order, order_items_by_order, order_summaries
+from app.models.partitions import partition_keys
+from app.utils.db_routing import read_only
+from app.utils.pagination import keyset_paginate, pagination_args, PaginationError
 from app.api.payment import bp
 
 @bp.route('/create-payment', methods=['POST'])
@@ -13,24 +20,25 @@ from app.api.payment import bp
 def create_payment():
    try:
        current_user_id = get_jwt_identity()
-       
-       # カート内のアイテムを取得
-       cart_items = CartItem.query.filter_by(user_id=current_user_id).all()
-       if not cart_items:
-           return jsonify({'error': 'Cart is empty'}), 400
 
-       # 合計金額を計算
-       total_amount = sum(item.quantity * 3000 + 500 for item in cart_items)
+       # 合計金額を計算（価格表から1クエリ、注文作成時と同じ計算）
+       totals = cart_totals(current_user_id)
+       if not totals['item_count']:
+           return jsonify({'error': 'Cart is empty'}), 400
 
        # Stripeの支払いインテントを作成
-       payment_data = StripeService.create_payment_intent(total_amount)
+       payment_data = StripeService.create_payment_intent(totals['total'])
 
        return jsonify({
            'client_secret': payment_data['client_secret'],
            'payment_intent_id': payment_data['payment_intent_id'],
-           'amount': total_amount
+           'amount': totals['total'],
+           'subtotal': totals['subtotal'],
+           'shipping': totals['shipping']
        }), 200
 
+   except PricingError as e:
+       return jsonify({'error': str(e)}), 400
    except Exception as e:
        print(f"Error in create_payment: {str(e)}")
        return jsonify({'error': str(e)}), 500
@@ -49,83 +57,90 @@ def confirm_payment():
         payment_intent_id = data['payment_intent_id']
         shipping_info = data['shipping_address']
 
-        # Stripeで支払い状態を確認
-        payment_status = StripeService.confirm_payment(payment_intent_id)
-        if not payment_status:
+        # Stripeで支払い状態と金額を確認（金額は注文の合計と照合する）
+        payment_intent = StripeService.get_payment_intent(payment_intent_id)
+        if payment_intent['status'] != 'succeeded':
             return jsonify({'error': 'Payment verification failed'}), 400
 
         user = User.query.get(current_user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
 
-        # トランザクション開始
         try:
-            # カート内のアイテムを取得し、在庫確認
-            cart_items = CartItem.query.filter_by(user_id=current_user_id).all()
-            if not cart_items:
-                return jsonify({'error': 'Cart is empty'}), 400
-
-            total_amount = sum(item.quantity * 2000 for item in cart_items)
-
-            # 注文作成
-            order = Order(
-                user_id=current_user_id,
-                total_amount=total_amount,
-                status='processing',  # 支払い確認後は'processing'に
-                payment_id=payment_intent_id,
-                shipping_address=shipping_info
-            )
-            db.session.add(order)
-            db.session.flush()
-
-            # 注文アイテム作成
-            for cart_item in cart_items:
-                order_item = OrderItem(
-                    order_id=order.id,
-                    design_id=cart_item.design_id,
-                    quantity=cart_item.quantity,
-                    size=cart_item.size,
-                    color=cart_item.color,
-                    price=3000
-                )
-                db.session.add(order_item)
-
-            # カートクリア
-            for item in cart_items:
-                db.session.delete(item)
-
-            db.session.commit()
-
-            # 注文確認メール送信
-            try:
-                EmailService.send_order_confirmation(
-                    order=order,
-                    recipient_email=user.email
-                )
-            except Exception as mail_error:
-                current_app.logger.error(f"Failed to send order confirmation email: {mail_error}")
-                # メール送信失敗は注文処理には影響させない
+            order, created = checkout(current_user_id, payment_intent_id, shipping_info, payment_intent['amount'])
+        except CheckoutError as e:
+            return jsonify({'error': str(e)}), e.status_code
+        except Exception as db_error:
+            current_app.logger.error(f"Database error in order processing: {db_error}")
+            return jsonify({'error': 'Failed to process order'}), 500
 
+        if not created:
+            # 同じ決済の再送（注文は作成済み）
             return jsonify({
-                'message': 'Order processed successfully',
+                'message': 'Order already processed',
                 'order_id': order.id
             }), 200
 
-        except Exception as db_error:
-            db.session.rollback()
-            current_app.logger.error(f"Database error in order processing: {db_error}")
-            return jsonify({'error': 'Failed to process order'}), 500
+        # 注文確認メール送信
+        try:
+            EmailService.send_order_confirmation(
+                order=serialize_order(order),
+                recipient_email=user.email
+            )
+        except Exception as mail_error:
+            current_app.logger.error(f"Failed to send order confirmation email: {mail_error}")
+            # メール送信失敗は注文処理には影響させない
+
+        return jsonify({
+            'message': 'Order processed successfully',
+            'order_id': order.id
+        }), 200
 
     except Exception as e:
         current_app.logger.error(f"Error in confirm_payment: {e}")
         return jsonify({'error': str(e)}), 500
 
+ORDER_VIEWS = ('full', 'summary')
+MAX_EXPAND_ORDERS = 100
+
 @bp.route('/orders', methods=['GET'])
 @jwt_required()
+@read_only
 def get_orders():
+   """
+   注文履歴（カーソルページング）
+   view=summary: アイテムの件数・数量・最初のアイテムのサムネイルのみ（集計1クエリ）
+   view=full:    注文アイテムを含む（既定）
+   """
    try:
        current_user_id = get_jwt_identity()
-       orders = Order.query.filter_by(user_id=current_user_id).all()
+       view = request.args.get('view', 'full')
+       if view not in ORDER_VIEWS:
+           return jsonify({'error': f"view must be one of {', '.join(ORDER_VIEWS)}"}), 400
+
+       cursor, limit, total = pagination_args()
+       query = Order.query.filter_by(user_id=current_user_id)
+
+       if view == 'summary':
+           page = keyset_paginate(query, (Order.created_at, Order.id), cursor=cursor, limit=limit, total=total)
+           summaries = order_summaries([order.id for order in page.items], created_ats=partition_keys(page.items))
+           empty = {'item_count': 0, 'quantity': 0, 'thumbnail': None}
+           return jsonify({
+               'orders': [{
+                   'id': order.id,
+                   'total_amount': order.total_amount,
+                   'status': order.status,
+                   'created_at': order.created_at.isoformat(),
+                   **summaries.get(order.id, empty)
+               } for order in page.items],
+               **page.meta()
+           }), 200
+
+       page = keyset_paginate(
+           orders_with_items(query),
+           (Order.created_at, Order.id), cursor=cursor, limit=limit, total=total
+       )
+       orders = page.items
 
        return jsonify({
            'orders': [{
@@ -139,8 +154,40 @@ def get_orders():
                    'size': item.size,
                    'color': item.color,
                    'price': item.price
-               } for item in order.order_items]
-           } for order in orders]
+               } for item in order.items]
+           } for order in orders],
+           **page.meta()
+       }), 200
+
+   except PaginationError as e:
+       return jsonify({'error': str(e)}), 400
+   except Exception as e:
+       return jsonify({'error': str(e)}), 500
+
+@bp.route('/orders/items', methods=['GET'])
+@jwt_required()
+@read_only
+def get_order_items():
+   """注文履歴で展開した注文のアイテム（?ids=1,2,3、デザイン込み）"""
+   try:
+       current_user_id = get_jwt_identity()
+       try:
+           order_ids = [int(order_id) for order_id in request.args.get('ids', '').split(',') if order_id]
+       except ValueError:
+           return jsonify({'error': 'ids must be a comma-separated list of order IDs'}), 400
+       if not order_ids:
+           return jsonify({'error': 'ids is required'}), 400
+       if len(order_ids) > MAX_EXPAND_ORDERS:
+           return jsonify({'error': f'ids must contain at most {MAX_EXPAND_ORDERS} orders'}), 400
+
+       # 自分の注文だけ
+       owned = [order_id for (order_id,) in db.session.query(Order.id).filter(
+           Order.user_id == current_user_id, Order.id.in_(order_ids)
+       ).order_by(Order.id)]
+       items = order_items_by_order(owned)
+
+       return jsonify({
+           'orders': [{'id': order_id, 'items': items.get(order_id, [])} for order_id in owned]
        }), 200
 
    except Exception as e:
@@ -195,16 +242,13 @@ def test_payment_flow():
     """テスト用の決済フローエンドポイント"""
     try:
         current_user_id = get_jwt_identity()
-        
-        # カート内のアイテムを取得
-        cart_items = CartItem.query.filter_by(user_id=current_user_id).all()
-        if not cart_items:
+
+        totals = cart_totals(current_user_id)
+        if not totals['item_count']:
             return jsonify({'error': 'Cart is empty'}), 400
 
-        total_amount = sum(item.quantity * 2000 for item in cart_items)
-        
         # テスト用の支払いインテントを作成（自動的に成功する）
-        payment_data = StripeService.create_test_payment_intent(total_amount)
+        payment_data = StripeService.create_test_payment_intent(totals['total'])
         
         # 支払い確認用のデータを作成
         confirmation_data = {
@@ -223,6 +267,8 @@ def test_payment_flow():
         # 既存のconfirm_payment関数を呼び出し
         return confirm_payment()
         
+    except PricingError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f"Error in test payment flow: {str(e)}")
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
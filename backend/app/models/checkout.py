@@ -0,0 +1,121 @@
+# app/models/checkout.py
+"""
+決済確認後の注文作成（1トランザクション）
+・カートの行をロックしてから読み込む（PostgreSQL: SELECT ... FOR UPDATE / SQLite: BEGIN IMMEDIATE）
+・注文アイテムは1文のINSERT（複数行VALUES）、カートは1文のDELETEで削除
+・orders.payment_id は一意のため、同じ決済の確認を再送しても既存の注文を返すだけになる
+・orders をパーティション化した場合は payment_id の一意インデックスがないため、
+  PostgreSQL では payment_id のアドバイザリーロックで同じ決済の確認を直列化する
+・単価・合計は価格表から計算する（app/models/pricing.py、決済作成時と同じ計算）
+・合計が決済された金額（PaymentIntent の amount）と一致しない場合は注文を作らない
+  （決済作成後の価格変更・カートへの追加など）
+"""
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.order import Order, OrderItem, CartItem
+from app.models.pricing import PricingError, cart_totals, with_unit_price
+from app.models.stats import record_order
+
+
+class CheckoutError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _lock_cart(user_id, payment_id):
+    """カートの行をロックして取得"""
+    connection = db.session.connection()
+    stmt, price = with_unit_price(select(
+        CartItem.id, CartItem.design_id, CartItem.quantity, CartItem.size, CartItem.color, CartItem.design_config
+    ).select_from(CartItem))
+    stmt = stmt.add_columns(price.label('unit_price')).where(CartItem.user_id == user_id).order_by(CartItem.id)
+
+    if connection.dialect.name == 'sqlite':
+        # SQLiteは行ロックがないため、書き込みロックを取ってからトランザクションを始める
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+    else:
+        if connection.dialect.name == 'postgresql':
+            # 同じ決済の確認はトランザクションの終わりまで待たせる（一意インデックスがない場合の重複防止）
+            db.session.execute(select(func.pg_advisory_xact_lock(func.hashtext(payment_id))))
+        stmt = stmt.with_for_update(of=CartItem)
+    return db.session.execute(stmt).all()
+
+
+def _existing_order(payment_id, user_id):
+    order = Order.query.filter_by(payment_id=payment_id).first()
+    if order is not None and order.user_id != user_id:
+        raise CheckoutError('Payment belongs to another user', 409)
+    return order
+
+
+def checkout(user_id, payment_id, shipping_address, charged_amount):
+    """
+    カートから注文を作成してコミットする
+    charged_amount: Stripeで決済された金額（円）
+    返り値: (order, created) 同じ payment_id の注文が既にあれば (既存の注文, False)
+    """
+    try:
+        cart_items = _lock_cart(user_id, payment_id)
+
+        # ロック取得後に確認する（同時に確認された場合は先に作られた注文を返す）
+        order = _existing_order(payment_id, user_id)
+        if order is not None:
+            db.session.rollback()
+            return order, False
+
+        if not cart_items:
+            raise CheckoutError('Cart is empty')
+        try:
+            totals = cart_totals(user_id, item_ids=[item.id for item in cart_items])
+        except PricingError as e:
+            raise CheckoutError(str(e)) from e
+        if totals['total'] != charged_amount:
+            raise CheckoutError(
+                f"Cart total ({totals['total']}) does not match the charged amount ({charged_amount})", 409
+            )
+
+        order = Order(
+            user_id=user_id,
+            total_amount=totals['total'],
+            status='processing',  # 支払い確認後は'processing'に
+            payment_id=payment_id,
+            shipping_address=shipping_address
+        )
+        db.session.add(order)
+        db.session.flush()
+
+        db.session.execute(insert(OrderItem.__table__).values([{
+            'order_id': order.id,
+            'design_id': item.design_id,
+            'quantity': item.quantity,
+            'size': item.size,
+            'color': item.color,
+            'price': item.unit_price,
+            'design_config': item.design_config,
+            'created_at': order.created_at
+        } for item in cart_items]))
+
+        # ロックした行だけを削除（ロック後に追加されたアイテムは残す）
+        db.session.execute(delete(CartItem.__table__).where(
+            CartItem.user_id == user_id,
+            CartItem.id.in_([item.id for item in cart_items])
+        ))
+
+        # 売上集計も同じトランザクションで更新
+        record_order(order)
+        db.session.commit()
+        return order, True
+
+    except IntegrityError:
+        # 同じ payment_id の注文が先にコミットされた
+        db.session.rollback()
+        order = _existing_order(payment_id, user_id)
+        if order is None:
+            raise
+        return order, False
+    except Exception:
+        db.session.rollback()
+        raise
@@ -4,6 +4,12 @@ from app import db
 
 class Design(db.Model):
     __tablename__ = 'designs'
+    __table_args__ = (
+        # カーソルページング（user_id で絞り込み created_at, id の順）
+        db.Index('ix_designs_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        # 同じ画像を共有するデザインの検索（派生画像の再利用）
+        db.Index('ix_designs_s3_key', 's3_key'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -13,7 +19,13 @@ class Design(db.Model):
     position_x = db.Column(db.Float, default=0)
     position_y = db.Column(db.Float, default=0)
     scale = db.Column(db.Float, default=1.0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    renditions = db.Column(db.JSON, nullable=True, comment='{幅: WebP画像のURL}')
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def srcset(self):
+        """サムネイル表示用の派生画像（幅 → URL）。未生成の場合は空"""
+        return self.renditions or {}
 
     def to_dict(self):
         """
@@ -30,8 +42,26 @@ class Design(db.Model):
             'position_x': self.position_x,
             'position_y': self.position_y,
             'scale': self.scale,
+            'srcset': self.srcset(),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
     def __repr__(self):
-        return f'<Design {self.id}>'
\ No newline at end of file
+        return f'<Design {self.id}>'
+
+class DesignContent(db.Model):
+    """生成済み画像のインデックス（同一プロンプト・パラメータの再生成を避けるため）"""
+    __tablename__ = 'design_contents'
+
+    id = db.Column(db.Integer, primary_key=True)
+    content_key = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    prompt = db.Column(db.String(2000), nullable=False, comment='翻訳後のプロンプト')
+    params = db.Column(db.JSON, nullable=False, comment='{engine, cfg_scale, width, height, samples, steps, seed}')
+    image_url = db.Column(db.String(500), nullable=False)
+    s3_key = db.Column(db.String(200), nullable=False)
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_hit_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<DesignContent {self.content_key[:12]}>'
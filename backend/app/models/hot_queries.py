@@ -0,0 +1,157 @@
+# app/models/hot_queries.py
+"""
+頻繁に実行されるクエリの登録と実行計画の確認
+登録したクエリは tests/test_query_plans.py でEXPLAINし、テーブルの全件走査になっていないか確認する
+（インデックスを追加・変更したときや、新しい一覧・検索を追加したときはここにも登録する）
+"""
+import re
+from datetime import date, datetime
+from sqlalchemy import func, select, text, tuple_
+from app import db
+from app.models.design import Design, DesignContent
+from app.models.order import Order, OrderItem, CartItem
+from app.models.pricing import with_unit_price
+from app.models.stats import SalesRollup
+
+HOT_QUERIES = {}
+
+
+def hot_query(name):
+    """クエリ（Select）を返す関数を登録するデコレータ"""
+    def decorator(fn):
+        HOT_QUERIES[name] = fn
+        return fn
+    return decorator
+
+
+@hot_query('designs.by_user')
+def _designs_by_user():
+    # デザイン一覧（カーソルページング）
+    return select(Design).where(
+        Design.user_id == 1,
+        tuple_(Design.created_at, Design.id) < tuple_(datetime(2025, 1, 1), 100)
+    ).order_by(Design.created_at.desc(), Design.id.desc()).limit(21)
+
+
+@hot_query('designs.version')
+def _designs_version():
+    # デザイン一覧のETag（ポーリングのたびに実行）
+    return select(func.count(Design.id), func.max(Design.id), func.max(Design.updated_at)).where(Design.user_id == 1)
+
+
+@hot_query('designs.by_s3_key')
+def _designs_by_s3_key():
+    # 派生画像の再利用
+    return select(Design).where(Design.s3_key == 'designs/1.png', Design.renditions.isnot(None)).limit(1)
+
+
+@hot_query('design_contents.by_key')
+def _design_contents_by_key():
+    return select(DesignContent).where(DesignContent.content_key == 'a' * 64)
+
+
+@hot_query('cart_items.by_user')
+def _cart_items_by_user():
+    return select(CartItem).where(CartItem.user_id == 1).order_by(CartItem.id)
+
+
+@hot_query('cart_items.version')
+def _cart_items_version():
+    # カートのETag（ポーリングのたびに実行）
+    return select(
+        func.count(CartItem.id), func.max(CartItem.id), func.max(CartItem.updated_at), func.max(Design.updated_at)
+    ).select_from(CartItem).outerjoin(Design, Design.id == CartItem.design_id).where(CartItem.user_id == 1)
+
+
+@hot_query('cart_items.totals')
+def _cart_items_totals():
+    # 決済作成・注文作成時のカートの合計（価格表を結合）
+    stmt, price = with_unit_price(select(func.count(CartItem.id)).select_from(CartItem))
+    return stmt.add_columns(func.sum(CartItem.quantity * price)).where(CartItem.user_id == 1)
+
+
+@hot_query('orders.by_user')
+def _orders_by_user():
+    # 顧客の注文履歴（カーソルページング）
+    return select(Order).where(Order.user_id == 1).order_by(Order.created_at.desc(), Order.id.desc()).limit(21)
+
+
+@hot_query('orders.recent')
+def _orders_recent():
+    # 管理画面の注文一覧・ダッシュボードの直近の注文
+    return select(Order).order_by(Order.created_at.desc(), Order.id.desc()).limit(21)
+
+
+@hot_query('orders.by_status')
+def _orders_by_status():
+    return select(Order).where(Order.status == 'processing').order_by(
+        Order.created_at.desc(), Order.id.desc()
+    ).limit(21)
+
+
+@hot_query('orders.by_payment_id')
+def _orders_by_payment_id():
+    return select(Order).where(Order.payment_id == 'pi_test')
+
+
+@hot_query('orders.stats_for_users')
+def _orders_stats_for_users():
+    # 管理画面のユーザー一覧（表示中のユーザーの注文集計）
+    return select(Order.user_id, func.count(Order.id), func.max(Order.created_at)).where(
+        Order.user_id.in_([1, 2, 3])
+    ).group_by(Order.user_id)
+
+
+@hot_query('order_items.by_orders')
+def _order_items_by_orders():
+    return select(OrderItem).where(OrderItem.order_id.in_([1, 2, 3])).order_by(OrderItem.order_id, OrderItem.id)
+
+
+@hot_query('order_items.summary')
+def _order_items_summary():
+    # 注文履歴の view=summary（注文ごとのアイテム数・最初のアイテム）
+    return select(
+        OrderItem.order_id, func.count(OrderItem.id), func.sum(OrderItem.quantity), func.min(OrderItem.id)
+    ).where(OrderItem.order_id.in_([1, 2, 3])).group_by(OrderItem.order_id)
+
+
+@hot_query('sales_rollups.range')
+def _sales_rollups_range():
+    return select(SalesRollup).where(
+        SalesRollup.day >= date(2025, 1, 1), SalesRollup.day <= date(2025, 1, 31)
+    ).order_by(SalesRollup.day)
+
+
+def _compile(statement, dialect):
+    return str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+
+def full_scans(statement):
+    """実行計画で全件走査しているテーブル名のリスト（SQLite / PostgreSQL）"""
+    connection = db.session.connection()
+    dialect = connection.dialect
+    sql = _compile(statement, dialect)
+
+    if dialect.name == 'postgresql':
+        # 行数が少ないとSeq Scanが選ばれるため、使えるインデックスがあるかだけを確認する
+        connection.execute(text('SET LOCAL enable_seqscan = off'))
+        plan = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {sql}').scalar()
+        scans = []
+
+        def walk(node):
+            if node.get('Node Type') == 'Seq Scan':
+                scans.append(node['Relation Name'])
+            for child in node.get('Plans', []):
+                walk(child)
+
+        walk(plan[0]['Plan'])
+        return scans
+
+    tables = set(db.metadata.tables)
+    scans = []
+    for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}'):
+        # 例: "SCAN orders" は全件走査、"SCAN orders USING INDEX ..." / "SEARCH ..." はインデックス
+        match = re.match(r'SCAN (\w+)(.*)', row[-1])
+        if match and match.group(1) in tables and 'USING' not in match.group(2):
+            scans.append(match.group(1))
+    return scans
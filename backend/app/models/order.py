@@ -4,6 +4,15 @@ from app import db
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        # カーソルページング（顧客の注文履歴 / 管理画面の注文一覧）
+        db.Index('ix_orders_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_orders_created_at_id', 'created_at', 'id'),
+        # 管理画面のステータス絞り込み（新しい順）
+        db.Index('ix_orders_status_created_at_id', 'status', 'created_at', 'id'),
+        # 決済IDは注文ごとに一意（同じ決済の確認を再送しても注文は1件）
+        db.Index('ix_orders_payment_id', 'payment_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -11,10 +20,12 @@ class Order(db.Model):
     status = db.Column(db.String(20), default='pending')
     shipping_address = db.Column(db.JSON, nullable=False, comment='{name, address, city, postal_code, country}')
     payment_id = db.Column(db.String(100))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     order_items = db.relationship('OrderItem', backref='order', lazy='dynamic')
+    # 一括読み込み（selectinload）用。order_items は lazy='dynamic' のため eager load できない
+    items = db.relationship('OrderItem', viewonly=True, order_by='OrderItem.id')
 
     def to_dict(self):
         return {
@@ -26,11 +37,15 @@ class Order(db.Model):
             'payment_id': self.payment_id,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'items': [item.to_dict() for item in self.order_items]
+            'items': [item.to_dict() for item in self.items]
         }
 
 class OrderItem(db.Model):
     __tablename__ = 'order_items'
+    __table_args__ = (
+        # 注文ごとのアイテムの一括取得
+        db.Index('ix_order_items_order_id_id', 'order_id', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
@@ -60,6 +75,10 @@ class OrderItem(db.Model):
 
 class CartItem(db.Model):
     __tablename__ = 'cart_items'
+    __table_args__ = (
+        # ユーザーのカートの取得（追加順）
+        db.Index('ix_cart_items_user_id_id', 'user_id', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -69,6 +88,7 @@ class CartItem(db.Model):
     color = db.Column(db.String(20), nullable=False)
     design_config = db.Column(db.JSON, nullable=True)  # デザイン位置などの設定を保存
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     design = db.relationship('Design', backref='cart_items')
 
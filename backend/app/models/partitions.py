@@ -0,0 +1,149 @@
+# app/models/partitions.py
+"""
+orders / order_items の月別パーティション（PostgreSQL の宣言的パーティショニング、任意）
+・ORDERS_PARTITIONING=true で `flask db upgrade` するとパーティション化される（マイグレーション b9f1d3e5a724）
+・パーティションは created_at の月ごと（orders_y2025m01 など）。範囲外の行は既定のパーティション（orders_default）に入る
+・order_items の created_at は注文の created_at と同じ（注文作成時に揃える）ため、同じ月のパーティションに入る
+・先の月のパーティションは ensure_partitions() で作成する（起動時と scripts/manage_partitions.py）
+・古いパーティションは detach_partitions() で切り離してからコールドストレージに退避する
+SQLite などパーティショニングのないDBでは何もしない
+"""
+import logging
+import re
+from datetime import date, datetime
+from sqlalchemy import text
+from app import db
+
+PARTITIONED_TABLES = ('orders', 'order_items')
+
+logger = logging.getLogger(__name__)
+
+_partitioned = {}
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_y{month.year}m{month.month:02d}'
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def is_partitioned(engine=None):
+    """orders がパーティション化されているか（エンジンごとに1回だけ確認）"""
+    engine = engine or db.engine
+    if engine.dialect.name != 'postgresql':
+        return False
+    key = engine.url.render_as_string()
+    if key not in _partitioned:
+        with engine.connect() as connection:
+            _partitioned[key] = connection.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('orders'))"
+            )).scalar()
+    return _partitioned[key]
+
+
+def partition_keys(orders):
+    """
+    注文アイテムを取得するクエリに付ける created_at の値（パーティションの除外用）
+    パーティション化されていない場合は None（order_items.created_at が注文と揃っていない既存データがあるため）
+    """
+    if not orders or not is_partitioned():
+        return None
+    return sorted({order.created_at for order in orders})
+
+
+def _existing_partitions(connection, table):
+    return set(connection.execute(text(
+        'SELECT child.relname FROM pg_inherits '
+        'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent '
+        'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+        'WHERE parent.relname = :table'
+    ), {'table': table}).scalars())
+
+
+def create_partition(connection, table, month):
+    """
+    月のパーティションを作成
+    既定のパーティションにその月の行がある場合（作成が遅れた場合）は、行を移してから追加する
+    """
+    name = partition_name(table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    default = default_partition_name(table)
+    in_range = f"created_at >= '{start}' AND created_at < '{end}'"
+
+    if default in _existing_partitions(connection, table) and connection.execute(
+        text(f'SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})')
+    ).scalar():
+        connection.execute(text(f'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+        connection.execute(text(f'INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}'))
+        connection.execute(text(f'DELETE FROM {default} WHERE {in_range}'))
+        connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    else:
+        connection.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{start}') TO ('{end}')"
+        ))
+    return name
+
+
+def ensure_partitions(connection, months_ahead=3, start=None):
+    """start の月（省略時は今月）から months_ahead か月先までのパーティションと既定のパーティションを作成"""
+    first = month_start(start or datetime.utcnow())
+    last = add_months(month_start(datetime.utcnow()), months_ahead)
+    # 複数のプロセスが同時に起動しても同じパーティションを作らない
+    connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('orders_partitions'))"))
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = _existing_partitions(connection, table)
+        default = default_partition_name(table)
+        if default not in existing:
+            connection.execute(text(f'CREATE TABLE {default} PARTITION OF {table} DEFAULT'))
+            created.append(default)
+        month = first
+        while month <= last:
+            if partition_name(table, month) not in existing:
+                created.append(create_partition(connection, table, month))
+            month = add_months(month, 1)
+    return created
+
+
+def ensure_future_partitions(app):
+    """起動時に先の月のパーティションを作成（ORDERS_PARTITIONING=true かつパーティション化済みの場合）"""
+    if not app.config.get('ORDERS_PARTITIONING'):
+        return
+    with app.app_context():
+        try:
+            if not is_partitioned():
+                return
+            with db.engine.begin() as connection:
+                created = ensure_partitions(connection, app.config.get('ORDERS_PARTITION_MONTHS_AHEAD', 3))
+            if created:
+                logger.info(f"Created partitions: {', '.join(created)}")
+        except Exception as e:
+            # 起動は止めない（scripts/manage_partitions.py の定期実行でも作成される）
+            logger.warning(f"Failed to create order partitions: {str(e)}")
+
+
+def detach_partitions(connection, before):
+    """before の月より前のパーティションを切り離す（テーブルは残るので退避してから DROP する）"""
+    before = month_start(before)
+    detached = []
+    for table in PARTITIONED_TABLES:
+        for name in sorted(_existing_partitions(connection, table)):
+            match = re.fullmatch(rf'{table}_y(\d{{4}})m(\d{{2}})', name)
+            if match is None:
+                # 既定のパーティションなど
+                continue
+            if date(int(match.group(1)), int(match.group(2)), 1) < before:
+                connection.execute(text(f'ALTER TABLE {table} DETACH PARTITION {name}'))
+                detached.append(name)
+    return detached
@@ -0,0 +1,140 @@
+# app/models/pricing.py
+"""
+価格表（サイズ・カラーごとの単価）とカートの合計金額
+・size / color の '*' はすべてに一致する（サイズ・カラーの完全一致 → サイズのみ → '*', '*' の順に使う）
+・カートの小計・送料・合計は cart_totals() の1クエリで計算し、すべての決済処理で使う
+・単価の参照（unit_price）はプロセス内に PRICE_CACHE_TTL 秒キャッシュする（価格表は小さいため全件を保持）
+"""
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, case, event, func, literal, select
+from sqlalchemy.orm import aliased
+from app import db
+from app.models.order import CartItem
+
+ANY = '*'
+DEFAULT_UNIT_PRICE = 3000
+
+
+class PricingError(Exception):
+    pass
+
+
+class PriceCatalog(db.Model):
+    __tablename__ = 'price_catalog'
+    __table_args__ = (
+        db.UniqueConstraint('size', 'color', name='uq_price_catalog_size_color'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    size = db.Column(db.String(10), nullable=False, comment="'*' はすべてのサイズ")
+    color = db.Column(db.String(20), nullable=False, comment="'*' はすべてのカラー")
+    unit_price = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {'size': self.size, 'color': self.color, 'unit_price': self.unit_price}
+
+
+@event.listens_for(PriceCatalog.__table__, 'after_create')
+def _insert_default_price(target, connection, **kwargs):
+    # create_all で作成した場合も既定の単価を入れておく（マイグレーションでも同じ行を作成）
+    connection.execute(target.insert().values(size=ANY, color=ANY, unit_price=DEFAULT_UNIT_PRICE))
+
+
+# --- 単価の参照（プロセス内キャッシュ） ---
+
+_cache = {'prices': None, 'expires_at': 0.0}
+_cache_lock = threading.Lock()
+
+
+def _prices():
+    ttl = current_app.config.get('PRICE_CACHE_TTL', 300)
+    with _cache_lock:
+        if _cache['prices'] is not None and _cache['expires_at'] > time.monotonic():
+            return _cache['prices']
+
+    prices = {
+        (size, color): unit_price
+        for size, color, unit_price in db.session.execute(
+            select(PriceCatalog.size, PriceCatalog.color, PriceCatalog.unit_price)
+        )
+    }
+    with _cache_lock:
+        _cache['prices'] = prices
+        _cache['expires_at'] = time.monotonic() + ttl
+    return prices
+
+
+def invalidate_prices():
+    """価格表を更新したときに呼ぶ（他のプロセスは PRICE_CACHE_TTL 秒後に反映）"""
+    with _cache_lock:
+        _cache['prices'] = None
+
+
+def unit_price(size, color):
+    """サイズ・カラーの単価（価格表にない場合は None）"""
+    prices = _prices()
+    for key in ((size, color), (size, ANY), (ANY, ANY)):
+        if key in prices:
+            return prices[key]
+    return None
+
+
+# --- SQLでの単価・合計 ---
+
+def with_unit_price(stmt):
+    """
+    カートアイテムを選択するクエリに価格表を結合し、単価の式を返す
+    返り値: (結合したクエリ, 単価の式)。価格表にない場合の単価は NULL
+    """
+    exact, by_size, default = aliased(PriceCatalog), aliased(PriceCatalog), aliased(PriceCatalog)
+    stmt = stmt.outerjoin(
+        exact, and_(exact.size == CartItem.size, exact.color == CartItem.color)
+    ).outerjoin(
+        by_size, and_(by_size.size == CartItem.size, by_size.color == ANY)
+    ).outerjoin(
+        default, and_(default.size == ANY, default.color == ANY)
+    )
+    return stmt, func.coalesce(exact.unit_price, by_size.unit_price, default.unit_price)
+
+
+def cart_totals(user_id, item_ids=None):
+    """
+    カートの件数・数量・小計・送料・合計（1クエリ）
+    item_ids を指定した場合はそのアイテムのみ（注文時にロックしたアイテム）
+    送料は SHIPPING_FEE（小計が FREE_SHIPPING_MIN_SUBTOTAL 以上なら無料、0 は無効）
+    価格表にないアイテムがある場合は PricingError
+    """
+    fee = current_app.config.get('SHIPPING_FEE', 500)
+    free_min = current_app.config.get('FREE_SHIPPING_MIN_SUBTOTAL', 0)
+
+    stmt, price = with_unit_price(select().select_from(CartItem))
+    subtotal = func.coalesce(func.sum(CartItem.quantity * price), 0)
+    shipping = case(
+        (func.count(CartItem.id) == 0, 0),
+        (and_(literal(free_min) > 0, subtotal >= free_min), 0),
+        else_=fee
+    )
+    stmt = stmt.add_columns(
+        func.count(CartItem.id),
+        func.coalesce(func.sum(CartItem.quantity), 0),
+        subtotal,
+        shipping,
+        func.count(CartItem.id) - func.count(price)
+    ).where(CartItem.user_id == user_id)
+    if item_ids is not None:
+        stmt = stmt.where(CartItem.id.in_(item_ids))
+
+    item_count, quantity, subtotal, shipping, unpriced = db.session.execute(stmt).one()
+    if unpriced:
+        raise PricingError('Price is not available for some cart items')
+    return {
+        'item_count': item_count,
+        'quantity': quantity,
+        'subtotal': subtotal,
+        'shipping': shipping,
+        'total': subtotal + shipping
+    }
@@ -0,0 +1,48 @@
+# app/models/queries.py
+"""
+関連データを一定回数のクエリで読み込むための共通クエリ
+（行ごとに item.design / order.order_items を参照するとN+1になるため）
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
+from app import db
+from app.models.order import Order, OrderItem, CartItem
+from app.models.partitions import partition_keys
+
+
+def cart_item_for_user(item_id, user_id):
+    """カートアイテムをデザインと一緒に取得（1クエリ、なければ404）"""
+    return CartItem.query.options(
+        joinedload(CartItem.design)
+    ).filter_by(id=item_id, user_id=user_id).first_or_404()
+
+
+def _order_graph_options():
+    return (
+        joinedload(Order.customer),
+        selectinload(Order.items).joinedload(OrderItem.design),
+    )
+
+
+def order_with_items(order_id):
+    """注文を注文アイテム・デザイン・顧客と一緒に取得（2クエリ、なければ404）"""
+    return Order.query.options(*_order_graph_options()).filter_by(id=order_id).first_or_404()
+
+
+def orders_with_items(query):
+    """注文のクエリに注文アイテム・デザイン・顧客の一括読み込みを追加"""
+    return query.options(*_order_graph_options())
+
+
+def item_counts(orders):
+    """注文IDごとの注文アイテム数（1クエリ）"""
+    if not orders:
+        return {}
+    query = db.session.query(
+        OrderItem.order_id, func.count(OrderItem.id)
+    ).filter(OrderItem.order_id.in_([order.id for order in orders]))
+    created_ats = partition_keys(orders)
+    if created_ats is not None:
+        # パーティションの除外（注文アイテムの created_at は注文と同じ）
+        query = query.filter(OrderItem.created_at.in_(created_ats))
+    return dict(query.group_by(OrderItem.order_id).all())
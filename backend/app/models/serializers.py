@@ -0,0 +1,177 @@
+# app/models/serializers.py
+"""
+注文・注文アイテム・カートアイテムの一括シリアライズ
+to_dict() は行ごとに関連（order.items / item.design）を参照するため、
+一覧ではアイテムとデザインをまとめて1クエリで取得し、ループでdictを組み立てる
+（ORMのオブジェクトは作らず、返り値の形は各モデルの to_dict() と同じ）
+"""
+from collections import defaultdict
+from sqlalchemy import func, select
+from app import db
+from app.models.design import Design
+from app.models.order import OrderItem, CartItem
+from app.models.partitions import partition_keys
+
+_items = OrderItem.__table__
+_cart_items = CartItem.__table__
+_designs = Design.__table__
+
+# デザインの列（Design.to_dict() の順）
+_DESIGN_COLUMNS = (
+    _designs.c.id, _designs.c.user_id, _designs.c.prompt, _designs.c.image_url, _designs.c.s3_key,
+    _designs.c.position_x, _designs.c.position_y, _designs.c.scale, _designs.c.renditions,
+    _designs.c.created_at,
+)
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _design_dict(row):
+    """_DESIGN_COLUMNS の値からデザインのdict（外部結合でデザインがない場合はNone）"""
+    design_id, user_id, prompt, image_url, s3_key, position_x, position_y, scale, renditions, created_at = row
+    if design_id is None:
+        return None
+    return {
+        'id': design_id,
+        'user_id': user_id,
+        'prompt': prompt,
+        'image_url': image_url,
+        's3_key': s3_key,
+        'position_x': position_x,
+        'position_y': position_y,
+        'scale': scale,
+        'srcset': renditions or {},
+        'created_at': _isoformat(created_at)
+    }
+
+
+def _in_partitions(stmt, created_ats):
+    """注文の created_at で order_items のパーティションを絞り込む（パーティション化している場合）"""
+    if created_ats is None:
+        return stmt
+    return stmt.where(_items.c.created_at.in_(created_ats))
+
+
+def order_items_by_order(order_ids, created_ats=None):
+    """
+    注文ID → 注文アイテムのdictのリスト（デザイン込み、1クエリ）
+    created_ats: partition_keys(orders) の値（パーティションの除外用）
+    """
+    result = defaultdict(list)
+    if not order_ids:
+        return result
+
+    stmt = select(
+        _items.c.id, _items.c.order_id, _items.c.design_id, _items.c.quantity, _items.c.size,
+        _items.c.color, _items.c.price, _items.c.design_config, _items.c.created_at,
+        *_DESIGN_COLUMNS
+    ).select_from(
+        _items.outerjoin(_designs, _designs.c.id == _items.c.design_id)
+    ).where(_items.c.order_id.in_(order_ids)).order_by(_items.c.order_id, _items.c.id)
+
+    for row in db.session.execute(_in_partitions(stmt, created_ats)):
+        result[row[1]].append({
+            'id': row[0],
+            'order_id': row[1],
+            'design_id': row[2],
+            'quantity': row[3],
+            'size': row[4],
+            'color': row[5],
+            'price': row[6],
+            'design_config': row[7],
+            'created_at': _isoformat(row[8]),
+            'design': _design_dict(row[9:])
+        })
+    return result
+
+
+def _thumbnail(design_id, image_url, renditions):
+    """一番小さい派生画像（未生成の場合は元画像）"""
+    if design_id is None:
+        return None
+    srcset = renditions or {}
+    return {
+        'design_id': design_id,
+        'url': srcset[min(srcset, key=int)] if srcset else image_url,
+        'srcset': srcset
+    }
+
+
+def order_summaries(order_ids, created_ats=None):
+    """
+    注文ID → 注文アイテムの件数・数量の合計・最初のアイテムのサムネイル（1クエリ）
+    注文履歴の一覧（view=summary）用。アイテムの詳細は展開した注文だけ order_items_by_order() で取得する
+    """
+    if not order_ids:
+        return {}
+
+    aggregate = select(
+        _items.c.order_id,
+        func.count(_items.c.id).label('item_count'),
+        func.sum(_items.c.quantity).label('quantity'),
+        func.min(_items.c.id).label('first_item_id')
+    ).where(_items.c.order_id.in_(order_ids)).group_by(_items.c.order_id)
+    aggregate = _in_partitions(aggregate, created_ats).subquery()
+
+    first_item = _items.alias('first_item')
+    stmt = select(
+        aggregate.c.order_id, aggregate.c.item_count, aggregate.c.quantity,
+        _designs.c.id, _designs.c.image_url, _designs.c.renditions
+    ).select_from(
+        aggregate.join(first_item, first_item.c.id == aggregate.c.first_item_id)
+        .outerjoin(_designs, _designs.c.id == first_item.c.design_id)
+    )
+
+    return {
+        row[0]: {
+            'item_count': row[1],
+            'quantity': row[2],
+            'thumbnail': _thumbnail(row[3], row[4], row[5])
+        } for row in db.session.execute(stmt)
+    }
+
+
+def serialize_orders(orders):
+    """注文のリストを Order.to_dict() と同じ形のdictのリストに変換（アイテム・デザインは1クエリ）"""
+    items = order_items_by_order([order.id for order in orders], created_ats=partition_keys(orders))
+    return [{
+        'id': order.id,
+        'user_id': order.user_id,
+        'total_amount': order.total_amount,
+        'status': order.status,
+        'shipping_address': order.shipping_address,
+        'payment_id': order.payment_id,
+        'created_at': _isoformat(order.created_at),
+        'updated_at': _isoformat(order.updated_at),
+        'items': items.get(order.id, [])
+    } for order in orders]
+
+
+def serialize_order(order):
+    return serialize_orders([order])[0]
+
+
+def serialize_cart_items(user_id, item_id=None):
+    """ユーザーのカートアイテムを CartItem.to_dict() と同じ形のdictのリストに変換（1クエリ）"""
+    stmt = select(
+        _cart_items.c.id, _cart_items.c.design_id, _cart_items.c.quantity, _cart_items.c.size,
+        _cart_items.c.color, _cart_items.c.design_config, _cart_items.c.created_at,
+        *_DESIGN_COLUMNS
+    ).select_from(
+        _cart_items.outerjoin(_designs, _designs.c.id == _cart_items.c.design_id)
+    ).where(_cart_items.c.user_id == user_id).order_by(_cart_items.c.id)
+    if item_id is not None:
+        stmt = stmt.where(_cart_items.c.id == item_id)
+
+    return [{
+        'id': row[0],
+        'design_id': row[1],
+        'quantity': row[2],
+        'size': row[3],
+        'color': row[4],
+        'design_config': row[5],
+        'design': _design_dict(row[7:]),
+        'created_at': _isoformat(row[6])
+    } for row in db.session.execute(stmt)]
@@ -0,0 +1,150 @@
+# app/models/stats.py
+"""
+管理画面の売上集計（日別・ステータス別）
+注文の作成・ステータス変更と同じトランザクションで集計テーブルを増減させ、
+ダッシュボードは注文テーブルではなく集計テーブルを読む
+"""
+from datetime import timedelta
+from sqlalchemy import cast, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.order import Order
+
+GRANULARITIES = ('day', 'week', 'month')
+
+
+class SalesRollup(db.Model):
+    __tablename__ = 'sales_rollups'
+
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    # 円は整数なので Integer（Float だと加算を繰り返すうちに丸め誤差が溜まる）
+    total_amount = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'status': self.status,
+            'order_count': self.order_count,
+            'total_amount': self.total_amount
+        }
+
+
+def _order_day(order):
+    return order.created_at.date()
+
+
+def _yen(amount):
+    return int(round(amount or 0))
+
+
+def _add(day, status, order_count, total_amount):
+    """バケットに加算（なければ作成）。1文のUPSERTで同時更新でも値を失わない"""
+    dialect = db.session.get_bind().dialect.name
+    total_amount = _yen(total_amount)
+    values = {'day': day, 'status': status or 'pending', 'order_count': order_count, 'total_amount': total_amount}
+
+    if dialect in ('postgresql', 'sqlite'):
+        stmt = (postgresql.insert if dialect == 'postgresql' else sqlite.insert)(SalesRollup).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['day', 'status'],
+            set_={
+                'order_count': SalesRollup.order_count + stmt.excluded.order_count,
+                'total_amount': SalesRollup.total_amount + stmt.excluded.total_amount
+            }
+        )
+        db.session.execute(stmt)
+        return
+
+    updated = SalesRollup.query.filter_by(day=values['day'], status=values['status']).update({
+        'order_count': SalesRollup.order_count + order_count,
+        'total_amount': SalesRollup.total_amount + total_amount
+    }, synchronize_session=False)
+    if not updated:
+        db.session.execute(insert(SalesRollup).values(**values))
+
+
+def record_order(order):
+    """注文作成時に呼ぶ（flush後、commit前）"""
+    _add(_order_day(order), order.status, 1, order.total_amount)
+
+
+def record_status_change(order, old_status):
+    """注文ステータス変更時に呼ぶ（commit前）"""
+    if old_status == order.status:
+        return
+    day = _order_day(order)
+    _add(day, old_status, -1, -order.total_amount)
+    _add(day, order.status, 1, order.total_amount)
+
+
+def rebuild_rollups():
+    """注文テーブルから集計テーブルを作り直す（1トランザクション）"""
+    day = func.date(Order.created_at)
+    db.session.query(SalesRollup).delete(synchronize_session=False)
+    db.session.execute(
+        insert(SalesRollup).from_select(
+            ['day', 'status', 'order_count', 'total_amount'],
+            select(
+                day,
+                func.coalesce(Order.status, 'pending'),
+                func.count(Order.id),
+                cast(func.round(func.coalesce(func.sum(Order.total_amount), 0)), db.Integer)
+            ).group_by(day, func.coalesce(Order.status, 'pending'))
+        )
+    )
+    db.session.commit()
+    return SalesRollup.query.count()
+
+
+def totals():
+    """全期間の合計（売上・注文数・ステータス別注文数）"""
+    rows = db.session.query(
+        SalesRollup.status,
+        func.sum(SalesRollup.order_count),
+        func.sum(SalesRollup.total_amount)
+    ).group_by(SalesRollup.status).all()
+
+    status_counts = {status: int(count) for status, count, _ in rows if count}
+    return {
+        'total_sales': float(sum(amount or 0 for _, _, amount in rows)),
+        'total_orders': sum(status_counts.values()),
+        'status_counts': status_counts
+    }
+
+
+def _period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def timeseries(start, end, granularity='day'):
+    """start〜end（両端を含む）の期間ごとの売上・注文数"""
+    rows = SalesRollup.query.filter(
+        SalesRollup.day >= start, SalesRollup.day <= end
+    ).order_by(SalesRollup.day).all()
+
+    buckets = {}
+    for row in rows:
+        period = _period_start(row.day, granularity)
+        bucket = buckets.setdefault(period, {'orders': 0, 'sales': 0.0, 'status_counts': {}})
+        bucket['orders'] += row.order_count
+        bucket['sales'] += row.total_amount
+        if row.order_count:
+            bucket['status_counts'][row.status] = bucket['status_counts'].get(row.status, 0) + row.order_count
+
+    # 注文のない期間も0で返す
+    series = []
+    period = _period_start(start, granularity)
+    while period <= end:
+        bucket = buckets.get(period, {'orders': 0, 'sales': 0.0, 'status_counts': {}})
+        series.append({'period': period.isoformat(), **bucket})
+        if granularity == 'month':
+            period = (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            period += timedelta(days=7 if granularity == 'week' else 1)
+    return series
@@ -0,0 +1,69 @@
+# app/models/versions.py
+"""
+条件付きGET（ETag / Last-Modified）用のバージョン
+レスポンスの本体を組み立てずに、更新日時の最大値・件数・最大IDだけを1クエリで集計する
+返り値: (バージョン, 最終更新日時)。対象が見つからない（または他のユーザーのもの）場合は None
+・件数と最大IDは削除・追加の検出用（削除では更新日時の最大値が変わらないため）
+・一覧は同じ理由で最終更新日時を None にする（If-Modified-Since では削除を検出できない）
+・表示にデザインを含むものはデザインの更新日時（派生画像の生成など）も含める
+"""
+from sqlalchemy import func, select
+from app import db
+from app.models.design import Design
+from app.models.order import Order, OrderItem, CartItem
+
+
+def _latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def designs_version(user_id):
+    """ユーザーのデザイン一覧"""
+    count, max_id, updated_at = db.session.execute(
+        select(func.count(Design.id), func.max(Design.id), func.max(Design.updated_at)).where(Design.user_id == user_id)
+    ).one()
+    return (count, max_id, updated_at), None
+
+
+def design_version(design_id, user_id):
+    row = db.session.execute(
+        select(Design.updated_at).where(Design.id == design_id, Design.user_id == user_id)
+    ).first()
+    if row is None:
+        return None
+    return (design_id, row[0]), row[0]
+
+
+def cart_version(user_id, item_id=None):
+    """ユーザーのカート（item_id を指定した場合はそのアイテムのみ）"""
+    stmt = select(
+        func.count(CartItem.id), func.max(CartItem.id), func.max(CartItem.updated_at), func.max(Design.updated_at)
+    ).select_from(CartItem).outerjoin(Design, Design.id == CartItem.design_id).where(CartItem.user_id == user_id)
+    if item_id is not None:
+        stmt = stmt.where(CartItem.id == item_id)
+
+    count, max_id, item_updated_at, design_updated_at = db.session.execute(stmt).one()
+    version = (count, max_id, item_updated_at, design_updated_at)
+    if item_id is None:
+        return version, None
+    if not count:
+        return None
+    return version, _latest(item_updated_at, design_updated_at)
+
+
+def order_version(order_id, user_id=None):
+    """注文詳細（user_id を指定した場合は自分の注文のみ）"""
+    stmt = select(
+        Order.updated_at, func.max(Design.updated_at)
+    ).select_from(Order).outerjoin(
+        OrderItem, OrderItem.order_id == Order.id
+    ).outerjoin(Design, Design.id == OrderItem.design_id).where(Order.id == order_id).group_by(Order.id)
+    if user_id is not None:
+        stmt = stmt.where(Order.user_id == user_id)
+
+    row = db.session.execute(stmt).first()
+    if row is None:
+        return None
+    order_updated_at, design_updated_at = row
+    return (order_id, order_updated_at, design_updated_at), _latest(order_updated_at, design_updated_at)
@@ -1,22 +1,135 @@
 # app/utils/aws.py
+import threading
 import boto3
-import os
+from botocore.config import Config as BotoConfig
+from config import Config
+
+
+class AWSClientRegistry:
+    """
+    boto3クライアントのプロセス内レジストリ
+    ・クライアントはサービスごとに1つだけ作成し、コネクションプールを使い回す（スレッドセーフ）
+    ・リソース（boto3.resource）はスレッドセーフではないため、スレッドごとに1つ作成する
+    ・テストでは override() でスタブに差し替えられる
+    """
+
+    def __init__(self):
+        self._settings = self._load_settings(Config)
+        self._session = None
+        self._clients = {}
+        self._local = threading.local()
+        self._overrides = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @staticmethod
+    def _load_settings(config):
+        get = config.get if isinstance(config, dict) else lambda key, default=None: getattr(config, key, default)
+        return {
+            'aws_access_key_id': get('AWS_ACCESS_KEY_ID'),
+            'aws_secret_access_key': get('AWS_SECRET_ACCESS_KEY'),
+            'region_name': get('AWS_REGION'),
+            'max_pool_connections': get('AWS_MAX_POOL_CONNECTIONS', 50),
+            'retry_mode': get('AWS_RETRY_MODE', 'standard'),
+            'max_attempts': get('AWS_MAX_ATTEMPTS', 3),
+            'connect_timeout': get('AWS_CONNECT_TIMEOUT', 5),
+            'read_timeout': get('AWS_READ_TIMEOUT', 30),
+        }
+
+    def init_app(self, app):
+        settings = self._load_settings(app.config)
+        with self._lock:
+            if settings != self._settings:
+                self._settings = settings
+                self._reset_locked()
+        app.extensions['aws_clients'] = self
+
+    def _reset_locked(self):
+        self._session = None
+        self._clients = {}
+        self._generation += 1
+
+    def reset(self):
+        """作成済みのクライアントを破棄（次回アクセス時に再作成）"""
+        with self._lock:
+            self._reset_locked()
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = boto3.session.Session(
+                aws_access_key_id=self._settings['aws_access_key_id'],
+                aws_secret_access_key=self._settings['aws_secret_access_key'],
+                region_name=self._settings['region_name']
+            )
+        return self._session
+
+    def _boto_config(self):
+        return BotoConfig(
+            max_pool_connections=self._settings['max_pool_connections'],
+            retries={
+                'mode': self._settings['retry_mode'],
+                'max_attempts': self._settings['max_attempts']
+            },
+            connect_timeout=self._settings['connect_timeout'],
+            read_timeout=self._settings['read_timeout']
+        )
+
+    def client(self, service_name):
+        """boto3.client を取得"""
+        override = self._overrides.get(('client', service_name))
+        if override is not None:
+            return override
+
+        client = self._clients.get(service_name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(service_name)
+                if client is None:
+                    client = self._get_session().client(service_name, config=self._boto_config())
+                    self._clients[service_name] = client
+        return client
+
+    def resource(self, service_name):
+        """boto3.resource を取得（スレッドごと）"""
+        override = self._overrides.get(('resource', service_name))
+        if override is not None:
+            return override
+
+        cache = getattr(self._local, 'resources', None)
+        if cache is None or self._local.generation != self._generation:
+            cache = self._local.resources = {}
+            self._local.generation = self._generation
+
+        resource = cache.get(service_name)
+        if resource is None:
+            # boto3.session.Session はスレッドセーフではないため、リソースの生成もロック内で行う
+            with self._lock:
+                resource = self._get_session().resource(service_name, config=self._boto_config())
+            cache[service_name] = resource
+        return resource
+
+    def override(self, service_name, stub, kind='client'):
+        """テスト用にクライアント/リソースをスタブに差し替え"""
+        self._overrides[(kind, service_name)] = stub
+
+    def clear_overrides(self):
+        self._overrides = {}
+
+
+aws_clients = AWSClientRegistry()
+
 
 def test_aws_connection():
     """Test AWS credentials and connection"""
     try:
         # Test DynamoDB connection
-        dynamodb = boto3.resource('dynamodb',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION')
-        )
-        
+        dynamodb = aws_clients.resource('dynamodb')
+
         # List existing tables
         existing_tables = list(dynamodb.tables.all())
         print("Existing DynamoDB tables:", [table.name for table in existing_tables])
-        
+
         return True
     except Exception as e:
         print("AWS Connection Error:", str(e))
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,79 @@
+# app/utils/conditional.py
+"""
+条件付きGET（ETag / Last-Modified）
+・バージョン（app/models/versions.py）からETagを作り、If-None-Match / If-Modified-Since が一致すれば
+  ビューを呼ばずに 304 を返す（本体のクエリ・シリアライズを省略）
+・ETagにはユーザーIDとURL（クエリ文字列を含む）も含める
+・Last-Modified は単一のリソースのみ（一覧は削除で更新日時の最大値が変わらないため ETag だけ）
+・Last-Modified は秒単位のため、更新から1秒経っていない場合は付けない（同じ秒の更新を見逃さないように）
+・ユーザー固有のレスポンスのため Cache-Control: private, no-cache（保存は可、使う前に必ず再検証）
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import current_app, make_response, request
+from flask_jwt_extended import get_jwt_identity
+
+# レスポンスの形を変えたときはバージョンを上げて既存のETagを無効化する
+ETAG_VERSION = '1'
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts):
+    return hashlib.sha256(repr((ETAG_VERSION,) + parts).encode('utf-8')).hexdigest()[:32]
+
+
+def _http_datetime(value):
+    """
+    DBの日時（UTC、タイムゾーンなし）をHTTPの日時（秒単位）に変換
+    更新がまだ同じ秒の中であれば None（切り捨てた時刻では、この後の同じ秒の更新と区別できない）
+    """
+    if value is None or datetime.utcnow() - value < timedelta(seconds=1):
+        return None
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # If-None-Match がある場合は If-Modified-Since を使わない（RFC 9110）
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Authorization')
+    return response
+
+
+def conditional(version_of):
+    """
+    条件付きGETに対応するデコレータ（@jwt_required / @read_only の内側に付ける）
+    version_of: ビューの引数を受け取り (バージョン, 最終更新日時) または None を返す関数
+    （一覧のように削除で最終更新日時が変わらないものは、最終更新日時を None にする）
+    None の場合（見つからない・権限がない）はビューにそのまま任せる
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            state = version_of(**kwargs)
+            if state is None:
+                return fn(*args, **kwargs)
+
+            version, last_modified = state
+            etag = make_etag(get_jwt_identity(), request.full_path, version)
+            last_modified = _http_datetime(last_modified)
+            if _not_modified(etag, last_modified):
+                return _set_validators(current_app.response_class(status=304), etag, last_modified)
+
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200:
+                _set_validators(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
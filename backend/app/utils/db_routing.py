@@ -0,0 +1,204 @@
+# app/utils/db_routing.py
+"""
+読み取り専用エンドポイントのリードレプリカへの振り分け
+・@read_only を付けたビューの読み取りは SQLALCHEMY_BINDS['replica'] に送る
+・書き込み（flush / INSERT・UPDATE・DELETE）は常にプライマリ
+・書き込んだユーザーの読み取りは REPLICA_READ_YOUR_WRITES_SECONDS の間プライマリ（レプリカの遅延対策）
+  書き込みの記録は REPLICA_WRITE_MARKER_BACKEND に保存する
+  （sqlite: 同一ホストの gunicorn ワーカー・ジョブワーカー間で共有 / memory: プロセス内のみ）
+・レプリカに接続できない場合は REPLICA_FALLBACK（primary: プライマリで読む / error: 503）
+"""
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, jsonify
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+REPLICA_BIND = 'replica'
+
+
+class InProcessWriteMarkers:
+    """プロセス内の書き込み記録（単一プロセスで動かす場合のみ）"""
+
+    def __init__(self):
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id, until):
+        with self._lock:
+            self._until[user_id] = max(until, self._until.get(user_id, 0))
+
+    def until(self, user_id):
+        with self._lock:
+            return self._until.get(user_id)
+
+
+class SQLiteWriteMarkers:
+    """
+    SQLiteファイルを使った書き込み記録（同一ホストの複数プロセスで共有）
+    ・接続はスレッドごとに使い回す（リクエストごとに開き直さない）
+    ・期限切れの記録は prune_interval 秒に1回まとめて削除する
+    """
+
+    def __init__(self, path, prune_interval=60.0):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._next_prune = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            # WAL はデータベースファイルに保存されるので初期化時に1回だけ設定する
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS write_markers ('
+                ' user_id TEXT PRIMARY KEY,'
+                ' until REAL NOT NULL)'
+            )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _connection(self):
+        """スレッドごとの接続（fork 後は親プロセスの接続を使わない）"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return conn
+
+    def mark(self, user_id, until):
+        conn = self._connection()
+        conn.execute(
+            'INSERT INTO write_markers (user_id, until) VALUES (?, ?) '
+            'ON CONFLICT (user_id) DO UPDATE SET until = MAX(until, excluded.until)',
+            (user_id, until)
+        )
+        now = time.time()
+        if now >= self._next_prune:
+            self._next_prune = now + self.prune_interval
+            conn.execute('DELETE FROM write_markers WHERE until < ?', (now,))
+
+    def until(self, user_id):
+        row = self._connection().execute(
+            'SELECT until FROM write_markers WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self.markers = None
+        self._health = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.extensions['replica_router'] = self
+        if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+            return
+        backend = app.config.get('REPLICA_WRITE_MARKER_BACKEND', 'sqlite')
+        if backend == 'sqlite':
+            self.markers = SQLiteWriteMarkers(app.config['REPLICA_WRITE_MARKER_SQLITE_PATH'])
+        elif backend == 'memory':
+            self.markers = InProcessWriteMarkers()
+        else:
+            raise ValueError(f'Unknown REPLICA_WRITE_MARKER_BACKEND: {backend}')
+        app.after_request(self._after_request)
+
+    # --- read-your-writes ---
+
+    def mark_write(self, user_id):
+        """ユーザーが書き込んだことを記録（しばらくの間、そのユーザーの読み取りはプライマリ）"""
+        if user_id is None or self.markers is None:
+            return
+        seconds = current_app.config.get('REPLICA_READ_YOUR_WRITES_SECONDS', 5)
+        # 他のプロセスと比較するため monotonic ではなく壁時計の時刻を使う
+        self.markers.mark(str(user_id), time.time() + seconds)
+
+    def wrote_recently(self, user_id):
+        if user_id is None or self.markers is None:
+            return False
+        until = self.markers.until(str(user_id))
+        return until is not None and until >= time.time()
+
+    def _after_request(self, response):
+        if g.get('db_wrote'):
+            self.mark_write(_current_identity())
+        return response
+
+    # --- レプリカの死活監視 ---
+
+    def replica_available(self, engine):
+        """接続確認の結果を REPLICA_HEALTH_CHECK_INTERVAL 秒キャッシュする"""
+        interval = current_app.config.get('REPLICA_HEALTH_CHECK_INTERVAL', 5)
+        now = time.monotonic()
+        with self._lock:
+            checked = self._health.get(engine)
+            if checked is not None and now - checked[0] < interval:
+                return checked[1]
+
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            available = True
+        except Exception as e:
+            current_app.logger.warning(f"Read replica unavailable: {str(e)}")
+            available = False
+
+        with self._lock:
+            self._health[engine] = (now, available)
+        return available
+
+    def reset(self):
+        with self._lock:
+            self.markers = None
+            self._health = {}
+
+
+replica_router = ReplicaRouter()
+
+
+def _current_identity():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # JWTを検証していないリクエスト
+        return None
+
+
+class RoutingSession(Session):
+    """@read_only のリクエスト内の読み取りだけをレプリカに送るセッション"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or getattr(clause, 'is_dml', False):
+                g.db_wrote = True
+            elif g.get('db_read_only') and not g.get('db_wrote'):
+                engine = self._db.engines.get(REPLICA_BIND)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(fn):
+    """
+    読み取りのみのビューに付けるデコレータ（@jwt_required / @admin_required の内側に付ける）
+    直近に書き込んだユーザーのリクエストはプライマリのまま
+    """
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        from app import db
+        engine = db.engines.get(REPLICA_BIND)
+        if engine is not None and not replica_router.wrote_recently(_current_identity()):
+            if replica_router.replica_available(engine):
+                g.db_read_only = True
+            elif current_app.config.get('REPLICA_FALLBACK', 'primary') != 'primary':
+                return jsonify({'error': 'Read replica is unavailable'}), 503
+        return fn(*args, **kwargs)
+    return decorator
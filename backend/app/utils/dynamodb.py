@@ -1,19 +1,36 @@
 # app/utils/dynamodb.py
-import boto3
-import os
 from datetime import datetime, timedelta, timezone
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
+from app.utils.aws import aws_clients
+from app.utils.dynamodb_writer import batch_writer
 
 load_dotenv()
 
+# バッチ書き込みでまとめるテーブルと、バッファ内で同じ項目をまとめるための主キー
+# （キャッシュのみ。DesignRequests はAPIが202を返す前に確実に書き込むため、また
+#   他のワーカーのポーリングから見えるよう常に同期で書き込む）
+BUFFERED_TABLE_KEYS = {
+    'DesignCache': ('design_id',),
+    'TranslationCache': ('cache_key',),
+}
+
 class DynamoDBClient:
     def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION')
-        )
+        self.dynamodb = aws_clients.resource('dynamodb')
+
+    def _put_item(self, table_name, item):
+        """項目を書き込む（バッチ書き込みが有効なキャッシュのテーブルはバッファに追加するだけで None を返す）"""
+        if batch_writer.enabled and table_name in BUFFERED_TABLE_KEYS:
+            batch_writer.put(table_name, item, tuple(item[name] for name in BUFFERED_TABLE_KEYS[table_name]))
+            return None
+
+        table = self.dynamodb.Table(table_name)
+        try:
+            return table.put_item(Item=item)
+        except ClientError as e:
+            print(e.response['Error']['Message'])
+            raise
         
     def create_design_requests_table(self):
         table = self.dynamodb.create_table(
@@ -64,44 +81,109 @@ class DynamoDBClient:
         )
         return table
 
+    def create_translation_cache_table(self):
+        table = self.dynamodb.create_table(
+            TableName='TranslationCache',
+            KeySchema=[
+                {'AttributeName': 'cache_key', 'KeyType': 'HASH'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'cache_key', 'AttributeType': 'S'}
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        return table
+
     def store_design_request(self, request_id, user_id, prompt):
-        table = self.dynamodb.Table('DesignRequests')
         timestamp = int(datetime.now(timezone.utc).timestamp())
         expiration_time = int((datetime.now(timezone.utc) + timedelta(days=1)).timestamp())
-        
+
+        return self._put_item('DesignRequests', {
+            'request_id': request_id,
+            'user_id': user_id,
+            'prompt': prompt,
+            'status': 'pending',
+            'created_at': timestamp,
+            'expiration_time': expiration_time
+        })
+
+    def cache_design(self, design_id, image_url):
+        timestamp = int(datetime.now(timezone.utc).timestamp())
+        expiration_time = int((datetime.now(timezone.utc) + timedelta(days=7)).timestamp())
+
+        return self._put_item('DesignCache', {
+            'design_id': design_id,
+            'image_url': image_url,
+            'created_at': timestamp,
+            'access_count': 0,
+            'last_accessed': timestamp,
+            'expiration_time': expiration_time
+        })
+
+    def update_design_request_status(self, request_id, user_id, status, **attributes):
+        """生成リクエストのステータスを更新（pending → running → done / failed）"""
+        table = self.dynamodb.Table('DesignRequests')
+        timestamp = int(datetime.now(timezone.utc).timestamp())
+
+        names = {'#status': 'status'}
+        values = {':status': status, ':updated_at': timestamp}
+        expressions = ['#status = :status', 'updated_at = :updated_at']
+        for key, value in attributes.items():
+            names[f'#{key}'] = key
+            values[f':{key}'] = value
+            expressions.append(f'#{key} = :{key}')
+
         try:
-            response = table.put_item(
-                Item={
-                    'request_id': request_id,
-                    'user_id': user_id,
-                    'prompt': prompt,
-                    'status': 'pending',
-                    'created_at': timestamp,
-                    'expiration_time': expiration_time
-                }
+            response = table.update_item(
+                Key={'request_id': request_id, 'user_id': user_id},
+                UpdateExpression='SET ' + ', '.join(expressions),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
             )
             return response
         except ClientError as e:
             print(e.response['Error']['Message'])
             raise
 
-    def cache_design(self, design_id, image_url):
-        table = self.dynamodb.Table('DesignCache')
-        timestamp = int(datetime.now(timezone.utc).timestamp())
-        expiration_time = int((datetime.now(timezone.utc) + timedelta(days=7)).timestamp())
-        
+    def get_design_request(self, request_id, user_id):
+        """生成リクエストを取得（存在しない場合はNone）"""
+        table = self.dynamodb.Table('DesignRequests')
+
         try:
-            response = table.put_item(
-                Item={
-                    'design_id': design_id,
-                    'image_url': image_url,
-                    'created_at': timestamp,
-                    'access_count': 0,
-                    'last_accessed': timestamp,
-                    'expiration_time': expiration_time
-                }
+            response = table.get_item(
+                Key={'request_id': request_id, 'user_id': user_id}
             )
-            return response
+            return response.get('Item')
         except ClientError as e:
             print(e.response['Error']['Message'])
-            raise
\ No newline at end of file
+            raise
+
+
+    def cache_translation(self, cache_key, translated_text, ttl_seconds=60 * 60 * 24 * 30):
+        timestamp = int(datetime.now(timezone.utc).timestamp())
+        expiration_time = timestamp + int(ttl_seconds)
+
+        return self._put_item('TranslationCache', {
+            'cache_key': cache_key,
+            'translated_text': translated_text,
+            'created_at': timestamp,
+            'expiration_time': expiration_time
+        })
+
+    def get_translation(self, cache_key):
+        """キャッシュされた翻訳を取得（TTL切れで未削除の項目は無視）"""
+        table = self.dynamodb.Table('TranslationCache')
+        timestamp = int(datetime.now(timezone.utc).timestamp())
+
+        try:
+            response = table.get_item(Key={'cache_key': cache_key})
+            item = response.get('Item')
+            if not item or int(item.get('expiration_time', 0)) <= timestamp:
+                return None
+            return item['translated_text']
+        except ClientError as e:
+            print(e.response['Error']['Message'])
+            raise
@@ -0,0 +1,208 @@
+# app/utils/dynamodb_writer.py
+import atexit
+import logging
+import random
+import threading
+import time
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import BotoCoreError, ClientError
+from app.utils.aws import aws_clients
+
+logger = logging.getLogger(__name__)
+
+# BatchWriteItem 1回あたりの最大件数（DynamoDBの上限）
+BATCH_SIZE = 25
+# 再送で回復し得るエラー（スロットリング・一時的な障害）。それ以外（ValidationException 等）は再送しない
+RETRYABLE_ERRORS = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable',
+}
+
+
+class DynamoDBBatchWriter:
+    """
+    DynamoDBへの書き込み（PutItem）をまとめて BatchWriteItem で送るバックグラウンドライター
+    ・テーブルごとにバッファし、25件たまるか最初の項目から flush_interval 秒経つと送信する
+    ・同じキーの項目はバッファ内で上書きする（1回の BatchWriteItem に同じキーは含められないため）
+    ・UnprocessedItems・スロットリング等は指数バックオフで再送し、max_retries 回を超えたものはログに残して破棄する
+    ・再送しても直らないエラー（不正な項目など）はバッチを1件ずつに分けて送り直し、原因の項目だけを破棄する
+    ・キャッシュ用のテーブルのみに使う（破棄されても次回の読み取りでミスになるだけ）
+    ・書き込みスレッドは最初の put 時に起動し、プロセス終了時（atexit）に残りを送信する
+    ・同じ項目を読み取る・更新する前には flush(table) で送信を済ませる
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.flush_interval = 0.2
+        self.max_pending = 1000
+        self.max_retries = 5
+        self.backoff = 0.05
+        self.max_backoff = 2.0
+        self._buffers = {}
+        self._first_at = None
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+        # 送信は1スレッドずつ（同期 flush とバックグラウンドの送信の順序を保つ）
+        self._flush_lock = threading.Lock()
+        self._serializer = TypeSerializer()
+        self._stats = {'puts': 0, 'batches': 0, 'written': 0, 'retries': 0, 'dropped': 0}
+
+    def init_app(self, app):
+        self.enabled = app.config.get('DYNAMODB_BATCH_WRITES', True)
+        self.flush_interval = app.config.get('DYNAMODB_BATCH_FLUSH_INTERVAL', 0.2)
+        self.max_pending = app.config.get('DYNAMODB_BATCH_MAX_PENDING', 1000)
+        self.max_retries = app.config.get('DYNAMODB_BATCH_MAX_RETRIES', 5)
+        self.backoff = app.config.get('DYNAMODB_BATCH_BACKOFF', 0.05)
+        app.extensions['dynamodb_writer'] = self
+
+    def put(self, table_name, item, key):
+        """項目をバッファに追加（key はテーブルの主キーの値のタプル）"""
+        request = {'PutRequest': {'Item': {
+            name: self._serializer.serialize(value) for name, value in item.items()
+        }}}
+        with self._cond:
+            first = not self._buffers
+            if first:
+                self._first_at = time.monotonic()
+            self._buffers.setdefault(table_name, {})[key] = request
+            self._stats['puts'] += 1
+            pending = self._pending_locked()
+            closed = self._closed
+            if first or len(self._buffers[table_name]) >= BATCH_SIZE:
+                # 書き込みスレッドの待ち時間を設定し直す / すぐに送信させる
+                self._cond.notify()
+
+        if closed or pending > self.max_pending:
+            # 終了処理後・送信が追いつかない場合は呼び出し元で送信する
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def flush(self, table_name=None):
+        """バッファの項目を送信（table_name を指定した場合はそのテーブルのみ）。破棄した件数を返す"""
+        with self._flush_lock:
+            with self._cond:
+                if table_name is None:
+                    buffers, self._buffers = self._buffers, {}
+                else:
+                    buffers = {table_name: self._buffers.pop(table_name)} if table_name in self._buffers else {}
+                if not self._buffers:
+                    self._first_at = None
+            requests = [
+                (name, request) for name, items in buffers.items() for request in items.values()
+            ]
+            dropped = 0
+            for start in range(0, len(requests), BATCH_SIZE):
+                request_items = {}
+                for name, request in requests[start:start + BATCH_SIZE]:
+                    request_items.setdefault(name, []).append(request)
+                dropped += self._write_batch(request_items)
+            return dropped
+
+    def close(self, timeout=5.0):
+        """書き込みスレッドを止めて残りを送信（シャットダウン用）"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    def pending_count(self):
+        with self._cond:
+            return self._pending_locked()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats['pending'] = self._pending_locked()
+        return stats
+
+    def _pending_locked(self):
+        return sum(len(items) for items in self._buffers.values())
+
+    def _write_batch(self, request_items):
+        """1回分（25件以内）を送信し、UnprocessedItems をバックオフしながら再送する"""
+        count = sum(len(requests) for requests in request_items.values())
+        attempt = 0
+        while True:
+            try:
+                response = aws_clients.client('dynamodb').batch_write_item(RequestItems=request_items)
+                request_items = response.get('UnprocessedItems') or {}
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') not in RETRYABLE_ERRORS:
+                    return self._isolate(request_items, e)
+                # スロットリング等（botocoreの再試行後）も UnprocessedItems と同じく再送する
+                logger.warning(f'DynamoDB batch write error: {e}')
+            except BotoCoreError as e:
+                # 接続エラー等
+                logger.warning(f'DynamoDB batch write error: {e}')
+            unprocessed = sum(len(requests) for requests in request_items.values())
+            with self._cond:
+                self._stats['batches'] += 1
+                self._stats['written'] += count - unprocessed
+            if not unprocessed:
+                return 0
+            if attempt >= self.max_retries:
+                logger.error(f'Dropped {unprocessed} DynamoDB writes after {attempt} retries')
+                with self._cond:
+                    self._stats['dropped'] += unprocessed
+                return unprocessed
+
+            attempt += 1
+            count = unprocessed
+            with self._cond:
+                self._stats['retries'] += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def _isolate(self, request_items, error):
+        """再送しても直らないエラーのバッチを1件ずつ送り直し、失敗した項目だけを破棄する。破棄した件数を返す"""
+        requests = [(name, request) for name, items in request_items.items() for request in items]
+        if len(requests) > 1:
+            return sum(self._write_batch({name: [request]}) for name, request in requests)
+
+        name, request = requests[0]
+        logger.error(f'Dropped DynamoDB write to {name}: {error}')
+        with self._cond:
+            self._stats['batches'] += 1
+            self._stats['dropped'] += 1
+        return 1
+
+    def _ensure_thread(self):
+        with self._cond:
+            if self._closed or (self._thread is not None and self._thread.is_alive()):
+                return
+            if self._thread is None:
+                atexit.register(self.close)
+            self._thread = threading.Thread(target=self._run, name='dynamodb-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if any(len(items) >= BATCH_SIZE for items in self._buffers.values()):
+                        break
+                    if self._first_at is None:
+                        self._cond.wait()
+                        continue
+                    remaining = self._first_at + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                closed = self._closed
+            try:
+                self.flush()
+            except Exception as e:
+                logger.exception(f'DynamoDB batch writer failed: {e}')
+            if closed:
+                return
+
+
+batch_writer = DynamoDBBatchWriter()
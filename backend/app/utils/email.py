@@ -1,19 +1,14 @@
 # app/utils/email.py
-import boto3
 from botocore.exceptions import ClientError
 from flask import current_app
 from jinja2 import Template
 import logging
+from app.utils.aws import aws_clients
 
 class EmailService:
    @staticmethod
    def _get_ses_client():
-       return boto3.client(
-           'ses',
-           aws_access_key_id=current_app.config['AWS_ACCESS_KEY_ID'],
-           aws_secret_access_key=current_app.config['AWS_SECRET_ACCESS_KEY'],
-           region_name=current_app.config['AWS_REGION']
-       )
+       return aws_clients.client('ses')
 
    @staticmethod
    def _get_order_template_html(order, lang='ja', is_admin_copy=False):
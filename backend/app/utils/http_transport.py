@@ -0,0 +1,202 @@
+# app/utils/http_transport.py
+import logging
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError
+from flask import current_app, has_app_context
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# リトライ対象のステータスコード（レート制限・サーバーエラー）
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# 送信後のエラーでも再送してよいメソッド（POSTは課金が二重になり得るので接続確立前のエラー時のみ再送）
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+# 冪等でないメソッドでも再送してよいステータス（処理されずに拒否されたことが明らかなもの）
+UNPROCESSED_STATUSES = {429, 503}
+
+
+def _is_connect_error(error):
+    """接続確立前の失敗か（リクエストがサーバーに届いていないことが確実なもの）"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    # NewConnectionError・NameResolutionError は ConnectTimeoutError のサブクラス
+    return isinstance(reason, ConnectTimeoutError)
+
+
+class CircuitOpenError(Exception):
+    """プロバイダが不調のため呼び出しを遮断している場合の例外"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    連続失敗が閾値を超えたら一定時間呼び出しを遮断する
+    closed → open（遮断）→ half_open（1件だけ試行）→ closed
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._trial_in_flight = False
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """成功・失敗を記録せずに終わった試行（想定外の例外など）の枠を解放"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class HttpTransport:
+    """
+    外部AI APIの共通HTTPトランスポート
+    ・Keep-Aliveのコネクションプール（プロセス内で共有）
+    ・接続/読み取りタイムアウト
+    ・429/5xx・接続エラー時のジッター付き指数バックオフ
+      （冪等でないメソッドは接続確立前のエラーと 429/503 のみ）
+    ・サーキットブレーカー
+    """
+
+    def __init__(self, name, pool_maxsize=10, connect_timeout=5.0, read_timeout=60.0,
+                 max_retries=3, backoff_base=0.5, backoff_max=8.0,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        # Full jitter: 0 〜 base * 2^attempt の範囲でランダムに待機
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """リトライ・サーキットブレーカー付きでリクエストを送信"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f'{self.name} is unavailable (circuit open)')
+        try:
+            return self._request_with_retries(method, url, timeout, **kwargs)
+        finally:
+            self.breaker.release_trial()
+
+    def _request_with_retries(self, method, url, timeout, **kwargs):
+        timeout = timeout or (self.connect_timeout, self.read_timeout)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else UNPROCESSED_STATUSES
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not (idempotent or _is_connect_error(e)):
+                    self.breaker.record_failure()
+                    raise
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.record_success()
+                    return response
+                if response.status_code not in retry_statuses:
+                    self.breaker.record_failure()
+                    return response
+                error = requests.HTTPError(f'{response.status_code} from {self.name}', response=response)
+
+            if attempt >= self.max_retries:
+                self.breaker.record_failure()
+                if response is not None:
+                    # 呼び出し側の raise_for_status() でエラー内容を扱えるようにそのまま返す
+                    return response
+                raise error
+
+            delay = self._backoff(attempt, response)
+            logger.warning(f'{self.name} request failed ({error}), retrying in {delay:.2f}s')
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def _setting(key):
+    if has_app_context():
+        return current_app.config.get(key, getattr(Config, key))
+    return getattr(Config, key)
+
+
+def get_transport(name):
+    """プロバイダごとのトランスポートを取得（プロセス内で1つだけ作成）"""
+    transport = _transports.get(name)
+    if transport is not None:
+        return transport
+
+    with _transports_lock:
+        if name not in _transports:
+            read_timeouts = _setting('HTTP_READ_TIMEOUTS')
+            _transports[name] = HttpTransport(
+                name,
+                pool_maxsize=_setting('HTTP_POOL_MAXSIZE'),
+                connect_timeout=_setting('HTTP_CONNECT_TIMEOUT'),
+                read_timeout=read_timeouts.get(name, read_timeouts['default']),
+                max_retries=_setting('HTTP_MAX_RETRIES'),
+                failure_threshold=_setting('CIRCUIT_BREAKER_FAILURE_THRESHOLD'),
+                reset_timeout=_setting('CIRCUIT_BREAKER_RESET_TIMEOUT')
+            )
+        return _transports[name]
@@ -0,0 +1,303 @@
+# app/utils/job_queue.py
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """キューが上限に達している場合の例外"""
+    pass
+
+
+class InProcessJobQueue:
+    """プロセス内メモリキュー（ワーカーと同一プロセスでのみ共有）"""
+
+    def __init__(self, maxsize=0):
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, job_id, name, payload):
+        try:
+            self._queue.put_nowait((job_id, name, payload))
+        except queue.Full:
+            raise JobQueueFull('Job queue is full')
+
+    def get(self, timeout=1.0):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def heartbeat(self, job_id):
+        pass
+
+    def complete(self, job_id, status):
+        self._queue.task_done()
+
+    def pending_count(self):
+        return self._queue.unfinished_tasks
+
+
+class SQLiteJobQueue:
+    """
+    SQLiteファイルを使った永続キュー（同一ホストの複数ワーカーで共有可能）
+    ・lease_seconds を過ぎても 'running' のままのジョブは、プロセスが落ちたものとみなして再実行する
+    ・完了（done / failed）から retention_seconds を過ぎたジョブは削除する
+    """
+
+    def __init__(self, path, maxsize=0, poll_interval=0.5, lease_seconds=900, retention_seconds=86400):
+        self.path = path
+        self.maxsize = maxsize
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                ' id TEXT PRIMARY KEY,'
+                ' name TEXT NOT NULL,'
+                ' payload TEXT NOT NULL,'
+                ' status TEXT NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_jobs_status_created ON jobs (status, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_jobs_status_updated ON jobs (status, updated_at)')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _reclaim_stale(self, conn, now):
+        """リースが切れた 'running' ジョブを 'pending' に戻す（書き込みトランザクション内で呼ぶ）"""
+        reclaimed = conn.execute(
+            "UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'running' AND updated_at < ?",
+            (now, now - self.lease_seconds)
+        ).rowcount
+        if reclaimed:
+            logger.warning(f'Reclaimed {reclaimed} stale running job(s)')
+
+    def _prune_finished(self, conn, now):
+        """保持期間を過ぎた完了済みジョブを削除する"""
+        conn.execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?",
+            (now - self.retention_seconds,)
+        )
+
+    def put(self, job_id, name, payload):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            self._reclaim_stale(conn, now)
+            if self.maxsize:
+                (pending,) = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'running')"
+                ).fetchone()
+                if pending >= self.maxsize:
+                    conn.execute('ROLLBACK')
+                    raise JobQueueFull('Job queue is full')
+            conn.execute(
+                "INSERT INTO jobs (id, name, payload, status, created_at, updated_at) VALUES (?, ?, ?, 'pending', ?, ?)",
+                (job_id, name, json.dumps(payload), now, now)
+            )
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def get(self, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self._claim()
+            if job is not None:
+                return job
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def _claim(self):
+        conn = self._connect()
+        try:
+            # 他のワーカーと同じジョブを取得しないよう書き込みロックを取ってから確保する
+            conn.execute('BEGIN IMMEDIATE')
+            now = time.time()
+            self._reclaim_stale(conn, now)
+            row = conn.execute(
+                "SELECT id, name, payload FROM jobs WHERE status = 'pending' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ?",
+                (now, row[0])
+            )
+            conn.execute('COMMIT')
+            return row[0], row[1], json.loads(row[2])
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id):
+        """実行中ジョブのリースを延長する（ワーカーが処理中に定期的に呼ぶ）"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), job_id)
+            )
+        finally:
+            conn.close()
+
+    def complete(self, job_id, status):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?',
+                (status, now, job_id)
+            )
+            self._prune_finished(conn, now)
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def pending_count(self):
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            self._reclaim_stale(conn, time.time())
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'running')"
+            ).fetchone()
+            conn.execute('COMMIT')
+            return count
+        finally:
+            conn.close()
+
+
+class JobManager:
+    """
+    バックグラウンドジョブの管理
+    ・ハンドラは名前で登録し、ペイロードはJSONに変換できる値のみとする
+    ・ワーカースレッドは最初のsubmit時に起動する（マイグレーション等では起動しない）
+    """
+
+    def __init__(self):
+        self.app = None
+        self.backend = None
+        self.handlers = {}
+        self.num_workers = 0
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        backend_name = app.config.get('JOB_QUEUE_BACKEND', 'memory')
+        maxsize = app.config.get('JOB_QUEUE_MAXSIZE', 0)
+        if backend_name == 'sqlite':
+            self.backend = SQLiteJobQueue(
+                app.config['JOB_QUEUE_SQLITE_PATH'],
+                maxsize=maxsize,
+                lease_seconds=app.config.get('JOB_QUEUE_LEASE_SECONDS', 900),
+                retention_seconds=app.config.get('JOB_QUEUE_RETENTION_SECONDS', 86400)
+            )
+        elif backend_name == 'memory':
+            self.backend = InProcessJobQueue(maxsize=maxsize)
+        else:
+            raise ValueError(f'Unknown JOB_QUEUE_BACKEND: {backend_name}')
+        self.num_workers = app.config.get('JOB_QUEUE_WORKERS', 4)
+        app.extensions['job_manager'] = self
+
+    @property
+    def in_process(self):
+        """ワーカーが同じプロセスで動くか（memory の場合のみ）"""
+        return isinstance(self.backend, InProcessJobQueue)
+
+    def task(self, name):
+        """ジョブハンドラを登録するデコレータ"""
+        def decorator(fn):
+            self.handlers[name] = fn
+            return fn
+        return decorator
+
+    def submit(self, name, job_id, payload):
+        """ジョブをキューに追加"""
+        if name not in self.handlers:
+            raise ValueError(f'Unknown job: {name}')
+        self._ensure_workers()
+        self.backend.put(job_id, name, payload)
+
+    def join(self, timeout=None):
+        """キューが空になるまで待機（テスト・シャットダウン用）"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.backend.pending_count() > 0:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.num_workers:
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    name=f'job-worker-{len(self._threads)}',
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker_loop(self):
+        while True:
+            backend, app = self.backend, self.app
+            job = backend.get(timeout=1.0)
+            if job is None:
+                continue
+            job_id, name, payload = job
+            status = 'done'
+            stop = self._start_heartbeat(backend, job_id)
+            try:
+                with app.app_context():
+                    self.handlers[name](job_id, payload)
+            except Exception as e:
+                status = 'failed'
+                logger.exception(f'Job {name} ({job_id}) failed: {e}')
+            finally:
+                stop.set()
+                backend.complete(job_id, status)
+
+    def _start_heartbeat(self, backend, job_id):
+        """
+        処理中はリース期間の 1/3 ごとにリースを延長する
+        （長時間のジョブが他のワーカーに再確保されないようにする）
+        """
+        stop = threading.Event()
+        lease_seconds = getattr(backend, 'lease_seconds', None)
+        if not lease_seconds:
+            return stop
+
+        def beat():
+            while not stop.wait(lease_seconds / 3):
+                try:
+                    backend.heartbeat(job_id)
+                except Exception as e:
+                    logger.warning(f'Job heartbeat failed ({job_id}): {e}')
+
+        threading.Thread(target=beat, name=f'job-heartbeat-{job_id}', daemon=True).start()
+        return stop
+
+
+job_manager = JobManager()
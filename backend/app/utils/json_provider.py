@@ -0,0 +1,65 @@
+# app/utils/json_provider.py
+"""
+orjson を使うFlaskのJSONプロバイダー
+・datetime / date は ISO 8601、Decimal は文字列（Flaskの既定と同じ）で出力
+・orjson が扱えない値（64bitを超える整数など）は標準の json にフォールバック
+・orjson がインストールされていない場合は Flask の既定のプロバイダーを使う
+"""
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson は任意
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    return DefaultJSONProvider.default(value)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    # orjson は常にUTF-8で出力する（ensure_ascii は標準の json へのフォールバック時のみ）
+
+    def _options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumpb(self, obj, indent=False):
+        try:
+            return orjson.dumps(obj, default=_default, option=self._options(indent))
+        except orjson.JSONEncodeError:
+            return None
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            data = self._dumpb(obj)
+            if data is not None:
+                return data.decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        data = self._dumpb(obj, indent=indent)
+        if data is None:
+            return super().response(obj)
+        return self._app.response_class(data + b'\n', mimetype=self.mimetype)
+
+
+def make_json_provider(app):
+    """JSON_PROVIDER（orjson / default）に応じたプロバイダー"""
+    if app.config.get('JSON_PROVIDER', 'orjson') == 'orjson' and orjson is not None:
+        return OrjsonProvider(app)
+    return DefaultJSONProvider(app)
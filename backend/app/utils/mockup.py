@@ -0,0 +1,217 @@
+# app/utils/mockup.py
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw, ImageFilter
+
+# Tシャツのカラー名（カート・注文の color の値）
+SHIRT_COLORS = {
+    'white': (245, 245, 245),
+    'black': (30, 30, 32),
+    'gray': (150, 150, 155),
+    'navy': (32, 42, 78),
+    'red': (190, 30, 45),
+    'blue': (40, 90, 180),
+    'green': (40, 120, 70),
+    'yellow': (240, 210, 60),
+    'pink': (240, 160, 190),
+}
+
+# テンプレートの基準サイズとプリント範囲（基準サイズに対する比率: left, top, right, bottom）
+TEMPLATE_SIZE = 1024
+PRINT_AREA = (0.32, 0.26, 0.68, 0.70)
+# design_config の許容範囲（scale は倍率、オフセットは基準サイズでのpx）
+SCALE_RANGE = (0.1, 4.0)
+MAX_OFFSET = TEMPLATE_SIZE
+
+
+def parse_color(color):
+    """カラー名または#rrggbbをRGBに変換"""
+    if not color:
+        return SHIRT_COLORS['white']
+    key = color.strip().lower()
+    if key in SHIRT_COLORS:
+        return SHIRT_COLORS[key]
+    try:
+        return ImageColor.getrgb(color)[:3]
+    except ValueError:
+        raise ValueError(f'Unknown color: {color}')
+
+
+def _finite(value, name):
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f'{name} must be a finite number')
+    return value
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def normalize_config(config):
+    """
+    design_config（{position, scale, rotation}）を正規化
+    NaN/inf は ValueError、範囲外の値は描画サイズが膨らまないよう許容範囲に丸める
+    """
+    config = config or {}
+    position = config.get('position') or {}
+    return {
+        'x': _clamp(_finite(position.get('x', 0), 'position.x'), -MAX_OFFSET, MAX_OFFSET),
+        'y': _clamp(_finite(position.get('y', 0), 'position.y'), -MAX_OFFSET, MAX_OFFSET),
+        'scale': _clamp(_finite(config.get('scale', 1.0), 'scale'), *SCALE_RANGE),
+        'rotation': _finite(config.get('rotation', 0), 'rotation') % 360,
+    }
+
+
+@lru_cache(maxsize=8)
+def _shirt_template(size):
+    """
+    Tシャツのシルエット（アルファ）と陰影マップを生成
+    返り値: (mask, shading) いずれも float32 の (size, size) 配列（0〜1）
+    """
+    s = TEMPLATE_SIZE
+    outline = [
+        (0.36, 0.08), (0.44, 0.12), (0.56, 0.12), (0.64, 0.08),   # 襟
+        (0.86, 0.17), (0.97, 0.38), (0.83, 0.44), (0.78, 0.36),   # 右袖
+        (0.78, 0.95), (0.22, 0.95),                               # 裾
+        (0.22, 0.36), (0.17, 0.44), (0.03, 0.38), (0.14, 0.17),   # 左袖
+    ]
+    mask_image = Image.new('L', (s, s), 0)
+    draw = ImageDraw.Draw(mask_image)
+    draw.polygon([(x * s, y * s) for x, y in outline], fill=255)
+    # 襟ぐり
+    draw.ellipse((0.42 * s, 0.04 * s, 0.58 * s, 0.16 * s), fill=0)
+    mask_image = mask_image.filter(ImageFilter.GaussianBlur(1.5)).resize((size, size), Image.LANCZOS)
+
+    # 布の陰影: 縦方向のグラデーション + 脇のしわ
+    ys, xs = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    shading = 0.92 + 0.08 * (1 - ys)
+    shading -= 0.10 * np.exp(-((xs - 0.25) ** 2) / 0.002) * (ys > 0.4)
+    shading -= 0.10 * np.exp(-((xs - 0.75) ** 2) / 0.002) * (ys > 0.4)
+    shading -= 0.05 * np.exp(-((ys - 0.12) ** 2) / 0.001)
+    shading = np.clip(shading, 0.0, 1.0).astype(np.float32)
+
+    mask = np.asarray(mask_image, dtype=np.float32) / 255.0
+    return mask, shading
+
+
+def render_mockup(design_image, color, config, size=512):
+    """
+    デザイン画像（PNGのbytes）をTシャツに合成し、PNGのbytesを返す
+    config: design_config（position はプリント範囲中央からのオフセット（px、基準サイズ1024）、scale は倍率、rotation は度）
+    """
+    rgb = np.array(parse_color(color), dtype=np.float32)
+    config = normalize_config(config)
+    mask, shading = _shirt_template(size)
+
+    # 無地のTシャツ（カラー × 陰影）
+    shirt = shading[..., None] * rgb[None, None, :]
+
+    ratio = size / TEMPLATE_SIZE
+    left, top, right, bottom = (int(v * size) for v in PRINT_AREA)
+    area_w, area_h = right - left, bottom - top
+
+    with Image.open(BytesIO(design_image)) as source:
+        design = source.convert('RGBA')
+        # プリント範囲に収まるサイズを基準に scale を適用
+        fit = min(area_w / design.width, area_h / design.height) * config['scale']
+        width = max(1, int(design.width * fit))
+        height = max(1, int(design.height * fit))
+        design = design.resize((width, height), Image.BILINEAR)
+        if config['rotation']:
+            design = design.rotate(-config['rotation'], resample=Image.BILINEAR, expand=True)
+
+    # 配置位置（プリント範囲の中央 + オフセット）
+    cx = left + area_w / 2 + config['x'] * ratio
+    cy = top + area_h / 2 + config['y'] * ratio
+    x0 = int(round(cx - design.width / 2))
+    y0 = int(round(cy - design.height / 2))
+
+    # Tシャツの範囲外にはみ出した部分を切り取る
+    sx0, sy0 = max(0, -x0), max(0, -y0)
+    dx0, dy0 = max(0, x0), max(0, y0)
+    dx1 = min(size, x0 + design.width)
+    dy1 = min(size, y0 + design.height)
+
+    if dx1 > dx0 and dy1 > dy0:
+        patch = np.asarray(design, dtype=np.float32)[sy0:sy0 + (dy1 - dy0), sx0:sx0 + (dx1 - dx0)]
+        # 布の陰影をデザインにも反映し、シルエットの外側には描かない
+        alpha = patch[..., 3:4] / 255.0 * mask[dy0:dy1, dx0:dx1, None]
+        ink = patch[..., :3] * shading[dy0:dy1, dx0:dx1, None]
+        region = shirt[dy0:dy1, dx0:dx1]
+        shirt[dy0:dy1, dx0:dx1] = ink * alpha + region * (1 - alpha)
+
+    output = np.empty((size, size, 4), dtype=np.uint8)
+    output[..., :3] = np.clip(shirt, 0, 255)
+    output[..., 3] = (mask * 255).astype(np.uint8)
+
+    buffer = BytesIO()
+    Image.fromarray(output, 'RGBA').save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def mockup_cache_key(design_id, s3_key, color, config, size):
+    source = json.dumps({
+        'design_id': design_id,
+        's3_key': s3_key,
+        'color': parse_color(color),
+        'config': normalize_config(config),
+        'size': size,
+    }, sort_keys=True)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+class ByteLRUCache:
+    """合計バイト数の上限で古いものから破棄するLRUキャッシュ"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self._items[key] = value
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._items),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+mockup_cache = ByteLRUCache(64 * 1024 * 1024)
+source_image_cache = ByteLRUCache(64 * 1024 * 1024)
@@ -0,0 +1,29 @@
+# app/utils/openai_client.py
+import os
+from dotenv import load_dotenv
+from app.utils.http_transport import get_transport
+
+load_dotenv()
+
+class OpenAIClient:
+    def __init__(self):
+        self.api_key = os.getenv('OPEN_API_KEY')
+        self.api_host = 'https://api.openai.com'
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        self.transport = get_transport('openai')
+
+    def chat_completion(self, messages, model="gpt-4o"):
+        """チャット補完を実行し、最初の候補のテキストを返す"""
+        response = self.transport.post(
+            f"{self.api_host}/v1/chat/completions",
+            headers=self.headers,
+            json={
+                "model": model,
+                "messages": messages
+            }
+        )
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content']
@@ -0,0 +1,137 @@
+# app/utils/pagination.py
+"""
+カーソル（キーセット）方式のページング
+・並び順のキー（例: created_at, id）の最後の値をカーソルにし、次ページは範囲条件で取得する
+  （OFFSETのように読み飛ばす行を数えないため、深いページでも速度が変わらない）
+・総件数は必要な場合だけ取得する（exact: COUNT(*) / estimate: PostgreSQLの実行計画の推定行数）
+"""
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from flask import request
+from sqlalchemy import literal, tuple_
+from sqlalchemy.types import NullType
+from app import db
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+TOTAL_MODES = ('none', 'exact', 'estimate')
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'dec': str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'dec' in value:
+            return Decimal(value['dec'])
+    return value
+
+
+def encode_cursor(values):
+    """キーの値のリストを不透明なカーソル文字列に変換"""
+    raw = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """カーソル文字列をキーの値のリストに戻す"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        return [_decode_value(value) for value in values]
+    except (ValueError, TypeError):
+        raise PaginationError('Invalid cursor')
+
+
+def pagination_args(default_limit=DEFAULT_LIMIT, default_total='none'):
+    """リクエストの cursor / limit（per_page）/ total を取得"""
+    limit = request.args.get('limit', type=int) or request.args.get('per_page', default_limit, type=int)
+    total = request.args.get('total', default_total)
+    if total not in TOTAL_MODES:
+        raise PaginationError(f'total must be one of {", ".join(TOTAL_MODES)}')
+    return request.args.get('cursor') or None, max(1, min(limit, MAX_LIMIT)), total
+
+
+def count_rows(query, mode):
+    """総件数（mode: none / exact / estimate）"""
+    if mode == 'none':
+        return None
+    query = query.order_by(None)
+    bind = db.session.get_bind()
+    if mode == 'estimate' and bind.dialect.name == 'postgresql':
+        # 実行計画の推定行数（テーブルを走査しない）
+        compiled = query.statement.compile(dialect=bind.dialect)
+        plan = db.session.connection().exec_driver_sql(
+            f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+        ).scalar()
+        return int(plan[0]['Plan']['Plan Rows'])
+    return query.count()
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, total):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def meta(self):
+        """レスポンスに含めるページ情報"""
+        return {
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+            'total': self.total
+        }
+
+
+def keyset_paginate(query, keys, cursor=None, limit=DEFAULT_LIMIT, descending=True,
+                    total='none', key_of=None):
+    """
+    keys の順（一意になるよう最後は id にする）でページングする
+    キーは NOT NULL の列にする（NULL は行値の比較から外れ、カーソルにも入れられないため）
+    key_of: 行からキーの値を取り出す関数（省略時は各キーの属性名で取得）
+    """
+    total_count = count_rows(query, total)
+
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        row_key = tuple_(*keys)
+        cursor_key = tuple_(*[
+            literal(value) if isinstance(key.type, NullType) else literal(value, key.type)
+            for key, value in zip(keys, values)
+        ])
+        query = query.filter(row_key < cursor_key if descending else row_key > cursor_key)
+        if len(keys) > 1:
+            # 先頭のキーだけの範囲条件も付ける（行値の比較ではPostgreSQLのパーティションの除外が効かないため）
+            lead = cursor_key.clauses[0]
+            query = query.filter(keys[0] <= lead if descending else keys[0] >= lead)
+
+    ordering = [key.desc() if descending else key.asc() for key in keys]
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = key_of(last) if key_of else [getattr(last, key.key) for key in keys]
+        next_cursor = encode_cursor(values)
+
+    return KeysetPage(rows, next_cursor, total_count)
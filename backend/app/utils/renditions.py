@@ -0,0 +1,40 @@
+# app/utils/renditions.py
+import os
+from io import BytesIO
+from PIL import Image
+
+
+def rendition_key(s3_key, width):
+    """元画像のキーの隣に置く派生画像のキー（例: designs/1/abc.png → designs/1/abc_w256.webp）"""
+    base, _ = os.path.splitext(s3_key)
+    return f'{base}_w{width}.webp'
+
+
+def build_renditions(image_data, widths, quality=80):
+    """PNGから指定幅のWebP画像を生成（{幅: bytes}）"""
+    with Image.open(BytesIO(image_data)) as source:
+        source = source.convert('RGBA')
+        renditions = {}
+        for width in sorted(widths, reverse=True):
+            if width >= source.width:
+                image = source
+            else:
+                height = round(source.height * width / source.width)
+                image = source.resize((width, height), Image.LANCZOS)
+            buffer = BytesIO()
+            image.save(buffer, format='WEBP', quality=quality, method=4)
+            renditions[width] = buffer.getvalue()
+        return renditions
+
+
+def render_and_upload(s3_client, s3_key, widths, image_data=None):
+    """派生画像を生成してS3にアップロードし、{幅(文字列): URL} を返す"""
+    if image_data is None:
+        image_data = s3_client.download_design(s3_key)
+
+    urls = {}
+    for width, data in build_renditions(image_data, widths).items():
+        urls[str(width)] = s3_client.upload_design(
+            data, rendition_key(s3_key, width), content_type='image/webp'
+        )
+    return urls
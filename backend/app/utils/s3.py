@@ -1,41 +1,74 @@
 # app/utils/s3.py
-import boto3
 import os
 from dotenv import load_dotenv
 import base64
+import io
 from io import BytesIO
+from boto3.s3.transfer import TransferConfig
+from app.utils.aws import aws_clients
 
 load_dotenv()
 
+class BufferReader(io.RawIOBase):
+    """bytearray / memoryview をコピーせずに読み出すためのファイルライクオブジェクト"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, target):
+        size = min(len(target), len(self._view) - self._pos)
+        target[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        self._pos = max(0, min(self._pos, len(self._view)))
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
 class S3Client:
     def __init__(self):
-        self.s3_client = boto3.client('s3',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION')
-        )
+        self.s3_client = aws_clients.client('s3')
         self.bucket_name = 'custome-tee-designs'  # 作成したバケット名
+        self.transfer_config = TransferConfig(
+            multipart_threshold=int(os.getenv('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024)),
+            multipart_chunksize=int(os.getenv('S3_MULTIPART_CHUNKSIZE', 8 * 1024 * 1024))
+        )
 
-    def upload_design(self, image_data, filename):
-        """デザイン画像をS3にアップロード"""
+    def upload_design(self, image_data, filename, content_type='image/png'):
+        """
+        デザイン画像をS3にアップロード
+        image_data: bytes / bytearray / memoryview / ファイルライクオブジェクト（旧形式のbase64文字列も可）
+        """
         try:
-            # base64データをバイナリに変換
-            if isinstance(image_data, str):
-                # base64文字列の場合、デコード
-                image_binary = base64.b64decode(image_data)
-            else:
-                # すでにバイナリの場合はそのまま使用
-                image_binary = image_data
-
-            # S3にアップロード
+            # S3に渡すファイルライクオブジェクトを用意（バイナリはコピーせずに参照する）
+            fileobj = self._as_fileobj(image_data)
+
+            # 大きい画像はマルチパートで並列アップロード
             self.s3_client.upload_fileobj(
-                BytesIO(image_binary),
+                fileobj,
                 self.bucket_name,
                 f'designs/{filename}',
                 ExtraArgs={
-                    'ContentType': 'image/png',
+                    'ContentType': content_type,
                     'ACL': 'public-read'
-                }
+                },
+                Config=self.transfer_config
             )
 
             # 公開URLを返す
@@ -45,6 +78,31 @@ class S3Client:
             print(f"S3 upload error: {str(e)}")
             raise
 
+    @staticmethod
+    def _as_fileobj(image_data):
+        if isinstance(image_data, str):
+            # base64文字列の場合、デコード（互換性のため）
+            return BytesIO(base64.b64decode(image_data))
+        if isinstance(image_data, bytes):
+            # BytesIOはbytesのバッファを書き込みまで共有するためコピーは発生しない
+            return BytesIO(image_data)
+        if isinstance(image_data, (bytearray, memoryview)):
+            return BufferReader(image_data)
+        # すでにファイルライクオブジェクトの場合はそのまま使用
+        return image_data
+
+    def download_design(self, filename):
+        """S3から画像を取得（bytes）"""
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=f'designs/{filename}'
+            )
+            return response['Body'].read()
+        except Exception as e:
+            print(f"S3 download error: {str(e)}")
+            raise
+
     def delete_design(self, filename):
         """S3から画像を削除"""
         try:
@@ -0,0 +1,116 @@
+# app/utils/search.py
+"""
+管理画面のユーザー・注文の部分一致検索
+・PostgreSQL: pg_trgm のGINインデックス（マイグレーションで作成）が ILIKE '%q%' に使われる
+・SQLite: FTS5（trigram）の検索用テーブルをトリガーで同期し、MATCHで検索する
+・注文IDの完全一致は主キーで直接引く
+"""
+from sqlalchemy import cast, event, select, text
+from app import db
+from app.models.order import Order
+from app.models.user import User
+
+# trigram は3文字未満の検索語では使えないため、その場合は通常のLIKEにする
+MIN_TRIGRAM_LENGTH = 3
+
+SQLITE_SEARCH_DDL = [
+    # users: 外部コンテンツ方式（本文は users テーブルを参照）
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_search USING fts5(
+        username, email, content='users', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_search(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_search(users_search, rowid, username, email) VALUES ('delete', old.id, old.username, old.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_au AFTER UPDATE OF username, email ON users BEGIN
+        INSERT INTO users_search(users_search, rowid, username, email) VALUES ('delete', old.id, old.username, old.email);
+        INSERT INTO users_search(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+    # orders: 注文IDの文字列を rowid = 注文ID で保持
+    """CREATE VIRTUAL TABLE IF NOT EXISTS orders_search USING fts5(ref, tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS orders_search_ai AFTER INSERT ON orders BEGIN
+        INSERT INTO orders_search(rowid, ref) VALUES (new.id, CAST(new.id AS TEXT));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS orders_search_ad AFTER DELETE ON orders BEGIN
+        DELETE FROM orders_search WHERE rowid = old.id;
+    END""",
+]
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_sqlite_search(target, connection, **kwargs):
+    """db.create_all() でSQLiteの検索用テーブルも作成（本番はマイグレーションで作成）"""
+    if connection.dialect.name == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_sqlite_search(target, connection, **kwargs):
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text('DROP TABLE IF EXISTS users_search'))
+        connection.execute(text('DROP TABLE IF EXISTS orders_search'))
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _sqlite_match(table, columns, term):
+    """FTS5のMATCHに一致するrowidのサブクエリ"""
+    # 同じクエリ内で複数回使うため、パラメータ名はテーブルごとに分ける
+    param = f'{table}_phrase'
+    return text(
+        f"SELECT rowid FROM {table} WHERE {table} MATCH :{param}"
+    ).bindparams(**{param: '{' + ' '.join(columns) + '} : ' + _fts_phrase(term)}).columns(rowid=db.Integer)
+
+
+def user_ids_matching(term, columns=('username', 'email')):
+    """ユーザー名・メールアドレスの部分一致（ユーザーIDのサブクエリを返す）"""
+    if _dialect() == 'sqlite' and len(term) >= MIN_TRIGRAM_LENGTH:
+        return select(_sqlite_match('users_search', columns, term).subquery().c.rowid)
+
+    pattern = f'%{_escape_like(term)}%'
+    return select(User.id).where(db.or_(*[
+        getattr(User, column).ilike(pattern, escape='\\') for column in columns
+    ]))
+
+
+def user_search_filter(term):
+    """User.query.filter() に渡す検索条件"""
+    return User.id.in_(user_ids_matching(term))
+
+
+def order_search_filter(term):
+    """Order.query.filter() に渡す検索条件（注文IDまたは顧客メールアドレスの部分一致）"""
+    email_match = Order.user_id.in_(user_ids_matching(term, columns=('email',)))
+
+    if _dialect() == 'sqlite' and len(term) >= MIN_TRIGRAM_LENGTH:
+        match = _sqlite_match('orders_search', ('ref',), term).subquery()
+        id_match = Order.id.in_(select(match.c.rowid))
+    else:
+        # PostgreSQL では (id::text) の trigram インデックスが使われる
+        id_match = cast(Order.id, db.Text).ilike(f'%{_escape_like(term)}%', escape='\\')
+
+    return db.or_(id_match, email_match)
+
+
+def exact_order_id(term):
+    """検索語が '#123' 形式なら注文IDを返す（'#' なしの数字は部分一致検索のまま）"""
+    term = term.strip()
+    if not term.startswith('#'):
+        return None
+    digits = term[1:]
+    if digits.isdigit() and len(digits) <= 18:
+        return int(digits)
+    return None
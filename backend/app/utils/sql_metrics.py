@@ -0,0 +1,164 @@
+# app/utils/sql_metrics.py
+"""
+リクエストごとのSQL計測
+・SQLの実行回数・合計時間・遅いSQLをリクエスト単位で記録し、Server-Timing ヘッダーとメトリクスに出力
+・同じSQL（値を除いて正規化したもの）が1リクエスト内で閾値を超えて実行されたらN+1として検出
+  （SQL_NPLUSONE_MODE: warn はログ出力、raise は例外。テストでは raise）
+・SQL_METRICS_ENABLED が false の場合はイベントフックを登録しない（オーバーヘッドなし）
+"""
+import heapq
+import re
+import threading
+import time
+from collections import Counter
+from flask import current_app, request
+from sqlalchemy import event
+
+_WHITESPACE = re.compile(r'\s+')
+_IN_LIST = re.compile(r'IN \((?:\?|%\(\w+\)s|:\w+|\$\d+)(?:, (?:\?|%\(\w+\)s|:\w+|\$\d+))*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+def normalize_statement(statement):
+    """値・INリストの要素数の違いを除いたSQL（同じ形のSQLの判定用）"""
+    statement = _WHITESPACE.sub(' ', statement).strip()
+    statement = _STRING.sub('?', statement)
+    statement = _NUMBER.sub('?', statement)
+    return _IN_LIST.sub('IN (?)', statement)
+
+
+class NPlusOneDetected(Exception):
+    pass
+
+
+class RequestStats:
+    def __init__(self, slowest):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = Counter()
+        self.slowest = []
+        self._slowest_size = slowest
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        entry = (duration, statement)
+        if len(self.slowest) < self._slowest_size:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def repeated(self, threshold):
+        """閾値を超えて繰り返されたSQL（N+1の候補）"""
+        return {statement: count for statement, count in self.statements.items() if count > threshold}
+
+
+class SQLMetrics:
+    def __init__(self):
+        self.enabled = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def init_app(self, app):
+        app.extensions['sql_metrics'] = self
+        self.enabled = app.config.get('SQL_METRICS_ENABLED', False)
+        if not self.enabled:
+            return
+
+        self.slowest = app.config.get('SQL_METRICS_SLOWEST', 5)
+        self.threshold = app.config.get('SQL_NPLUSONE_THRESHOLD', 10)
+        self.mode = app.config.get('SQL_NPLUSONE_MODE', 'warn')
+
+        from app import db
+        with app.app_context():
+            for engine in db.engines.values():
+                if not event.contains(engine, 'before_cursor_execute', self._before_cursor_execute):
+                    event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                    event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+
+    # --- SQLAlchemy イベント ---
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'stats', None) is not None:
+            conn.info.setdefault('sql_metrics_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            return
+        starts = conn.info.get('sql_metrics_start')
+        if starts:
+            stats.record(normalize_statement(statement), time.perf_counter() - starts.pop())
+
+    # --- Flask リクエスト ---
+
+    def _start_request(self):
+        self._local.stats = RequestStats(self.slowest)
+
+    def _finish_request(self, response):
+        stats = self._local.stats
+        self._local.stats = None
+        if stats is None:
+            return response
+
+        response.headers.add(
+            'Server-Timing', f'db;desc="{stats.count} queries";dur={stats.total_time * 1000:.2f}'
+        )
+        self._record_endpoint(request.endpoint or request.path, stats)
+
+        repeated = stats.repeated(self.threshold) if self.mode != 'off' else {}
+        if repeated:
+            message = f'N+1 queries in {request.method} {request.path}: ' + '; '.join(
+                f'{count}x {statement}' for statement, count in repeated.items()
+            )
+            if self.mode == 'raise':
+                raise NPlusOneDetected(message)
+            current_app.logger.warning(message)
+        return response
+
+    def _teardown_request(self, exc=None):
+        self._local.stats = None
+
+    # --- メトリクス ---
+
+    def _record_endpoint(self, endpoint, stats):
+        with self._lock:
+            metrics = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'statements': 0, 'db_time_ms': 0.0, 'max_statements': 0, 'slowest': []
+            })
+            metrics['requests'] += 1
+            metrics['statements'] += stats.count
+            metrics['db_time_ms'] += stats.total_time * 1000
+            metrics['max_statements'] = max(metrics['max_statements'], stats.count)
+            slowest = metrics['slowest'] + [(duration * 1000, statement) for duration, statement in stats.slowest]
+            metrics['slowest'] = heapq.nlargest(self.slowest, slowest)
+
+    def snapshot(self):
+        """エンドポイントごとの集計（リクエスト数・SQL数・DB時間・遅いSQL）"""
+        with self._lock:
+            return {
+                endpoint: {
+                    'requests': metrics['requests'],
+                    'avg_statements': metrics['statements'] / metrics['requests'],
+                    'max_statements': metrics['max_statements'],
+                    'avg_db_time_ms': metrics['db_time_ms'] / metrics['requests'],
+                    'slowest': [
+                        {'duration_ms': round(duration, 3), 'statement': statement}
+                        for duration, statement in metrics['slowest']
+                    ]
+                } for endpoint, metrics in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+
+sql_metrics = SQLMetrics()
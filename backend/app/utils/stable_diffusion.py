@@ -1,8 +1,10 @@
 # app/utils/stable_diffusion.py
 import os
-import requests
+from app.utils.http_transport import get_transport
 from dotenv import load_dotenv
 import json
+import hashlib
+import base64
 
 load_dotenv()
 
@@ -10,16 +12,31 @@ class StableDiffusionClient:
     def __init__(self):
         self.api_key = os.getenv('STABILITY_API_KEY')
         self.api_host = 'https://api.stability.ai'
+        self.engine_id = 'stable-diffusion-xl-1024-v1-0'
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
+        self.transport = get_transport('stability')
 
-    def generate_image(self, prompt, size=1024):
-        """画像を生成"""
-        endpoint = f"{self.api_host}/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image"
-        
+    def generation_params(self, size=1024, seed=0):
+        """生成パラメータ（コンテンツキーの計算にも使用）"""
+        return {
+            "engine": self.engine_id,
+            "cfg_scale": 7,
+            "width": size,
+            "height": size,
+            "samples": 1,
+            "steps": 30,
+            "seed": seed,
+        }
+
+    def generate_image(self, prompt, size=1024, seed=0):
+        """画像を生成（PNGのバイナリを返す）"""
+        endpoint = f"{self.api_host}/v1/generation/{self.engine_id}/text-to-image"
+
+        params = self.generation_params(size, seed)
         payload = {
             "text_prompts": [
                 {
@@ -27,31 +44,80 @@ class StableDiffusionClient:
                     "weight": 1
                 }
             ],
-            "cfg_scale": 7,
-            "width": size,
-            "height": size,
-            "samples": 1,
-            "steps": 30,
+            "cfg_scale": params["cfg_scale"],
+            "width": params["width"],
+            "height": params["height"],
+            "samples": params["samples"],
+            "steps": params["steps"],
+            "seed": params["seed"],
         }
 
         try:
-            response = requests.post(
+            # base64のJSONではなくPNGのバイナリをそのまま受け取る（samples=1の場合のみ対応）
+            response = self.transport.post(
+                endpoint,
+                headers={**self.headers, "Accept": "image/png"},
+                json=payload
+            )
+            response.raise_for_status()
+
+            image_data = response.content
+            if image_data:
+                return image_data
+            raise Exception("No image generated")
+
+        except Exception as e:
+            print(f"Image generation failed: {str(e)}")
+            raise
+
+    def generate_images(self, prompt, samples, size=1024, seed=0):
+        """1回のAPI呼び出しで複数のバリエーションを生成（PNGのバイナリのリストを返す）"""
+        endpoint = f"{self.api_host}/v1/generation/{self.engine_id}/text-to-image"
+
+        params = self.generation_params(size, seed)
+        payload = {
+            "text_prompts": [
+                {
+                    "text": prompt,
+                    "weight": 1
+                }
+            ],
+            "cfg_scale": params["cfg_scale"],
+            "width": params["width"],
+            "height": params["height"],
+            "samples": samples,
+            "steps": params["steps"],
+            "seed": params["seed"],
+        }
+
+        try:
+            # 複数枚の場合はimage/pngに対応していないためJSON（base64）で受け取る
+            response = self.transport.post(
                 endpoint,
                 headers=self.headers,
                 json=payload
             )
             response.raise_for_status()
 
-            # レスポンスからbase64エンコードされた画像を取得
-            data = response.json()
-            if data['artifacts']:
-                return data['artifacts'][0]['base64']
+            artifacts = response.json().get('artifacts') or []
+            if artifacts:
+                return [base64.b64decode(artifact['base64']) for artifact in artifacts]
             raise Exception("No image generated")
 
         except Exception as e:
             print(f"Image generation failed: {str(e)}")
             raise
 
+def content_key(prompt, params):
+    """
+    プロンプトと生成パラメータから同一画像を判定するためのキーを計算
+    seed が 0（Stability側でランダム）の場合は同じ画像にならないため None を返す
+    """
+    if not params.get('seed'):
+        return None
+    source = json.dumps({'prompt': prompt, 'params': params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
 def test_stable_diffusion():
     try:
         client = StableDiffusionClient()
@@ -62,9 +128,8 @@ def test_stable_diffusion():
         image_data = client.generate_image(prompt)
         
         # 生成された画像をテスト用にファイルに保存
-        import base64
         with open("test_image.png", "wb") as f:
-            f.write(base64.b64decode(image_data))
+            f.write(image_data)
         
         print("Image generated and saved as test_image.png")
         return True
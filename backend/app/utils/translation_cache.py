@@ -0,0 +1,177 @@
+# app/utils/translation_cache.py
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(text):
+    """キャッシュキー用にプロンプトを正規化（全角/半角・空白の揺れを吸収）"""
+    text = unicodedata.normalize('NFKC', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def make_cache_key(text, version):
+    normalized = normalize_prompt(text)
+    return hashlib.sha256(f'{version}\n{normalized}'.encode('utf-8')).hexdigest()
+
+
+class SQLiteTranslationStore:
+    """ローカル用の永続キャッシュ（同一ホストのワーカー間で共有）"""
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS translations ('
+                ' cache_key TEXT PRIMARY KEY,'
+                ' translated_text TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL)'
+            )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def get(self, cache_key):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT translated_text FROM translations WHERE cache_key = ? AND expires_at > ?',
+                (cache_key, time.time())
+            ).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def set(self, cache_key, translated_text):
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO translations (cache_key, translated_text, expires_at) VALUES (?, ?, ?)',
+                (cache_key, translated_text, time.time() + self.ttl)
+            )
+        finally:
+            conn.close()
+
+
+class DynamoDBTranslationStore:
+    """
+    DesignCacheと同じ形式のDynamoDBテーブルを使った共有キャッシュ
+    boto3リソースはスレッドセーフではないため、呼び出しごとに AWSClientRegistry から取得する
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    def _client(self):
+        from app.utils.dynamodb import DynamoDBClient
+        return DynamoDBClient()
+
+    def get(self, cache_key):
+        return self._client().get_translation(cache_key)
+
+    def set(self, cache_key, translated_text):
+        self._client().cache_translation(cache_key, translated_text, ttl_seconds=self.ttl)
+
+
+class TranslationCache:
+    """
+    翻訳結果の2段キャッシュ
+    1段目: プロセス内LRU（TTL付き）
+    2段目: ワーカー間で共有される永続ストア（DynamoDB / SQLite）
+    """
+
+    def __init__(self):
+        self.local = TTLCache(maxsize=1024, ttl=3600)
+        self.store = None
+        self._lock = threading.Lock()
+        self._stats = {'local_hits': 0, 'store_hits': 0, 'misses': 0, 'store_errors': 0}
+
+    def init_app(self, app):
+        self.local = TTLCache(
+            maxsize=app.config.get('TRANSLATION_CACHE_SIZE', 1024),
+            ttl=app.config.get('TRANSLATION_CACHE_TTL', 3600)
+        )
+        backend = app.config.get('TRANSLATION_CACHE_BACKEND', 'none')
+        store_ttl = app.config.get('TRANSLATION_CACHE_STORE_TTL', 60 * 60 * 24 * 30)
+        if backend == 'dynamodb':
+            self.store = DynamoDBTranslationStore(store_ttl)
+        elif backend == 'sqlite':
+            self.store = SQLiteTranslationStore(app.config['TRANSLATION_CACHE_SQLITE_PATH'], store_ttl)
+        elif backend == 'none':
+            self.store = None
+        else:
+            raise ValueError(f'Unknown TRANSLATION_CACHE_BACKEND: {backend}')
+        self.reset_stats()
+        app.extensions['translation_cache'] = self
+
+    def get(self, text, version):
+        """キャッシュされた翻訳を取得（なければNone）"""
+        cache_key = make_cache_key(text, version)
+        with self._lock:
+            translated = self.local.get(cache_key)
+            if translated is not None:
+                self._stats['local_hits'] += 1
+                return translated
+
+        if self.store is not None:
+            try:
+                translated = self.store.get(cache_key)
+            except Exception as e:
+                # 永続ストアの障害時は翻訳APIにフォールバック
+                logger.warning(f'Translation cache store error: {e}')
+                translated = None
+                with self._lock:
+                    self._stats['store_errors'] += 1
+            if translated is not None:
+                with self._lock:
+                    self.local[cache_key] = translated
+                    self._stats['store_hits'] += 1
+                return translated
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def set(self, text, version, translated_text):
+        """翻訳結果を両方の段に保存"""
+        cache_key = make_cache_key(text, version)
+        with self._lock:
+            self.local[cache_key] = translated_text
+        if self.store is not None:
+            try:
+                self.store.set(cache_key, translated_text)
+            except Exception as e:
+                logger.warning(f'Translation cache store error: {e}')
+                with self._lock:
+                    self._stats['store_errors'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['local_size'] = len(self.local)
+        lookups = stats['local_hits'] + stats['store_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['local_hits'] + stats['store_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+translation_cache = TranslationCache()
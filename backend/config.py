@@ -13,6 +13,15 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'postgresql://mba338@localhost/customai_tee'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # リードレプリカ（未設定の場合はすべてプライマリ）
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+    REPLICA_FALLBACK = os.getenv('REPLICA_FALLBACK', 'primary')  # primary / error
+    REPLICA_HEALTH_CHECK_INTERVAL = float(os.getenv('REPLICA_HEALTH_CHECK_INTERVAL', 5))
+    REPLICA_READ_YOUR_WRITES_SECONDS = float(os.getenv('REPLICA_READ_YOUR_WRITES_SECONDS', 5))
+    REPLICA_WRITE_MARKER_BACKEND = os.getenv('REPLICA_WRITE_MARKER_BACKEND', 'sqlite')  # sqlite / memory
+    REPLICA_WRITE_MARKER_SQLITE_PATH = os.getenv('REPLICA_WRITE_MARKER_SQLITE_PATH', 'instance/replica_writes.sqlite3')
     
     # JWT config
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key'
@@ -36,12 +45,92 @@ class Config:
     AWS_REGION = os.getenv('AWS_REGION', 'ap-northeast-1')
     S3_BUCKET = os.getenv('S3_BUCKET')
 
+    # boto3クライアント設定（プロセス内で共有）
+    AWS_MAX_POOL_CONNECTIONS = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', 50))
+    AWS_RETRY_MODE = os.getenv('AWS_RETRY_MODE', 'standard')  # legacy / standard / adaptive
+    AWS_MAX_ATTEMPTS = int(os.getenv('AWS_MAX_ATTEMPTS', 3))
+    AWS_CONNECT_TIMEOUT = float(os.getenv('AWS_CONNECT_TIMEOUT', 5))
+    AWS_READ_TIMEOUT = float(os.getenv('AWS_READ_TIMEOUT', 30))
+
+    # DynamoDBへの書き込みをバックグラウンドでまとめて送信（BatchWriteItem、25件または一定時間ごと）
+    DYNAMODB_BATCH_WRITES = os.getenv('DYNAMODB_BATCH_WRITES', 'true').lower() == 'true'
+    DYNAMODB_BATCH_FLUSH_INTERVAL = float(os.getenv('DYNAMODB_BATCH_FLUSH_INTERVAL', 0.2))  # 最初の項目からの最大待ち時間（秒）
+    DYNAMODB_BATCH_MAX_PENDING = int(os.getenv('DYNAMODB_BATCH_MAX_PENDING', 1000))  # 超えた場合は呼び出し元で送信
+    DYNAMODB_BATCH_MAX_RETRIES = int(os.getenv('DYNAMODB_BATCH_MAX_RETRIES', 5))  # UnprocessedItems の再送回数
+    DYNAMODB_BATCH_BACKOFF = float(os.getenv('DYNAMODB_BATCH_BACKOFF', 0.05))  # 再送の初回待ち時間（秒、倍々に増やす）
+
     # Stripe設定
     STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
     STRIPE_PUBLISHABLE_KEY = os.getenv('STRIPE_PUBLISHABLE_KEY')
     STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
 
+    # 価格・送料（単価は price_catalog テーブル）
+    SHIPPING_FEE = int(os.getenv('SHIPPING_FEE', 500))  # 1注文あたり
+    FREE_SHIPPING_MIN_SUBTOTAL = int(os.getenv('FREE_SHIPPING_MIN_SUBTOTAL', 0))  # この小計以上は送料無料（0は無効）
+    PRICE_CACHE_TTL = int(os.getenv('PRICE_CACHE_TTL', 300))  # 単価のプロセス内キャッシュ（秒）
+
+    # 外部AI API（Stability / OpenAI）へのHTTP設定
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+    HTTP_READ_TIMEOUTS = {
+        'default': float(os.getenv('HTTP_READ_TIMEOUT', 60)),
+        'stability': float(os.getenv('STABILITY_READ_TIMEOUT', 120)),
+        'openai': float(os.getenv('OPENAI_READ_TIMEOUT', 60)),
+    }
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_FAILURE_THRESHOLD', 5))
+    CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.getenv('CIRCUIT_BREAKER_RESET_TIMEOUT', 30))
+
+    # バックグラウンドジョブ設定（デザイン生成）
+    JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'memory')  # memory / sqlite
+    JOB_QUEUE_WORKERS = int(os.getenv('JOB_QUEUE_WORKERS', 4))
+    JOB_QUEUE_MAXSIZE = int(os.getenv('JOB_QUEUE_MAXSIZE', 100))
+    JOB_QUEUE_SQLITE_PATH = os.getenv('JOB_QUEUE_SQLITE_PATH', 'instance/job_queue.sqlite3')
+    # sqlite: この秒数を超えて running のジョブは再実行、完了済みジョブはこの秒数を過ぎたら削除
+    JOB_QUEUE_LEASE_SECONDS = int(os.getenv('JOB_QUEUE_LEASE_SECONDS', 900))
+    JOB_QUEUE_RETENTION_SECONDS = int(os.getenv('JOB_QUEUE_RETENTION_SECONDS', 86400))
+
+    # 同一プロンプト・パラメータの生成済み画像を再利用するか（リクエストの dedup で上書き可能）
+    DESIGN_DEDUP_ENABLED = os.getenv('DESIGN_DEDUP_ENABLED', 'false').lower() == 'true'
+
+    # バリエーション一括生成
+    DESIGN_BATCH_MAX_SAMPLES = int(os.getenv('DESIGN_BATCH_MAX_SAMPLES', 4))
+    DESIGN_UPLOAD_WORKERS = int(os.getenv('DESIGN_UPLOAD_WORKERS', 4))
+
+    # サムネイル用WebP派生画像の幅（px）
+    DESIGN_RENDITION_WIDTHS = [int(width) for width in os.getenv('DESIGN_RENDITION_WIDTHS', '128,256,512').split(',')]
+
+    # モックアップ画像（Tシャツへの合成）
+    MOCKUP_DEFAULT_SIZE = int(os.getenv('MOCKUP_DEFAULT_SIZE', 512))
+    MOCKUP_MAX_SIZE = int(os.getenv('MOCKUP_MAX_SIZE', 1024))
+    MOCKUP_CACHE_MAX_BYTES = int(os.getenv('MOCKUP_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    MOCKUP_SOURCE_CACHE_MAX_BYTES = int(os.getenv('MOCKUP_SOURCE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+    # 翻訳キャッシュ設定
+    TRANSLATION_CACHE_BACKEND = os.getenv('TRANSLATION_CACHE_BACKEND', 'dynamodb')  # dynamodb / sqlite / none
+    TRANSLATION_CACHE_SIZE = int(os.getenv('TRANSLATION_CACHE_SIZE', 1024))
+    TRANSLATION_CACHE_TTL = int(os.getenv('TRANSLATION_CACHE_TTL', 3600))  # プロセス内キャッシュ（秒）
+    TRANSLATION_CACHE_STORE_TTL = int(os.getenv('TRANSLATION_CACHE_STORE_TTL', 60 * 60 * 24 * 30))  # 永続キャッシュ（秒）
+    TRANSLATION_CACHE_SQLITE_PATH = os.getenv('TRANSLATION_CACHE_SQLITE_PATH', 'instance/translation_cache.sqlite3')
+
+    # SQL計測設定（無効の場合はイベントフックを登録しない）
+    SQL_METRICS_ENABLED = os.getenv('SQL_METRICS_ENABLED', 'false').lower() == 'true'
+    SQL_METRICS_SLOWEST = int(os.getenv('SQL_METRICS_SLOWEST', 5))  # 記録する遅いSQLの件数
+    SQL_NPLUSONE_THRESHOLD = int(os.getenv('SQL_NPLUSONE_THRESHOLD', 10))  # 1リクエスト内で同じSQLを許容する回数
+    SQL_NPLUSONE_MODE = os.getenv('SQL_NPLUSONE_MODE', 'warn')  # off / warn / raise
+
+    # 注文テーブルの月別パーティション（PostgreSQL、flask db upgrade の前に設定する）
+    ORDERS_PARTITIONING = os.getenv('ORDERS_PARTITIONING', 'false').lower() == 'true'
+    ORDERS_PARTITION_MONTHS_AHEAD = int(os.getenv('ORDERS_PARTITION_MONTHS_AHEAD', 3))  # 先に作成しておく月数
+
+    # JSONレスポンス（orjson: 高速なシリアライズ / default: Flaskの既定）
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
+
 class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'  # インメモリデータベースを使用
+    SQLALCHEMY_BINDS = {}
+    TRANSLATION_CACHE_BACKEND = 'none'
+    SQL_METRICS_ENABLED = True
+    SQL_NPLUSONE_MODE = 'raise'  # N+1はテストを失敗させる
     WTF_CSRF_ENABLED = False
\ No newline at end of file
@@ -0,0 +1,34 @@
+"""Make created_at NOT NULL on keyset-paginated tables
+
+Revision ID: 1ed98263f7a2
+Revises: b9f1d3e5a724
+Create Date: 2025-02-05 10:12:47.204518
+
+カーソルページングのキー（created_at, id）に NULL があると、行値の比較から外れてページに出てこないため、
+既存の NULL を埋めてから NOT NULL にする（updated_at があればその値、なければ現在時刻）。
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1ed98263f7a2'
+down_revision = 'b9f1d3e5a724'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('UPDATE designs SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL')
+    op.execute('UPDATE orders SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL')
+    op.execute('UPDATE users SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL')
+
+    for table in ('designs', 'orders', 'users'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    for table in ('users', 'orders', 'designs'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
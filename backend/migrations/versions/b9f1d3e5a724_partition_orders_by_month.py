@@ -0,0 +1,186 @@
+"""Partition orders and order_items by created_at month (PostgreSQL, optional)
+
+Revision ID: b9f1d3e5a724
+Revises: c8e4a2d6f157
+Create Date: 2025-02-03 11:05:38.640219
+
+ORDERS_PARTITIONING=true かつ PostgreSQL の場合だけテーブルを作り直す（それ以外は何もしない）。
+・テーブルを作り直してデータをコピーするため、大きなテーブルではメンテナンス時間中に実行する
+・パーティションキー（created_at）を含める必要があるため、主キーは (id, created_at) になる
+・同じ理由で orders.payment_id の一意インデックスは作れない（通常のインデックスにする）。
+  同じ決済の二重登録は注文作成時のアドバイザリーロックで防ぐ（app/models/checkout.py）
+・order_items.order_id の外部キーは作れない（orders の主キーが複合のため）
+・order_items.created_at は注文の created_at に揃える（同じ月のパーティションに入れるため）
+"""
+from datetime import date, datetime
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9f1d3e5a724'
+down_revision = 'c8e4a2d6f157'
+branch_labels = None
+depends_on = None
+
+ORDER_COLUMNS = 'id, user_id, total_amount, status, shipping_address, payment_id, created_at, updated_at'
+ORDER_ITEM_COLUMNS = 'id, order_id, design_id, quantity, size, color, price, design_config, created_at'
+
+
+def _enabled():
+    return op.get_bind().dialect.name == 'postgresql' and current_app.config.get('ORDERS_PARTITIONING', False)
+
+
+def _partitioned():
+    return op.get_bind().execute(sa.text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('orders'))"
+    )).scalar()
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_partitions(start, months_ahead):
+    """
+    start の月から months_ahead か月先までの月別パーティション（orders_y2025m01 など）と既定のパーティションを作成
+    アプリ側の定義（app/models/partitions.py）が変わってもこのリビジョンの内容は変えない
+    """
+    now = datetime.utcnow()
+    first = date(start.year, start.month, 1)
+    last = _add_months(date(now.year, now.month, 1), months_ahead)
+    for table in ('orders', 'order_items'):
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+        month = first
+        while month <= last:
+            end = _add_months(month, 1)
+            op.execute(
+                f'CREATE TABLE {table}_y{month.year}m{month.month:02d} PARTITION OF {table} '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            month = end
+
+
+def _create_indexes(unique_payment_id):
+    op.create_index('ix_orders_user_id_created_at_id', 'orders', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'])
+    op.create_index('ix_orders_status_created_at_id', 'orders', ['status', 'created_at', 'id'])
+    op.create_index('ix_orders_payment_id', 'orders', ['payment_id'], unique=unique_payment_id)
+    op.execute('CREATE INDEX ix_orders_id_trgm ON orders USING gin ((id::text) gin_trgm_ops)')
+    op.create_index('ix_order_items_order_id_id', 'order_items', ['order_id', 'id'])
+
+
+def _rename_old_tables():
+    for table in ('orders', 'order_items'):
+        op.execute(f'ALTER TABLE {table} RENAME TO {table}_old')
+        op.execute(f'ALTER INDEX {table}_pkey RENAME TO {table}_old_pkey')
+    for index in ('ix_orders_user_id_created_at_id', 'ix_orders_created_at_id', 'ix_orders_status_created_at_id',
+                  'ix_orders_payment_id', 'ix_orders_id_trgm', 'ix_order_items_order_id_id'):
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+
+
+def _drop_old_tables():
+    op.execute('ALTER SEQUENCE orders_id_seq OWNED BY orders.id')
+    op.execute('ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id')
+    op.execute('DROP TABLE order_items_old')
+    op.execute('DROP TABLE orders_old')
+
+
+def upgrade():
+    if not _enabled() or _partitioned():
+        return
+
+    _rename_old_tables()
+
+    op.execute("""
+        CREATE TABLE orders (
+            id INTEGER NOT NULL DEFAULT nextval('orders_id_seq'::regclass),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            total_amount DOUBLE PRECISION NOT NULL,
+            status VARCHAR(20),
+            shipping_address JSON NOT NULL,
+            payment_id VARCHAR(100),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT orders_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("""
+        CREATE TABLE order_items (
+            id INTEGER NOT NULL DEFAULT nextval('order_items_id_seq'::regclass),
+            order_id INTEGER NOT NULL,
+            design_id INTEGER NOT NULL REFERENCES designs (id),
+            quantity INTEGER NOT NULL,
+            size VARCHAR(10) NOT NULL,
+            color VARCHAR(20) NOT NULL,
+            price DOUBLE PRECISION NOT NULL,
+            design_config JSON,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            CONSTRAINT order_items_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+
+    # 最も古い注文の月から ORDERS_PARTITION_MONTHS_AHEAD か月先までのパーティション
+    oldest = op.get_bind().execute(sa.text('SELECT MIN(created_at) FROM orders_old')).scalar()
+    _create_partitions(oldest or datetime.utcnow(), current_app.config.get('ORDERS_PARTITION_MONTHS_AHEAD', 3))
+
+    op.execute(f"""
+        INSERT INTO orders ({ORDER_COLUMNS})
+        SELECT id, user_id, total_amount, status, shipping_address, payment_id,
+               COALESCE(created_at, updated_at, now()), updated_at
+        FROM orders_old
+    """)
+    # 注文アイテムは注文と同じ created_at（同じ月のパーティション）
+    op.execute(f"""
+        INSERT INTO order_items ({ORDER_ITEM_COLUMNS})
+        SELECT items.id, items.order_id, items.design_id, items.quantity, items.size, items.color,
+               items.price, items.design_config, orders.created_at
+        FROM order_items_old AS items JOIN orders ON orders.id = items.order_id
+    """)
+
+    _drop_old_tables()
+    _create_indexes(unique_payment_id=False)
+    op.execute('ANALYZE orders')
+    op.execute('ANALYZE order_items')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql' or not _partitioned():
+        return
+
+    # 切り離し済みのパーティションの行は戻らない
+    _rename_old_tables()
+
+    op.execute("""
+        CREATE TABLE orders (
+            id INTEGER NOT NULL DEFAULT nextval('orders_id_seq'::regclass) PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            total_amount DOUBLE PRECISION NOT NULL,
+            status VARCHAR(20),
+            shipping_address JSON NOT NULL,
+            payment_id VARCHAR(100),
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute("""
+        CREATE TABLE order_items (
+            id INTEGER NOT NULL DEFAULT nextval('order_items_id_seq'::regclass) PRIMARY KEY,
+            order_id INTEGER NOT NULL REFERENCES orders (id),
+            design_id INTEGER NOT NULL REFERENCES designs (id),
+            quantity INTEGER NOT NULL,
+            size VARCHAR(10) NOT NULL,
+            color VARCHAR(20) NOT NULL,
+            price DOUBLE PRECISION NOT NULL,
+            design_config JSON,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+    """)
+    op.execute(f'INSERT INTO orders ({ORDER_COLUMNS}) SELECT {ORDER_COLUMNS} FROM orders_old')
+    op.execute(f'INSERT INTO order_items ({ORDER_ITEM_COLUMNS}) SELECT {ORDER_ITEM_COLUMNS} FROM order_items_old')
+
+    # パーティションは親テーブルと一緒に削除される
+    _drop_old_tables()
+    _create_indexes(unique_payment_id=True)
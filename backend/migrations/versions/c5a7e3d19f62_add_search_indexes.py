@@ -0,0 +1,76 @@
+"""Add search indexes for admin user and order search
+
+Revision ID: c5a7e3d19f62
+Revises: 8d4e6b2f0c17
+Create Date: 2025-01-28 10:21:47.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5a7e3d19f62'
+down_revision = '8d4e6b2f0c17'
+branch_labels = None
+depends_on = None
+
+# アプリ側の定義（app/utils/search.py）が変わってもこのリビジョンの内容は変えない
+SQLITE_SEARCH_DDL = [
+    # users: 外部コンテンツ方式（本文は users テーブルを参照）
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_search USING fts5(
+        username, email, content='users', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_search(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_search(users_search, rowid, username, email) VALUES ('delete', old.id, old.username, old.email);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_au AFTER UPDATE OF username, email ON users BEGIN
+        INSERT INTO users_search(users_search, rowid, username, email) VALUES ('delete', old.id, old.username, old.email);
+        INSERT INTO users_search(rowid, username, email) VALUES (new.id, new.username, new.email);
+    END""",
+    # orders: 注文IDの文字列を rowid = 注文ID で保持
+    """CREATE VIRTUAL TABLE IF NOT EXISTS orders_search USING fts5(ref, tokenize='trigram')""",
+    """CREATE TRIGGER IF NOT EXISTS orders_search_ai AFTER INSERT ON orders BEGIN
+        INSERT INTO orders_search(rowid, ref) VALUES (new.id, CAST(new.id AS TEXT));
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS orders_search_ad AFTER DELETE ON orders BEGIN
+        DELETE FROM orders_search WHERE rowid = old.id;
+    END""",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # ILIKE '%q%' で使える trigram インデックス
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE INDEX IF NOT EXISTS ix_users_username_trgm ON users USING gin (username gin_trgm_ops)')
+        op.execute('CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (email gin_trgm_ops)')
+        op.execute('CREATE INDEX IF NOT EXISTS ix_orders_id_trgm ON orders USING gin ((id::text) gin_trgm_ops)')
+
+    elif dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # 既存データを検索用テーブルに反映
+        op.execute("INSERT INTO users_search(users_search) VALUES ('rebuild')")
+        op.execute('INSERT INTO orders_search(rowid, ref) SELECT id, CAST(id AS TEXT) FROM orders')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_orders_id_trgm')
+        op.execute('DROP INDEX IF EXISTS ix_users_email_trgm')
+        op.execute('DROP INDEX IF EXISTS ix_users_username_trgm')
+
+    elif dialect == 'sqlite':
+        for trigger in ('users_search_ai', 'users_search_ad', 'users_search_au',
+                        'orders_search_ai', 'orders_search_ad'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS users_search')
+        op.execute('DROP TABLE IF EXISTS orders_search')
@@ -0,0 +1,68 @@
+# scripts/backfill_renditions.py
+"""
+既存デザインのWebP派生画像を一括生成する
+使い方: python scripts/backfill_renditions.py [--workers 8] [--batch-size 100]
+"""
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from dotenv import load_dotenv
+from app import create_app, db
+from app.models.design import Design
+from app.utils.renditions import render_and_upload
+from app.utils.s3 import S3Client
+
+def backfill_renditions(workers, batch_size):
+    load_dotenv()
+    app = create_app()
+
+    with app.app_context():
+        widths = app.config['DESIGN_RENDITION_WIDTHS']
+        s3_client = S3Client()
+        processed = failed = 0
+        last_id = 0
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                designs = Design.query.filter(
+                    Design.renditions.is_(None),
+                    Design.id > last_id
+                ).order_by(Design.id).limit(batch_size).all()
+                if not designs:
+                    break
+                last_id = designs[-1].id
+
+                # 同じs3_keyを共有するデザイン（dedup）は1回だけ生成する
+                keys = sorted({design.s3_key for design in designs})
+
+                def render(s3_key):
+                    try:
+                        return s3_key, render_and_upload(s3_client, s3_key, widths)
+                    except Exception as e:
+                        print(f"Failed to render {s3_key}: {str(e)}")
+                        return s3_key, None
+
+                results = dict(executor.map(render, keys))
+
+                for design in designs:
+                    if results.get(design.s3_key):
+                        design.renditions = results[design.s3_key]
+                        processed += 1
+                    else:
+                        failed += 1
+                db.session.commit()
+                print(f"Processed {processed} designs ({failed} failed)")
+
+        print(f"Done. {processed} designs updated, {failed} failed.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+    backfill_renditions(args.workers, args.batch_size)
@@ -0,0 +1,96 @@
+# scripts/benchmark_image_path.py
+"""
+生成画像をS3へ渡すまでのメモリ使用量・処理時間の比較
+  base64: Stability のJSONレスポンス（base64）→ str → b64decode → BytesIO → アップロード（旧方式）
+  binary: image/png のバイナリ → そのままアップロード（新方式）
+
+外部APIやS3には接続せず、レスポンス本文とアップロード処理をローカルで再現する。
+各方式は別プロセスで実行し、プロセスのピークRSSを比較する。
+
+使い方: python scripts/benchmark_image_path.py [--size-mb 3] [--iterations 20]
+"""
+import argparse
+import base64
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.utils.s3 import S3Client
+
+
+class NullS3:
+    """upload_fileobj と同様にチャンク単位で読み出して破棄する"""
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+        chunk_size = Config.multipart_chunksize if Config else 8 * 1024 * 1024
+        while fileobj.read(chunk_size):
+            pass
+
+
+def run_mode(mode, size_mb, iterations):
+    image = os.urandom(size_mb * 1024 * 1024)
+    if mode == 'base64':
+        body = json.dumps({'artifacts': [{'base64': base64.b64encode(image).decode('ascii')}]}).encode('utf-8')
+    else:
+        body = image
+    del image
+
+    s3 = S3Client()
+    s3.s3_client = NullS3()
+
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        if mode == 'base64':
+            # requests の response.json() → artifacts[0]['base64'] と同じ処理
+            image_data = json.loads(body)['artifacts'][0]['base64']
+        else:
+            # requests の response.content と同じ（bytesをそのまま使用）
+            image_data = body
+        s3.upload_design(image_data, 'benchmark.png')
+        latencies.append(time.perf_counter() - start)
+        del image_data
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    latencies.sort()
+    print(json.dumps({
+        'mode': mode,
+        'peak_rss_delta_mb': (peak_rss - baseline_rss) / 1024,
+        'median_ms': latencies[len(latencies) // 2] * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=3)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--mode', choices=['base64', 'binary'])
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.size_mb, args.iterations)
+        return
+
+    print(f"Image size: {args.size_mb} MB, iterations: {args.iterations}")
+    print(f"{'mode':<8} {'peak RSS +MB':>13} {'median ms':>10} {'p95 ms':>8}")
+    for mode in ('base64', 'binary'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode,
+             '--size-mb', str(args.size_mb), '--iterations', str(args.iterations)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<8} {result['peak_rss_delta_mb']:>13.1f} {result['median_ms']:>10.2f} {result['p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
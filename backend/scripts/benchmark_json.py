@@ -0,0 +1,85 @@
+# scripts/benchmark_json.py
+"""
+JSONレスポンスのシリアライズの比較（Flaskの既定 / orjson）
+サイズの大きいレスポンスと同じ形のデータで jsonify() の処理時間とレスポンスサイズを表示する。
+  orders:  管理画面の注文一覧（serialize_orders、注文1,000件 × アイテム5件）
+  designs: デザイン一覧（Design.to_dict()、1,000件）
+  users:   管理画面のユーザー一覧（1,000件）
+
+使い方: python scripts/benchmark_json.py [--orders 1000] [--items 5] [--repeat 20]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from flask.json.provider import DefaultJSONProvider
+from app import create_app, db
+from app.models.design import Design
+from app.models.order import Order
+from app.models.serializers import serialize_orders
+from app.models.user import User
+from app.utils.json_provider import OrjsonProvider, orjson
+from config import TestConfig
+from scripts.benchmark_serializers import seed
+
+
+def payloads():
+    orders = serialize_orders(Order.query.order_by(Order.id).all())
+    designs = [design.to_dict() for design in Design.query.order_by(Design.id).limit(1000)]
+    user = User.query.first()
+    users = [{
+        'id': user.id + i, 'username': f'{user.username}{i}', 'email': f'user{i}@example.com',
+        'created_at': user.created_at, 'total_orders': i, 'last_order_date': user.created_at
+    } for i in range(1000)]
+    return {
+        'orders': {'orders': orders, 'next_cursor': 'x' * 40, 'has_more': True, 'total': len(orders)},
+        'designs': {'designs': designs, 'next_cursor': 'x' * 40, 'has_more': True},
+        'users': {'users': users, 'next_cursor': 'x' * 40, 'has_more': True, 'total': len(users)},
+    }
+
+
+def run(app, provider, payload, repeat):
+    app.json = provider
+    timings = []
+    with app.test_request_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = app.json.response(payload)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000, len(response.get_data())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed")
+        return
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        seed(args.orders, args.items)
+
+        providers = [('default', DefaultJSONProvider(app)), ('orjson', OrjsonProvider(app))]
+        print(f"{'payload':<10} {'provider':<10} {'median ms':>10} {'bytes':>10}")
+        for name, payload in payloads().items():
+            results = []
+            for label, provider in providers:
+                elapsed, size = run(app, provider, payload, args.repeat)
+                results.append(elapsed)
+                print(f"{name:<10} {label:<10} {elapsed:>10.2f} {size:>10}")
+            print(f"{'':<10} {'speedup':<10} {results[0] / results[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
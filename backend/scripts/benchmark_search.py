@@ -0,0 +1,91 @@
+# scripts/benchmark_search.py
+"""
+管理画面の検索（LIKE '%q%' と検索インデックス）の比較
+指定件数のユーザー・注文をSQLiteファイルに投入し、同じ検索語で両方式の処理時間を計測する。
+
+使い方: python scripts/benchmark_search.py [--users 1000000] [--orders 3000000] [--database /tmp/search_bench.db]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import create_engine, text
+from app.utils.search import SQLITE_SEARCH_DDL
+
+
+def seed(engine, users, orders):
+    with engine.begin() as connection:
+        connection.execute(text(
+            'CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, email TEXT)'
+        ))
+        connection.execute(text(
+            'CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER, created_at TEXT)'
+        ))
+        for statement in SQLITE_SEARCH_DDL:
+            connection.execute(text(statement))
+
+        batch = 50000
+        for start in range(1, users + 1, batch):
+            rows = [{'id': i, 'username': f'user{i:08d}', 'email': f'user{i:08d}@example{i % 97}.com'}
+                    for i in range(start, min(start + batch, users + 1))]
+            connection.execute(text('INSERT INTO users VALUES (:id, :username, :email)'), rows)
+        for start in range(1, orders + 1, batch):
+            rows = [{'id': i, 'user_id': (i * 7) % users + 1, 'created_at': '2025-01-01'}
+                    for i in range(start, min(start + batch, orders + 1))]
+            connection.execute(text('INSERT INTO orders VALUES (:id, :user_id, :created_at)'), rows)
+
+
+def measure(engine, label, sql, params, iterations):
+    with engine.connect() as connection:
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            rows = connection.execute(text(sql), params).fetchall()
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"{label:<28} {len(rows):>8} {timings[len(timings) // 2] * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--orders', type=int, default=3000000)
+    parser.add_argument('--database', default='/tmp/search_bench.db')
+    parser.add_argument('--term', default='r000012')
+    parser.add_argument('--iterations', type=int, default=5)
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        os.remove(args.database)
+    engine = create_engine(f'sqlite:///{args.database}')
+
+    start = time.perf_counter()
+    seed(engine, args.users, args.orders)
+    print(f"Seeded {args.users} users / {args.orders} orders in {time.perf_counter() - start:.1f}s")
+
+    term = args.term
+    order_term = term[-4:]
+    print(f"{'query':<28} {'rows':>8} {'median ms':>10}")
+    measure(engine, 'users LIKE',
+            "SELECT id FROM users WHERE username LIKE :p OR email LIKE :p",
+            {'p': f'%{term}%'}, args.iterations)
+    measure(engine, 'users FTS5 trigram',
+            "SELECT rowid FROM users_search WHERE users_search MATCH :m",
+            {'m': f'"{term}"'}, args.iterations)
+    measure(engine, 'orders LIKE (id/email)',
+            "SELECT orders.id FROM orders JOIN users ON users.id = orders.user_id "
+            "WHERE CAST(orders.id AS TEXT) LIKE :p OR users.email LIKE :p",
+            {'p': f'%{order_term}%'}, args.iterations)
+    measure(engine, 'orders FTS5 trigram',
+            "SELECT id FROM orders WHERE id IN (SELECT rowid FROM orders_search WHERE orders_search MATCH :m) "
+            "OR user_id IN (SELECT rowid FROM users_search WHERE users_search MATCH :e)",
+            {'m': f'"{order_term}"', 'e': f'{{email}} : "{order_term}"'}, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# scripts/benchmark_serializers.py
+"""
+注文一覧のシリアライズの比較（注文1,000件 × アイテム5件）
+  to_dict:  Order.to_dict()（アイテム・デザインを行ごとに遅延読み込み）
+  eager:    selectinload / joinedload で読み込んだ上で Order.to_dict()
+  batched:  app.models.serializers.serialize_orders()（アイテム・デザインを1クエリ）
+
+インメモリのSQLiteで実行し、処理時間と発行したSQL文の数を表示する。
+使い方: python scripts/benchmark_serializers.py [--orders 1000] [--items 5] [--repeat 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import event, insert
+from app import create_app, db
+from app.models.design import Design
+from app.models.order import Order, OrderItem
+from app.models.queries import orders_with_items
+from app.models.serializers import serialize_orders
+from app.models.user import User
+from config import TestConfig
+
+
+def seed(orders, items):
+    user = User(username='bench', email='bench@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+
+    db.session.execute(insert(Design), [{
+        'user_id': user.id, 'prompt': f'design {i}', 'image_url': f'https://example.com/{i}.png',
+        's3_key': f'designs/{i}.png', 'renditions': {'128': f'https://example.com/{i}_w128.webp'}
+    } for i in range(orders * items)])
+    db.session.execute(insert(Order), [{
+        'user_id': user.id, 'total_amount': 3000 * items, 'status': 'processing',
+        'shipping_address': {'name': 'Bench'}
+    } for _ in range(orders)])
+    db.session.execute(insert(OrderItem), [{
+        'order_id': order_id, 'design_id': (order_id - 1) * items + i + 1,
+        'quantity': 1, 'size': 'M', 'color': 'White', 'price': 3000
+    } for order_id in range(1, orders + 1) for i in range(items)])
+    db.session.commit()
+
+
+def run(label, fn, repeat):
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', count)
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+        event.remove(db.engine, 'before_cursor_execute', count)
+    timings.sort()
+    print(f"{label:<10} {timings[len(timings) // 2] * 1000:>10.1f} {len(statements):>8}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        seed(args.orders, args.items)
+
+        print(f"{args.orders} orders x {args.items} items")
+        print(f"{'mode':<10} {'median ms':>10} {'queries':>8}")
+        lazy = run('to_dict', lambda: [order.to_dict() for order in Order.query.order_by(Order.id).all()], args.repeat)
+        eager = run('eager', lambda: [
+            order.to_dict() for order in orders_with_items(Order.query).order_by(Order.id).all()
+        ], args.repeat)
+        batched = run('batched', lambda: serialize_orders(Order.query.order_by(Order.id).all()), args.repeat)
+        assert lazy == eager == batched
+
+
+if __name__ == "__main__":
+    main()
@@ -7,18 +7,14 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 from dotenv import load_dotenv
-import boto3
+from app.utils.aws import aws_clients
 
 def check_tables_status():
     load_dotenv()
     
-    dynamodb = boto3.client('dynamodb',
-        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-        region_name=os.getenv('AWS_REGION')
-    )
+    dynamodb = aws_clients.client('dynamodb')
     
-    tables = ['DesignRequests', 'DesignCache']
+    tables = ['DesignRequests', 'DesignCache', 'TranslationCache']
     
     for table_name in tables:
         try:
@@ -0,0 +1,58 @@
+# scripts/manage_partitions.py
+"""
+orders / order_items の月別パーティションの管理（PostgreSQL でパーティション化している場合）
+  create: 今月から --months-ahead か月先までのパーティションを作成（cronで毎日実行する）
+  detach: --before の月より前のパーティションを切り離す（切り離したテーブルは退避してから削除する）
+
+使い方:
+  python scripts/manage_partitions.py create [--months-ahead 3]
+  python scripts/manage_partitions.py detach --before 2024-01
+"""
+import argparse
+import sys
+from datetime import date
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from dotenv import load_dotenv
+from app import create_app, db
+from app.models.partitions import ensure_partitions, detach_partitions, is_partitioned
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    create = subparsers.add_parser('create')
+    create.add_argument('--months-ahead', type=int)
+    detach = subparsers.add_parser('detach')
+    detach.add_argument('--before', required=True, help='YYYY-MM')
+    args = parser.parse_args()
+
+    load_dotenv()
+    app = create_app()
+
+    with app.app_context():
+        if not is_partitioned():
+            print("orders is not partitioned (PostgreSQL with ORDERS_PARTITIONING=true only)")
+            return
+
+        with db.engine.begin() as connection:
+            if args.command == 'create':
+                months_ahead = args.months_ahead or app.config['ORDERS_PARTITION_MONTHS_AHEAD']
+                created = ensure_partitions(connection, months_ahead)
+                print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+                return
+
+            detached = detach_partitions(connection, date.fromisoformat(f'{args.before}-01'))
+
+        print(f"Detached {len(detached)} partitions: {', '.join(detached) or '-'}")
+        for name in detached:
+            # 売上集計（sales_rollups）は残るため、ダッシュボードの集計には影響しない
+            print(f"  pg_dump --format=custom --table={name} \"$DATABASE_URL\" | aws s3 cp - s3://$ARCHIVE_BUCKET/{name}.dump")
+            print(f"  psql \"$DATABASE_URL\" -c 'DROP TABLE {name}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# scripts/rebuild_sales_rollups.py
+"""
+売上集計テーブル（sales_rollups）を注文テーブルから作り直す
+使い方: python scripts/rebuild_sales_rollups.py
+"""
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from dotenv import load_dotenv
+from app import create_app
+from app.models.stats import rebuild_rollups
+
+def rebuild_sales_rollups():
+    load_dotenv()
+    app = create_app()
+
+    with app.app_context():
+        buckets = rebuild_rollups()
+        print(f"Rebuilt sales rollups: {buckets} buckets")
+
+if __name__ == "__main__":
+    rebuild_sales_rollups()
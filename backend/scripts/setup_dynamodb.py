@@ -27,6 +27,11 @@ def setup_dynamodb():
         print("Creating DesignCache table...")
         design_cache = client.create_design_cache_table()
         print(f"DesignCache table status: {design_cache.table_status}")
+
+        # Create TranslationCache table
+        print("Creating TranslationCache table...")
+        translation_cache = client.create_translation_cache_table()
+        print(f"TranslationCache table status: {translation_cache.table_status}")
         
     except Exception as e:
         print(f"Error setting up DynamoDB: {str(e)}")
@@ -1,6 +1,8 @@
 # tests/conftest.py
 import pytest
 from app import create_app, db
+from app.models.design import Design
+from app.models.order import Order, OrderItem, CartItem
 from app.models.user import User
 from config import TestConfig
 
@@ -29,4 +31,69 @@ def auth_token(client):
         'username': 'user',
         'password': 'password'
     })
-    return response.json['access_token']
\ No newline at end of file
+    return response.json['access_token']
+
+@pytest.fixture
+def admin_token(client):
+    # 管理者ユーザーを作成してトークンを取得
+    admin = User(username='admin', email='admin@test.com', is_admin=True)
+    admin.set_password('password')
+    db.session.add(admin)
+    db.session.commit()
+
+    response = client.post('/api/auth/login', json={
+        'username': 'admin',
+        'password': 'password'
+    })
+    return response.json['access_token']
+
+@pytest.fixture
+def seed_cart():
+    """ユーザーのカートにデザイン付きのアイテムを count 件追加する関数"""
+    def seed(user_id, count):
+        for i in range(count):
+            design = Design(user_id=user_id, prompt=f'design {i}', image_url=f'https://example.com/{i}.png', s3_key=f'designs/{i}.png')
+            db.session.add(design)
+            db.session.flush()
+            db.session.add(CartItem(user_id=user_id, design_id=design.id, quantity=1, size='M', color='White'))
+        db.session.commit()
+
+    return seed
+
+@pytest.fixture
+def seed_order():
+    """アイテム count 件の注文を作成して注文IDを返す関数"""
+    def seed(user_id, count):
+        order = Order(user_id=user_id, total_amount=3000 * count, status='processing', shipping_address={'name': 'Test'})
+        db.session.add(order)
+        db.session.flush()
+        for i in range(count):
+            design = Design(user_id=user_id, prompt=f'design {i}', image_url=f'https://example.com/{i}.png', s3_key=f'designs/{i}.png')
+            db.session.add(design)
+            db.session.flush()
+            db.session.add(OrderItem(order_id=order.id, design_id=design.id, quantity=1, size='M', color='White', price=3000))
+        db.session.commit()
+        return order.id
+
+    return seed
+
+@pytest.fixture
+def count_queries(app):
+    """ブロック内で実行されたSQL文の数を数える"""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
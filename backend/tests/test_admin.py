@@ -5,20 +5,6 @@ from app.models.user import User
 from app.models.order import Order
 import json
 
-@pytest.fixture
-def admin_token(client):
-    # 管理者ユーザーを作成してトークンを取得
-    admin = User(username='admin', email='admin@test.com', is_admin=True)
-    admin.set_password('password')
-    db.session.add(admin)
-    db.session.commit()
-
-    response = client.post('/api/auth/login', json={
-        'username': 'admin',
-        'password': 'password'
-    })
-    return json.loads(response.data)['access_token']
-
 def test_get_stats(client, admin_token):
     response = client.get('/api/admin/stats', 
         headers={'Authorization': f'Bearer {admin_token}'})
@@ -34,4 +20,160 @@ def test_search_orders(client, admin_token):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert 'orders' in data
-    assert 'total' in data
\ No newline at end of file
+    assert 'total' in data
+
+def test_cache_stats(client, admin_token):
+    response = client.get('/api/admin/cache-stats',
+        headers={'Authorization': f'Bearer {admin_token}'})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert 'translation' in data
+    assert data['design_dedup']['hit_rate'] == 0.0
+
+def test_get_users_with_order_stats(client, admin_token, count_queries):
+    buyer = User(username='buyer', email='buyer@test.com')
+    buyer.set_password('password')
+    db.session.add(buyer)
+    db.session.flush()
+    for amount in (1000, 2500):
+        db.session.add(Order(user_id=buyer.id, total_amount=amount, status='processing', shipping_address={}))
+    db.session.commit()
+
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    with count_queries() as statements:
+        response = client.get('/api/admin/users?sort=spend', headers=headers)
+    assert response.status_code == 200, response.data
+    # 件数取得 + 集計付きの一覧取得（ユーザー数に関わらず2クエリ）
+    assert len(statements) == 2
+
+    users = json.loads(response.data)['users']
+    assert users[0]['username'] == 'buyer'
+    assert users[0]['orders_count'] == 2
+    assert users[0]['total_spent'] == 3500.0
+    assert users[1]['orders_count'] == 0
+
+    response = client.get('/api/admin/users?sort=created_at&order=asc', headers=headers)
+    users = json.loads(response.data)['users']
+    assert [user['username'] for user in users] == ['admin', 'buyer']
+    assert users[1]['orders_count'] == 2
+
+    # カーソルで次ページを取得（集計値での並び替えでも同じ）
+    for sort in ('', '&sort=spend'):
+        response = client.get(f'/api/admin/users?per_page=1{sort}', headers=headers)
+        data = json.loads(response.data)
+        assert data['total'] == 2
+        assert data['has_more'] is True
+        first = data['users'][0]['username']
+
+        response = client.get(f'/api/admin/users?per_page=1{sort}&cursor={data["next_cursor"]}', headers=headers)
+        data = json.loads(response.data)
+        assert data['has_more'] is False
+        assert {first, data['users'][0]['username']} == {'admin', 'buyer'}
+
+    assert client.get('/api/admin/users?cursor=broken', headers=headers).status_code == 400
+
+    assert client.get('/api/admin/users?sort=unknown', headers=headers).status_code == 400
+
+def test_search_users_and_orders(client, admin_token):
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    alice = User(username='alice', email='alice@example.com')
+    bob = User(username='bob', email='bob_smith@shop.jp')
+    for user in (alice, bob):
+        user.set_password('password')
+        db.session.add(user)
+    db.session.flush()
+    alice_order = Order(user_id=alice.id, total_amount=1000, status='processing', shipping_address={})
+    bob_order = Order(user_id=bob.id, total_amount=2000, status='processing', shipping_address={})
+    db.session.add_all([alice_order, bob_order])
+    db.session.commit()
+
+    # ユーザー名・メールアドレスの部分一致（3文字以上は検索インデックス、未満はLIKE）
+    for search, expected in (('lic', {'alice'}), ('SHOP.JP', {'bob'}), ('b', {'bob'}), ('_sm', {'bob'})):
+        response = client.get(f'/api/admin/users?search={search}', headers=headers)
+        assert response.status_code == 200, response.data
+        assert {user['username'] for user in json.loads(response.data)['users']} == expected
+
+    # 顧客メールアドレスで注文を検索
+    response = client.get('/api/admin/orders/search?query=example.com', headers=headers)
+    data = json.loads(response.data)
+    assert [order['id'] for order in data['orders']] == [alice_order.id]
+
+    # 注文IDの完全一致
+    response = client.get(f'/api/admin/orders/search?query=%23{bob_order.id}', headers=headers)
+    data = json.loads(response.data)
+    assert [order['id'] for order in data['orders']] == [bob_order.id]
+
+    # '#' なしの数字は部分一致（存在しない注文IDの '#' 指定は0件）
+    response = client.get(f'/api/admin/orders/search?query={bob_order.id}', headers=headers)
+    assert bob_order.id in [order['id'] for order in json.loads(response.data)['orders']]
+    response = client.get('/api/admin/orders/search?query=%23999999', headers=headers)
+    assert json.loads(response.data)['orders'] == []
+
+    # 更新・削除が検索インデックスに反映される
+    alice.email = 'alice@changed.org'
+    db.session.commit()
+    response = client.get('/api/admin/users?search=example.com', headers=headers)
+    assert json.loads(response.data)['users'] == []
+
+def test_sales_rollups_do_not_drift(app):
+    from datetime import date
+    from app.models.stats import SalesRollup, _add
+
+    # 金額の加算・減算を繰り返しても誤差が出ない（円は整数で集計する）
+    for _ in range(100):
+        _add(date(2025, 1, 1), 'processing', 1, 1000.1)
+        _add(date(2025, 1, 1), 'processing', -1, -1000.1)
+    _add(date(2025, 1, 1), 'processing', 1, 3000)
+    db.session.commit()
+    assert db.session.get(SalesRollup, (date(2025, 1, 1), 'processing')).total_amount == 3000
+
+def test_sales_rollups(client, admin_token):
+    from datetime import datetime
+    from app.models.stats import record_order, rebuild_rollups
+
+    headers = {'Authorization': f'Bearer {admin_token}'}
+    admin = User.query.filter_by(username='admin').first()
+    orders = [
+        Order(user_id=admin.id, total_amount=1000, status='processing', shipping_address={},
+              created_at=datetime(2025, 1, 1, 10)),
+        Order(user_id=admin.id, total_amount=2000, status='processing', shipping_address={},
+              created_at=datetime(2025, 1, 1, 23)),
+        Order(user_id=admin.id, total_amount=4000, status='processing', shipping_address={},
+              created_at=datetime(2025, 1, 8, 9)),
+    ]
+    for order in orders:
+        db.session.add(order)
+        db.session.flush()
+        record_order(order)
+    db.session.commit()
+
+    response = client.put(f'/api/admin/orders/{orders[0].id}/status', json={'status': 'shipped'}, headers=headers)
+    assert response.status_code == 200, response.data
+
+    data = client.get('/api/admin/stats', headers=headers).json
+    assert data['total_sales'] == 7000.0
+    assert data['total_orders'] == 3
+    assert data['status_counts'] == {'processing': 2, 'shipped': 1}
+
+    response = client.get('/api/admin/stats/timeseries?from=2025-01-01&to=2025-01-08', headers=headers)
+    series = response.json['series']
+    assert len(series) == 8
+    assert series[0] == {'period': '2025-01-01', 'orders': 2, 'sales': 3000.0,
+                         'status_counts': {'processing': 1, 'shipped': 1}}
+    assert series[7]['sales'] == 4000.0
+
+    response = client.get('/api/admin/stats/timeseries?from=2025-01-01&to=2025-01-31&granularity=week',
+                          headers=headers)
+    assert [(point['period'], point['orders']) for point in response.json['series']][:3] == [
+        ('2024-12-30', 2), ('2025-01-06', 1), ('2025-01-13', 0)
+    ]
+
+    # 作り直しても同じ集計になる
+    before = client.get('/api/admin/stats', headers=headers).json
+    rebuild_rollups()
+    after = client.get('/api/admin/stats', headers=headers).json
+    assert after['status_counts'] == before['status_counts']
+    assert after['total_sales'] == before['total_sales'] == 7000
+
+    assert client.get('/api/admin/stats/timeseries?granularity=year', headers=headers).status_code == 400
+    assert client.get('/api/admin/stats/timeseries?from=2025-02-01&to=2025-01-01', headers=headers).status_code == 400
@@ -0,0 +1,36 @@
+# tests/test_aws.py
+import threading
+from app.utils.aws import aws_clients
+from app.utils.s3 import S3Client
+
+def test_clients_are_shared(app):
+    client = aws_clients.client('s3')
+    assert aws_clients.client('s3') is client
+    assert S3Client().s3_client is client
+
+    # リソースはスレッドごとに作成される
+    resources = []
+    thread = threading.Thread(target=lambda: resources.append(aws_clients.resource('dynamodb')))
+    thread.start()
+    thread.join()
+    assert aws_clients.resource('dynamodb') is aws_clients.resource('dynamodb')
+    assert resources[0] is not aws_clients.resource('dynamodb')
+
+def test_override_with_stub(app):
+    stub = object()
+    aws_clients.override('s3', stub)
+    try:
+        assert S3Client().s3_client is stub
+    finally:
+        aws_clients.clear_overrides()
+
+def test_translation_store_uses_per_thread_resource(app):
+    from app.utils.translation_cache import DynamoDBTranslationStore
+    store = DynamoDBTranslationStore(ttl=60)
+
+    resources = []
+    thread = threading.Thread(target=lambda: resources.append(store._client().dynamodb))
+    thread.start()
+    thread.join()
+    assert store._client().dynamodb is aws_clients.resource('dynamodb')
+    assert resources[0] is not aws_clients.resource('dynamodb')
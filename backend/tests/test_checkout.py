@@ -0,0 +1,105 @@
+# tests/test_checkout.py
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app import create_app, db
+from app.api.payment import routes as payment_routes
+from app.models.order import Order, OrderItem, CartItem
+from app.models.user import User
+from config import TestConfig
+
+SHIPPING = {'name': 'Test User', 'postal_code': '123-4567', 'address': 'Test Address', 'city': 'Shibuya'}
+
+@pytest.fixture(autouse=True)
+def charged(monkeypatch):
+    """決済IDごとの決済金額（Stripeの PaymentIntent の amount）"""
+    amounts = {}
+    monkeypatch.setattr(payment_routes.StripeService, 'get_payment_intent', staticmethod(
+        lambda payment_id: {'id': payment_id, 'status': 'succeeded', 'amount': amounts.get(payment_id)}
+    ))
+    monkeypatch.setattr(payment_routes.EmailService, 'send_order_confirmation', staticmethod(lambda **kwargs: True))
+    return amounts
+
+def confirm(client, headers, payment_id):
+    return client.post('/api/payment/confirm-payment', headers=headers,
+                       json={'payment_intent_id': payment_id, 'shipping_address': SHIPPING})
+
+@pytest.mark.parametrize('count', [1, 5])
+def test_confirm_payment_is_idempotent(client, auth_token, count_queries, count, seed_cart, charged):
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    seed_cart(1, count)
+    charged['pi_1'] = 3000 * count + 500
+
+    db.session.expunge_all()
+    with count_queries() as statements:
+        response = confirm(client, headers, 'pi_1')
+    assert response.status_code == 200, response.data
+    # カートの件数に関わらず一定（注文アイテムは1文のINSERT、カートは1文のDELETE）
+    assert len([s for s in statements if s.startswith(('INSERT', 'DELETE'))]) == 4
+
+    retry = confirm(client, headers, 'pi_1')
+    assert retry.status_code == 200
+    assert retry.json == {'message': 'Order already processed', 'order_id': response.json['order_id']}
+
+    assert Order.query.count() == 1
+    assert OrderItem.query.count() == count
+    assert CartItem.query.count() == 0
+
+def test_empty_cart(client, auth_token):
+    response = confirm(client, {'Authorization': f'Bearer {auth_token}'}, 'pi_1')
+    assert response.status_code == 400
+
+def test_charged_amount_mismatch(client, auth_token, seed_cart, charged):
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    seed_cart(1, 2)
+    charged['pi_1'] = 3000 + 500
+
+    # 決済作成後にカートへ追加された（決済金額と合計が一致しない）場合は注文を作らない
+    response = confirm(client, headers, 'pi_1')
+    assert response.status_code == 409, response.data
+    assert Order.query.count() == 0
+    assert CartItem.query.count() == 2
+
+def test_parallel_confirmations(tmp_path, seed_cart, charged):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/checkout.db'
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(username='user', email='user@test.com')
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        seed_cart(user.id, 3)
+        charged['pi_same'] = 3000 * 3 + 500
+        charged.update({f'pi_{i}': 3000 * 2 + 500 for i in range(8)})
+        token = app.test_client().post('/api/auth/login', json={'username': 'user', 'password': 'password'}).json['access_token']
+        db.session.remove()
+
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def run(payment_id):
+        with app.app_context():
+            response = confirm(app.test_client(), headers, payment_id)
+            db.session.remove()
+            return response.status_code, response.json
+
+    # 同じ決済の確認が同時に届いても注文は1件
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(run, ['pi_same'] * 8))
+    assert {status for status, _ in results} == {200}
+    assert len({body['order_id'] for _, body in results}) == 1
+
+    # 別の決済で同じカートを同時に確認しても、カートを注文できるのは1件だけ
+    with app.app_context():
+        seed_cart(1, 2)
+        db.session.remove()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(run, [f'pi_{i}' for i in range(8)]))
+    assert sorted(status for status, _ in results) == [200] + [400] * 7
+
+    with app.app_context():
+        assert Order.query.count() == 2
+        assert OrderItem.query.count() == 5
+        assert CartItem.query.count() == 0
+        db.drop_all()
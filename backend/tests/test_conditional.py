@@ -0,0 +1,123 @@
+# tests/test_conditional.py
+from datetime import datetime
+from app import db
+from app.models.design import Design
+from app.models.order import Order, OrderItem, CartItem
+from app.models.user import User
+
+def seed(user_id):
+    design = Design(user_id=user_id, prompt='design', image_url='https://example.com/a.png', s3_key='designs/a.png')
+    db.session.add(design)
+    db.session.flush()
+    db.session.add(CartItem(user_id=user_id, design_id=design.id, quantity=1, size='M', color='White'))
+    order = Order(user_id=user_id, total_amount=3000, status='processing', shipping_address={'name': 'Test'})
+    db.session.add(order)
+    db.session.flush()
+    db.session.add(OrderItem(order_id=order.id, design_id=design.id, quantity=1, size='M', color='White', price=3000))
+    db.session.commit()
+    # 更新から1秒以上経った状態にする（同じ秒の間は Last-Modified を付けない）
+    for model in (Design, CartItem, Order):
+        model.query.update({model.updated_at: datetime(2025, 1, 1)})
+    db.session.commit()
+    return design.id, order.id
+
+def test_not_modified(client, auth_token, count_queries):
+    design_id, order_id = seed(1)
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    for url in ['/api/designs/designs', f'/api/designs/designs/{design_id}', '/api/cart/items',
+                '/api/cart/items/1', f'/api/orders/{order_id}']:
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200, url
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+        etag, last_modified = response.headers['ETag'], response.headers.get('Last-Modified')
+
+        # 一致すればバージョンの1クエリだけで304（本体は作らない）
+        db.session.expunge_all()
+        with count_queries() as statements:
+            response = client.get(url, headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304, url
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        assert len(statements) == 1
+
+        # 単一のリソースは If-Modified-Since でも304（一覧は削除を検出できないので Last-Modified を付けない）
+        if url in ('/api/designs/designs', '/api/cart/items'):
+            assert last_modified is None, url
+        else:
+            response = client.get(url, headers={**headers, 'If-Modified-Since': last_modified})
+            assert response.status_code == 304, url
+
+    # クエリ文字列が違えば別のETag
+    first = client.get('/api/designs/designs', headers=headers).headers['ETag']
+    assert client.get('/api/designs/designs?limit=1', headers=headers).headers['ETag'] != first
+
+def test_changes_invalidate_etag(client, auth_token):
+    design_id, order_id = seed(1)
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    def etag(url):
+        return client.get(url, headers=headers).headers['ETag']
+
+    cart = etag('/api/cart/items')
+    client.put('/api/cart/items/1', headers=headers, json={'quantity': 2})
+    assert etag('/api/cart/items') != cart
+
+    # カートのデザインの派生画像が生成された
+    cart = etag('/api/cart/items')
+    design = db.session.get(Design, design_id)
+    design.renditions = {'128': 'https://example.com/a_w128.webp'}
+    design.updated_at = datetime(2100, 1, 1)
+    db.session.commit()
+    assert etag('/api/cart/items') != cart
+
+    # 削除（更新日時の最大値は変わらない）
+    db.session.add(CartItem(user_id=1, design_id=design_id, quantity=1, size='L', color='White'))
+    db.session.commit()
+    cart = etag('/api/cart/items')
+    client.delete('/api/cart/items/1', headers=headers)
+    assert etag('/api/cart/items') != cart
+
+    order = etag(f'/api/orders/{order_id}')
+    db.session.get(Order, order_id).status = 'shipped'
+    db.session.commit()
+    assert etag(f'/api/orders/{order_id}') != order
+
+def test_if_modified_since_after_delete(client, auth_token):
+    design_id, _ = seed(1)
+    db.session.add(CartItem(user_id=1, design_id=design_id, quantity=1, size='L', color='White'))
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    since = {**headers, 'If-Modified-Since': 'Wed, 01 Jan 2099 00:00:00 GMT'}
+
+    response = client.get('/api/cart/items', headers=headers)
+    assert len(response.json['cart_items']) == 2
+    client.delete('/api/cart/items/1', headers=headers)
+
+    # 削除後は If-Modified-Since だけでは304にならない
+    response = client.get('/api/cart/items', headers=since)
+    assert response.status_code == 200
+    assert len(response.json['cart_items']) == 1
+
+def test_last_modified_within_same_second(client, auth_token):
+    design_id, _ = seed(1)
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    client.put('/api/cart/items/1', headers=headers, json={'quantity': 2})
+
+    # 更新した秒のうちは Last-Modified を付けない（続く同じ秒の更新と区別できないため）
+    response = client.get('/api/cart/items/1', headers=headers)
+    assert response.status_code == 200
+    assert 'Last-Modified' not in response.headers
+
+def test_other_users_resources(client, auth_token):
+    db.session.add(User(username='other', email='other@test.com', password_hash='x'))
+    db.session.commit()
+    design_id, order_id = seed(2)
+    headers = {'Authorization': f'Bearer {auth_token}'}
+
+    # 他のユーザーのものはETagを付けずにビューの結果（403 / 404）を返す
+    response = client.get(f'/api/designs/designs/{design_id}', headers=headers)
+    assert response.status_code == 403
+    assert 'ETag' not in response.headers
+    assert client.get('/api/cart/items/1', headers=headers).status_code == 404
+    assert client.get(f'/api/orders/{order_id}', headers=headers).status_code == 403
@@ -0,0 +1,113 @@
+# tests/test_db_routing.py
+import time
+
+import pytest
+from sqlalchemy import insert
+from app import create_app, db
+from app.models.design import Design
+from app.models.user import User
+from app.utils.db_routing import SQLiteWriteMarkers, replica_router
+from config import TestConfig
+
+@pytest.fixture(autouse=True)
+def cleanup_replica_metadata():
+    yield
+    # init_app が作るレプリカ用のMetaDataを削除（他のテストの create_all に含まれないように）
+    db.metadatas.pop('replica', None)
+
+def make_app(tmp_path, replica_url, fallback='primary'):
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/primary.db'
+        SQLALCHEMY_BINDS = {'replica': replica_url}
+        REPLICA_FALLBACK = fallback
+        REPLICA_WRITE_MARKER_SQLITE_PATH = f'{tmp_path}/replica_writes.sqlite3'
+
+    replica_router.reset()
+    return create_app(ReplicaConfig)
+
+def seed(engine, prompt):
+    """テーブルを作成し、ユーザー（同じID）とデザインを1件登録"""
+    db.metadata.create_all(engine)
+    user = User(username='user', email='user@test.com')
+    user.set_password('password')
+    with engine.begin() as connection:
+        connection.execute(insert(User).values(id=1, username='user', email='user@test.com', password_hash=user.password_hash))
+        connection.execute(insert(Design).values(user_id=1, prompt=prompt, image_url='https://example.com/a.png', s3_key='designs/a.png'))
+
+def login(client):
+    response = client.post('/api/auth/login', json={'username': 'user', 'password': 'password'})
+    return {'Authorization': f'Bearer {response.json["access_token"]}'}
+
+def prompts(client, headers):
+    response = client.get('/api/designs/designs', headers=headers)
+    return response.status_code, [design['prompt'] for design in response.json.get('designs', [])]
+
+def test_read_only_endpoints_use_replica(tmp_path):
+    app = make_app(tmp_path, f'sqlite:///{tmp_path}/replica.db')
+    with app.app_context():
+        seed(db.engine, 'primary')
+        seed(db.engines['replica'], 'replica')
+        client = app.test_client()
+        headers = login(client)
+
+        # @read_only のエンドポイントはレプリカから読む
+        assert prompts(client, headers) == (200, ['replica'])
+
+        # 書き込んだユーザーはしばらくプライマリから読む（read-your-writes）
+        response = client.put('/api/auth/update-password', headers=headers,
+                              json={'current_password': 'password', 'new_password': 'password2'})
+        assert response.status_code == 200
+        assert prompts(client, headers) == (200, ['primary'])
+        db.session.remove()
+
+def test_read_your_writes_across_app_instances(tmp_path):
+    replica_url = f'sqlite:///{tmp_path}/replica.db'
+    writer = make_app(tmp_path, replica_url)
+    with writer.app_context():
+        seed(db.engine, 'primary')
+        seed(db.engines['replica'], 'replica')
+        client = writer.test_client()
+        headers = login(client)
+        response = client.put('/api/auth/update-password', headers=headers,
+                              json={'current_password': 'password', 'new_password': 'password2'})
+        assert response.status_code == 200
+        db.session.remove()
+
+    # 別のワーカー（プロセス内の状態を持たないアプリ）でも書き込みの記録が見える
+    reader = make_app(tmp_path, replica_url)
+    with reader.app_context():
+        assert prompts(reader.test_client(), headers) == (200, ['primary'])
+        # 記録の期限が切れたらレプリカに戻る
+        conn = replica_router.markers._connect()
+        conn.execute('UPDATE write_markers SET until = 0')
+        conn.close()
+        assert prompts(reader.test_client(), headers) == (200, ['replica'])
+        db.session.remove()
+
+def test_replica_unavailable(tmp_path):
+    missing = f'sqlite:///{tmp_path}/missing/replica.db'
+    app = make_app(tmp_path, missing)
+    with app.app_context():
+        seed(db.engine, 'primary')
+        client = app.test_client()
+        headers = login(client)
+        # 既定ではプライマリにフォールバック
+        assert prompts(client, headers) == (200, ['primary'])
+        db.session.remove()
+
+    app = make_app(tmp_path, missing, fallback='error')
+    with app.app_context():
+        client = app.test_client()
+        assert prompts(client, login(client))[0] == 503
+        db.session.remove()
+
+def test_write_markers_prune_periodically(tmp_path):
+    markers = SQLiteWriteMarkers(str(tmp_path / 'markers.sqlite3'), prune_interval=3600)
+    markers.mark('2', time.time() + 60)
+    markers.mark('1', time.time() - 10)
+    # 直前に削除済みなので期限切れの記録は次の間隔まで残る
+    assert markers.until('1') is not None
+    markers._next_prune = 0
+    markers.mark('2', time.time() + 60)
+    assert markers.until('1') is None
+    assert markers.until('2') is not None
@@ -0,0 +1,219 @@
+# tests/test_designs.py
+import json
+import pytest
+from io import BytesIO
+from PIL import Image
+from app.api.designs import routes as design_routes
+from app.utils.job_queue import job_manager
+
+def make_png(size=64):
+    buffer = BytesIO()
+    Image.new('RGBA', (size, size), (255, 0, 0, 255)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+class FakeDynamoDBClient:
+    items = {}
+
+    def store_design_request(self, request_id, user_id, prompt):
+        self.items[(request_id, user_id)] = {'request_id': request_id, 'user_id': user_id, 'prompt': prompt, 'status': 'pending'}
+
+    def update_design_request_status(self, request_id, user_id, status, **attributes):
+        self.items[(request_id, user_id)].update(status=status, **attributes)
+
+    def get_design_request(self, request_id, user_id):
+        return self.items.get((request_id, user_id))
+
+    def cache_design(self, design_id, image_url):
+        pass
+
+class FakeStableDiffusionClient:
+    calls = 0
+
+    def generation_params(self, size=1024, seed=0):
+        return {'engine': 'fake', 'cfg_scale': 7, 'width': size, 'height': size, 'samples': 1, 'steps': 30, 'seed': seed}
+
+    def generate_image(self, prompt, size=1024, seed=0):
+        FakeStableDiffusionClient.calls += 1
+        return make_png()
+
+    def generate_images(self, prompt, samples, size=1024, seed=0):
+        FakeStableDiffusionClient.calls += 1
+        return [make_png() for _ in range(samples)]
+
+class FakeS3Client:
+    objects = {}
+
+    def upload_design(self, image_data, filename, content_type='image/png'):
+        self.objects[filename] = image_data
+        return f'https://example.com/{filename}'
+
+    def download_design(self, filename):
+        return self.objects[filename]
+
+@pytest.fixture
+def fake_services(monkeypatch):
+    FakeDynamoDBClient.items = {}
+    FakeStableDiffusionClient.calls = 0
+    FakeS3Client.objects = {}
+    monkeypatch.setattr(design_routes, 'DynamoDBClient', FakeDynamoDBClient)
+    monkeypatch.setattr(design_routes, 'StableDiffusionClient', FakeStableDiffusionClient)
+    monkeypatch.setattr(design_routes, 'S3Client', FakeS3Client)
+    monkeypatch.setattr(design_routes, 'translate_text', lambda text: f'translated {text}')
+
+def test_generate_design_is_queued(client, auth_token, fake_services):
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    response = client.post('/api/designs/generate', headers=headers, json={'prompt': '青い猫'})
+    assert response.status_code == 202, response.data
+    request_id = json.loads(response.data)['request_id']
+
+    assert job_manager.join(timeout=5)
+
+    status_response = client.get(f'/api/designs/requests/{request_id}', headers=headers)
+    assert status_response.status_code == 200
+    data = json.loads(status_response.data)
+    assert data['status'] == 'done'
+    assert data['design']['prompt'] == '青い猫'
+
+    # アップロード後にWebPの派生画像が生成される
+    designs = json.loads(client.get('/api/designs/designs', headers=headers).data)['designs']
+    assert set(designs[0]['srcset']) == {'128', '256', '512'}
+    assert designs[0]['srcset']['128'].endswith('_w128.webp')
+
+def test_renditions_submit_error_does_not_fail_design(client, auth_token, fake_services, monkeypatch):
+    submit = job_manager.submit
+
+    def failing_submit(name, job_id, payload):
+        if name == 'design.renditions':
+            raise RuntimeError('UNIQUE constraint failed: jobs.id')
+        return submit(name, job_id, payload)
+
+    monkeypatch.setattr(job_manager, 'submit', failing_submit)
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    response = client.post('/api/designs/generate', headers=headers, json={'prompt': '青い猫'})
+    request_id = json.loads(response.data)['request_id']
+    assert job_manager.join(timeout=5)
+
+    data = json.loads(client.get(f'/api/designs/requests/{request_id}', headers=headers).data)
+    assert data['status'] == 'done'
+
+def test_generate_design_dedup(client, auth_token, fake_services):
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    request_ids = []
+    for _ in range(2):
+        response = client.post('/api/designs/generate', headers=headers,
+            json={'prompt': '赤い犬', 'dedup': True, 'seed': 42})
+        assert response.status_code == 202, response.data
+        request_ids.append(json.loads(response.data)['request_id'])
+        assert job_manager.join(timeout=5)
+
+    designs = [
+        json.loads(client.get(f'/api/designs/requests/{request_id}', headers=headers).data)['design']
+        for request_id in request_ids
+    ]
+    assert FakeStableDiffusionClient.calls == 1
+    assert designs[0]['id'] != designs[1]['id']
+    assert designs[0]['image_url'] == designs[1]['image_url']
+
+def test_generate_design_dedup_skips_random_seed(client, auth_token, fake_services):
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    for _ in range(2):
+        response = client.post('/api/designs/generate', headers=headers,
+            json={'prompt': '赤い犬', 'dedup': True})
+        assert response.status_code == 202, response.data
+        assert job_manager.join(timeout=5)
+
+    # seed=0 はランダム生成なので毎回生成する
+    assert FakeStableDiffusionClient.calls == 2
+
+def test_generate_design_batch(client, auth_token, fake_services):
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    response = client.post('/api/designs/generate-batch', headers=headers,
+        json={'prompt': '星空', 'count': 3})
+    assert response.status_code == 202, response.data
+    request_id = json.loads(response.data)['request_id']
+    assert job_manager.join(timeout=5)
+
+    data = json.loads(client.get(f'/api/designs/requests/{request_id}', headers=headers).data)
+    assert data['status'] == 'done'
+    assert len(data['designs']) == 3
+    assert len({design['image_url'] for design in data['designs']}) == 3
+    assert FakeStableDiffusionClient.calls == 1
+
+@pytest.mark.parametrize('count', [True, 0, 5, '2', 1.5])
+def test_generate_design_batch_rejects_invalid_count(client, auth_token, fake_services, count):
+    response = client.post('/api/designs/generate-batch',
+        headers={'Authorization': f'Bearer {auth_token}'},
+        json={'prompt': '星空', 'count': count})
+    assert response.status_code == 400
+
+def test_design_request_not_found(client, auth_token, fake_services):
+    response = client.get('/api/designs/requests/unknown',
+        headers={'Authorization': f'Bearer {auth_token}'})
+    assert response.status_code == 404
+
+def test_translation_cache(app, monkeypatch):
+    from app.utils.translation_cache import translation_cache
+    calls = []
+
+    class FakeOpenAIClient:
+        def chat_completion(self, messages, model="gpt-4o"):
+            calls.append(messages[1]['content'])
+            return 'a blue cat'
+
+    monkeypatch.setattr(design_routes, 'OpenAIClient', FakeOpenAIClient)
+
+    assert design_routes.translate_text('青い猫') == 'a blue cat'
+    # 空白・全角の揺れは同じキーとして扱う
+    assert design_routes.translate_text('　青い猫 ') == 'a blue cat'
+    assert len(calls) == 1
+
+    stats = translation_cache.stats()
+    assert stats['local_hits'] == 1
+    assert stats['misses'] == 1
+
+def test_design_mockup(client, auth_token, fake_services):
+    from app import db
+    from app.models.design import Design
+    from app.utils.mockup import mockup_cache
+
+    design = Design(user_id=1, prompt='テスト', image_url='https://example.com/a.png', s3_key='designs/1/a.png')
+    db.session.add(design)
+    db.session.commit()
+    FakeS3Client.objects['designs/1/a.png'] = make_png(256)
+
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    url = f'/api/designs/{design.id}/mockup?color=navy&config=' + json.dumps({'position': {'x': 10, 'y': -20}, 'scale': 0.8, 'rotation': 15})
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.data
+    assert response.mimetype == 'image/png'
+    image = Image.open(BytesIO(response.data))
+    assert image.size == (512, 512)
+    # プリント範囲の中央にはデザインの赤が乗る
+    r, g, b, a = image.getpixel((256, 250))
+    assert r > 150 and g < 60 and a == 255
+
+    hits = mockup_cache.stats()['hits']
+    assert client.get(url, headers=headers).data == response.data
+    assert mockup_cache.stats()['hits'] == hits + 1
+
+def test_design_mockup_config_bounds(client, auth_token, fake_services):
+    from urllib.parse import quote
+    from app import db
+    from app.models.design import Design
+
+    design = Design(user_id=1, prompt='テスト', image_url='https://example.com/b.png', s3_key='designs/1/b.png')
+    db.session.add(design)
+    db.session.commit()
+    FakeS3Client.objects['designs/1/b.png'] = make_png(256)
+
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    url = f'/api/designs/{design.id}/mockup?config='
+    for config in ({'scale': float('nan')}, {'rotation': float('inf')}, {'position': {'x': float('-inf')}}):
+        response = client.get(url + quote(json.dumps(config)), headers=headers)
+        assert response.status_code == 400, response.data
+
+    # 巨大な値は許容範囲に丸めて描画する（メモリを食い潰さない）
+    config = {'scale': 1e5, 'rotation': 1e9, 'position': {'x': 1e12, 'y': -1e12}}
+    response = client.get(url + quote(json.dumps(config)), headers=headers)
+    assert response.status_code == 200, response.data
+    assert Image.open(BytesIO(response.data)).size == (512, 512)
@@ -0,0 +1,134 @@
+# tests/test_dynamodb_writer.py
+import time
+import pytest
+from botocore.exceptions import ClientError
+from app.utils.aws import aws_clients
+from app.utils.dynamodb import DynamoDBClient
+from app.utils.dynamodb_writer import DynamoDBBatchWriter, batch_writer
+
+class FakeDynamoDB:
+    """
+    BatchWriteItem / PutItem / UpdateItem の呼び出しを記録するスタブ
+    unprocessed 回分は1件ずつ未処理で返し、errors の項目を含むバッチはそのエラーコードで失敗する
+    """
+
+    def __init__(self, unprocessed=0):
+        self.unprocessed = unprocessed
+        self.errors = {}
+        self.calls = []
+
+    def batch_write_item(self, RequestItems):
+        self.calls.append(('batch_write_item', RequestItems))
+        for requests in RequestItems.values():
+            for request in requests:
+                code = self.errors.get(request['PutRequest']['Item'].get('design_id', {}).get('S'))
+                if code:
+                    raise ClientError({'Error': {'Code': code, 'Message': code}}, 'BatchWriteItem')
+        if self.unprocessed:
+            self.unprocessed -= 1
+            table, requests = next(iter(RequestItems.items()))
+            return {'UnprocessedItems': {table: requests[:1]}}
+        return {'UnprocessedItems': {}}
+
+    def Table(self, name):
+        return self
+
+    def put_item(self, **kwargs):
+        self.calls.append(('put_item', kwargs))
+
+    def update_item(self, **kwargs):
+        self.calls.append(('update_item', kwargs))
+
+    def batch_sizes(self):
+        return [sum(len(requests) for requests in items.values()) for name, items in self.calls]
+
+@pytest.fixture
+def fake_dynamodb():
+    stub = FakeDynamoDB()
+    aws_clients.override('dynamodb', stub)
+    aws_clients.override('dynamodb', stub, kind='resource')
+    yield stub
+    aws_clients.clear_overrides()
+
+@pytest.fixture
+def writer():
+    writer = DynamoDBBatchWriter()
+    writer.enabled = True
+    writer.flush_interval = 60
+    writer.backoff = 0
+    yield writer
+    writer.close(timeout=1)
+
+def test_flush_in_batches_of_25(fake_dynamodb, writer, monkeypatch):
+    # バックグラウンドの送信と競合しないよう、送信は明示的な flush() だけにする
+    monkeypatch.setattr(writer, '_ensure_thread', lambda: None)
+    for index in range(60):
+        writer.put('DesignCache', {'design_id': str(index % 50), 'image_url': f'https://example.com/{index}.png'},
+                   (str(index % 50),))
+    # 同じキーはまとめられる（60件 → 50件）
+    writer.flush()
+    assert fake_dynamodb.batch_sizes() == [25, 25]
+    item = fake_dynamodb.calls[0][1]['DesignCache'][0]['PutRequest']['Item']
+    assert item == {'design_id': {'S': '0'}, 'image_url': {'S': 'https://example.com/50.png'}}
+    assert writer.stats()['written'] == 50
+
+def test_unprocessed_items_are_retried(fake_dynamodb, writer):
+    fake_dynamodb.unprocessed = 2
+    for index in range(3):
+        writer.put('DesignCache', {'design_id': str(index)}, (str(index),))
+    assert writer.flush() == 0
+    assert fake_dynamodb.batch_sizes() == [3, 1, 1]
+    assert writer.stats()['retries'] == 2
+
+    # 再送回数を超えた項目は破棄する
+    fake_dynamodb.calls = []
+    fake_dynamodb.unprocessed = 10
+    writer.max_retries = 2
+    writer.put('DesignCache', {'design_id': 'x'}, ('x',))
+    assert writer.flush() == 1
+    assert fake_dynamodb.batch_sizes() == [1, 1, 1]
+    assert writer.stats()['dropped'] == 1
+
+def test_non_retryable_error_drops_only_the_bad_item(fake_dynamodb, writer):
+    fake_dynamodb.errors = {'bad': 'ValidationException'}
+    for design_id in ('1', 'bad', '2'):
+        writer.put('DesignCache', {'design_id': design_id}, (design_id,))
+    writer.put('TranslationCache', {'cache_key': 'k'}, ('k',))
+
+    # 再送はせず、1件ずつ送り直して原因の項目だけを破棄する
+    assert writer.flush() == 1
+    assert fake_dynamodb.batch_sizes() == [4, 1, 1, 1, 1]
+    assert writer.stats()['written'] == 3
+    assert writer.stats()['retries'] == 0
+
+def test_throttling_is_retried(fake_dynamodb, writer):
+    fake_dynamodb.errors = {'1': 'ProvisionedThroughputExceededException'}
+    writer.max_retries = 2
+    writer.put('DesignCache', {'design_id': '1'}, ('1',))
+    assert writer.flush() == 1
+    assert fake_dynamodb.batch_sizes() == [1, 1, 1]
+
+def test_background_flush_and_close(fake_dynamodb, writer):
+    writer.flush_interval = 0.05
+    writer.put('DesignCache', {'design_id': '1'}, ('1',))
+    deadline = time.monotonic() + 2
+    while writer.pending_count() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.pending_count() == 0
+    assert fake_dynamodb.batch_sizes() == [1]
+
+    # 終了時に残りを送信する
+    writer.flush_interval = 60
+    writer.put('DesignCache', {'design_id': '2'}, ('2',))
+    writer.close(timeout=1)
+    assert fake_dynamodb.batch_sizes() == [1, 1]
+
+def test_design_requests_are_written_synchronously(app, fake_dynamodb):
+    assert batch_writer.enabled
+    client = DynamoDBClient()
+    # キャッシュはバッファし、生成リクエストは他のワーカーから読めるようすぐに書き込む
+    assert client.cache_design('1', 'https://example.com/1.png') is None
+    client.store_design_request('request-1', '1', '青い猫')
+    assert [name for name, _ in fake_dynamodb.calls] == ['put_item']
+    batch_writer.flush()
+    assert [name for name, _ in fake_dynamodb.calls] == ['put_item', 'batch_write_item']
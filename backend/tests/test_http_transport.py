@@ -0,0 +1,126 @@
+# tests/test_http_transport.py
+import io
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+from app.utils import http_transport
+from app.utils.http_transport import HttpTransport, CircuitOpenError
+
+def make_response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response.raw = io.BytesIO(b'')
+    return response
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(http_transport.time, 'sleep', lambda seconds: None)
+
+def test_retries_on_server_error(monkeypatch):
+    transport = HttpTransport('test', max_retries=3)
+    statuses = iter([503, 429, 200])
+    monkeypatch.setattr(transport.session, 'request',
+        lambda method, url, **kwargs: make_response(next(statuses)))
+
+    response = transport.post('https://example.com')
+    assert response.status_code == 200
+    assert transport.breaker.state == 'closed'
+
+def test_circuit_opens_after_repeated_failures(monkeypatch):
+    transport = HttpTransport('test', max_retries=0, failure_threshold=2, reset_timeout=60)
+    calls = []
+
+    def fail(method, url, **kwargs):
+        calls.append(url)
+        raise requests.ConnectionError('connection refused')
+
+    monkeypatch.setattr(transport.session, 'request', fail)
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            transport.post('https://example.com')
+
+    # 遮断中は外部APIを呼ばずに即座に失敗する
+    with pytest.raises(CircuitOpenError):
+        transport.post('https://example.com')
+    assert len(calls) == 2
+
+def test_post_is_not_retried_after_read_timeout(monkeypatch):
+    transport = HttpTransport('test', max_retries=3)
+    calls = []
+
+    def read_timeout(method, url, **kwargs):
+        calls.append(method)
+        raise requests.ReadTimeout('read timed out')
+
+    monkeypatch.setattr(transport.session, 'request', read_timeout)
+
+    # 送信済みのPOSTを再送すると二重に生成・課金される
+    with pytest.raises(requests.ReadTimeout):
+        transport.post('https://example.com')
+    assert len(calls) == 1
+
+    with pytest.raises(requests.ReadTimeout):
+        transport.get('https://example.com')
+    assert len(calls) == 1 + 4
+
+def test_half_open_trial_is_released_on_unexpected_error(monkeypatch):
+    transport = HttpTransport('test', max_retries=0, failure_threshold=1, reset_timeout=0)
+    transport.breaker.record_failure()
+    assert transport.breaker.state == 'open'
+
+    def invalid_url(method, url, **kwargs):
+        raise requests.exceptions.InvalidURL(url)
+
+    monkeypatch.setattr(transport.session, 'request', invalid_url)
+    with pytest.raises(requests.exceptions.InvalidURL):
+        transport.post('invalid')
+
+    # 試行枠が解放されているので次の呼び出しで回復できる
+    monkeypatch.setattr(transport.session, 'request',
+        lambda method, url, **kwargs: make_response(200))
+    assert transport.post('https://example.com').status_code == 200
+    assert transport.breaker.state == 'closed'
+
+def test_post_is_retried_only_when_not_processed(monkeypatch):
+    transport = HttpTransport('test', max_retries=3)
+    calls = []
+
+    def respond(status):
+        def request(method, url, **kwargs):
+            calls.append(status)
+            return make_response(status)
+        return request
+
+    # 500 はサーバー側で処理が進んでいる可能性があるので再送しない
+    monkeypatch.setattr(transport.session, 'request', respond(500))
+    assert transport.post('https://example.com').status_code == 500
+    assert len(calls) == 1
+
+    monkeypatch.setattr(transport.session, 'request', respond(503))
+    assert transport.post('https://example.com').status_code == 503
+    assert len(calls) == 1 + 4
+
+def test_post_is_retried_only_on_connect_errors(monkeypatch):
+    transport = HttpTransport('test', max_retries=3)
+    calls = []
+
+    def raise_error(error):
+        def request(method, url, **kwargs):
+            calls.append(method)
+            raise error
+        return request
+
+    # 送信後に切断された場合は再送しない
+    dropped = requests.ConnectionError(ProtocolError('Connection aborted.'))
+    monkeypatch.setattr(transport.session, 'request', raise_error(dropped))
+    with pytest.raises(requests.ConnectionError):
+        transport.post('https://example.com')
+    assert len(calls) == 1
+
+    refused = requests.ConnectionError(
+        MaxRetryError(None, 'https://example.com', NewConnectionError(None, 'connection refused')))
+    monkeypatch.setattr(transport.session, 'request', raise_error(refused))
+    with pytest.raises(requests.ConnectionError):
+        transport.post('https://example.com')
+    assert len(calls) == 1 + 4
@@ -0,0 +1,70 @@
+# tests/test_job_queue.py
+import time
+
+import pytest
+
+from flask import Flask
+
+from app.utils.job_queue import JobManager, JobQueueFull, SQLiteJobQueue
+
+
+def test_sqlite_queue_reclaims_stale_running_jobs(tmp_path):
+    backend = SQLiteJobQueue(str(tmp_path / 'jobs.sqlite3'), maxsize=1, poll_interval=0.01, lease_seconds=60)
+    backend.put('job-1', 'generate_design', {'prompt': 'cat'})
+    # ワーカーが確保した直後にプロセスが落ちた状態
+    assert backend.get(timeout=0)[0] == 'job-1'
+    with pytest.raises(JobQueueFull):
+        backend.put('job-2', 'generate_design', {})
+
+    # リース切れにする
+    conn = backend._connect()
+    conn.execute('UPDATE jobs SET updated_at = ?', (time.time() - 120,))
+    conn.close()
+
+    assert backend.pending_count() == 1
+    job = backend.get(timeout=0)
+    assert job == ('job-1', 'generate_design', {'prompt': 'cat'})
+    backend.complete('job-1', 'done')
+    assert backend.pending_count() == 0
+
+
+def test_sqlite_queue_prunes_finished_jobs(tmp_path):
+    backend = SQLiteJobQueue(str(tmp_path / 'jobs.sqlite3'), poll_interval=0.01, retention_seconds=3600)
+    for job_id in ('old', 'new'):
+        backend.put(job_id, 'generate_design', {})
+        backend.get(timeout=0)
+    backend.complete('old', 'done')
+
+    conn = backend._connect()
+    conn.execute("UPDATE jobs SET updated_at = ? WHERE id = 'old'", (time.time() - 7200,))
+    conn.close()
+    backend.complete('new', 'failed')
+
+    conn = backend._connect()
+    remaining = [row[0] for row in conn.execute('SELECT id FROM jobs')]
+    conn.close()
+    assert remaining == ['new']
+
+
+def test_running_job_keeps_its_lease(tmp_path):
+    app = Flask(__name__)
+    app.config.update(
+        JOB_QUEUE_BACKEND='sqlite',
+        JOB_QUEUE_SQLITE_PATH=str(tmp_path / 'jobs.sqlite3'),
+        JOB_QUEUE_LEASE_SECONDS=0.3,
+        JOB_QUEUE_WORKERS=2
+    )
+    manager = JobManager()
+    manager.init_app(app)
+    manager.backend.poll_interval = 0.01
+    runs = []
+
+    @manager.task('slow')
+    def slow(job_id, payload):
+        runs.append(job_id)
+        time.sleep(1.0)
+
+    manager.submit('slow', 'job-1', {})
+    assert manager.join(timeout=5)
+    # リース期間より長く動いても別ワーカーに再確保されない
+    assert runs == ['job-1']
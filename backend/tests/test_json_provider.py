@@ -0,0 +1,57 @@
+# tests/test_json_provider.py
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from app.utils import json_provider
+from app.utils.json_provider import OrjsonProvider
+from config import TestConfig
+
+def test_orjson_provider_is_used(app):
+    assert isinstance(app.json, OrjsonProvider)
+
+def test_datetime_and_decimal(app):
+    payload = {
+        'created_at': datetime(2025, 1, 2, 3, 4, 5),
+        'day': date(2025, 1, 2),
+        'amount': Decimal('1234.50'),
+        'name': 'Tシャツ',
+        1: 'non-str key'
+    }
+    with app.test_request_context():
+        response = jsonify(payload)
+
+    assert response.mimetype == 'application/json'
+    assert response.get_json() == {
+        'created_at': '2025-01-02T03:04:05',
+        'day': '2025-01-02',
+        'amount': '1234.50',
+        'name': 'Tシャツ',
+        '1': 'non-str key'
+    }
+    # キーの順序は Flask の既定と同じ（sort_keys）
+    assert list(json.loads(response.get_data())) == ['1', 'amount', 'created_at', 'day', 'name']
+
+def test_same_result_as_default_provider(app):
+    payload = {'orders': [{'id': i, 'items': [{'price': 3000, 'size': 'M'}], 'total': 3000.5} for i in range(3)]}
+    assert json.loads(app.json.dumps(payload)) == json.loads(DefaultJSONProvider(app).dumps(payload))
+    assert app.json.loads(app.json.dumps(payload)) == payload
+
+def test_falls_back_for_unsupported_values(app):
+    # orjson は64bitを超える整数を扱えない
+    with app.test_request_context():
+        response = jsonify({'value': 2 ** 70})
+    assert response.get_json() == {'value': 2 ** 70}
+
+def test_default_provider_without_orjson(monkeypatch):
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    app = create_app(TestConfig)
+    assert type(app.json) is DefaultJSONProvider
+
+    class DefaultConfig(TestConfig):
+        JSON_PROVIDER = 'default'
+
+    monkeypatch.undo()
+    assert type(create_app(DefaultConfig).json) is DefaultJSONProvider
@@ -0,0 +1,42 @@
+# tests/test_pagination.py
+import pytest
+from datetime import datetime
+from app import db
+from app.models.design import Design
+from app.models.user import User
+from app.utils.pagination import encode_cursor, decode_cursor, PaginationError
+
+def test_cursor_round_trip():
+    values = [datetime(2025, 1, 2, 3, 4, 5, 678000), 42]
+    assert decode_cursor(encode_cursor(values), 2) == values
+    with pytest.raises(PaginationError):
+        decode_cursor(encode_cursor(values), 3)
+    with pytest.raises(PaginationError):
+        decode_cursor('not-a-cursor', 2)
+
+def test_designs_keyset_pages(client, auth_token):
+    user = User.query.filter_by(username='user').first()
+    # 同じ作成日時のデザインが含まれていても重複・欠落しない
+    created = [datetime(2025, 1, 1), datetime(2025, 1, 2), datetime(2025, 1, 2), datetime(2025, 1, 2), datetime(2025, 1, 3)]
+    for index, created_at in enumerate(created):
+        db.session.add(Design(user_id=user.id, prompt=f'design {index}', image_url='https://example.com/a.png',
+                              s3_key='designs/a.png', created_at=created_at))
+    db.session.commit()
+    expected = [design.id for design in Design.query.order_by(Design.created_at.desc(), Design.id.desc())]
+
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    seen, cursor = [], ''
+    while True:
+        response = client.get(f'/api/designs/designs?limit=2&cursor={cursor}', headers=headers)
+        assert response.status_code == 200, response.data
+        data = response.json
+        seen += [design['id'] for design in data['designs']]
+        if not data['has_more']:
+            break
+        cursor = data['next_cursor']
+
+    assert seen == expected
+    assert data['total'] is None
+
+    response = client.get('/api/designs/designs?total=exact', headers=headers)
+    assert response.json['total'] == 5
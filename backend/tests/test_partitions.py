@@ -0,0 +1,81 @@
+# tests/test_partitions.py
+from datetime import date, datetime
+from app import db
+from app.models.order import Order
+from app.models.partitions import (
+    add_months, partition_name, is_partitioned, partition_keys, ensure_partitions, detach_partitions
+)
+from app.models.user import User
+
+class FakeConnection:
+    """PostgreSQLの代わりに実行したSQLを記録する"""
+
+    def __init__(self, partitions=()):
+        self.partitions = set(partitions)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(str(statement))
+        connection = self
+
+        class Result:
+            def scalars(self):
+                return [name for name in connection.partitions if name.startswith(f"{params['table']}_")]
+
+            def scalar(self):
+                return False
+
+        return Result()
+
+def test_month_helpers():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partition_name('orders', date(2025, 2, 1)) == 'orders_y2025m02'
+
+def test_not_partitioned_on_sqlite(app):
+    assert is_partitioned() is False
+    assert partition_keys([Order(created_at=datetime(2025, 1, 1))]) is None
+
+def test_ensure_partitions_creates_missing_months(monkeypatch):
+    from app.models import partitions
+    monkeypatch.setattr(partitions, 'datetime', type('FixedDateTime', (), {'utcnow': staticmethod(lambda: datetime(2025, 3, 15))}))
+
+    connection = FakeConnection(['orders_default', 'orders_y2025m03', 'order_items_default'])
+    created = ensure_partitions(connection, months_ahead=2, start=datetime(2025, 2, 10))
+    assert created == [
+        'orders_y2025m02', 'orders_y2025m04', 'orders_y2025m05',
+        'order_items_y2025m02', 'order_items_y2025m03', 'order_items_y2025m04', 'order_items_y2025m05',
+    ]
+    assert "CREATE TABLE orders_y2025m04 PARTITION OF orders FOR VALUES FROM ('2025-04-01') TO ('2025-05-01')" \
+        in connection.statements
+
+def test_detach_partitions():
+    connection = FakeConnection(['orders_default', 'orders_y2024m12', 'orders_y2025m01', 'orders_y2025m02'])
+    assert detach_partitions(connection, date(2025, 2, 1)) == ['orders_y2024m12', 'orders_y2025m01']
+    assert 'ALTER TABLE orders DETACH PARTITION orders_y2024m12' in connection.statements
+
+def test_admin_order_search_by_date(client, count_queries):
+    admin = User(username='admin', email='admin@test.com', is_admin=True)
+    admin.set_password('password')
+    db.session.add(admin)
+    db.session.flush()
+    for day in (1, 15, 31):
+        db.session.add(Order(user_id=admin.id, total_amount=1000, status='processing', shipping_address={},
+                             created_at=datetime(2025, 1, day, 12)))
+    db.session.add(Order(user_id=admin.id, total_amount=1000, status='processing', shipping_address={},
+                         created_at=datetime(2025, 2, 1, 0)))
+    db.session.commit()
+    token = client.post('/api/auth/login', json={'username': 'admin', 'password': 'password'}).json['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.get('/api/admin/orders/search?from=2025-01-15&to=2025-01-31&total=exact', headers=headers)
+    assert response.status_code == 200, response.data
+    assert [order['created_at'][:10] for order in response.json['orders']] == ['2025-01-31', '2025-01-15']
+    assert response.json['total'] == 2
+    assert client.get('/api/admin/orders/search?from=2025-13-01', headers=headers).status_code == 400
+
+    # 次のページの条件には先頭のキー（created_at）だけの範囲条件も含まれる（パーティションの除外用）
+    cursor = client.get('/api/admin/orders/search?limit=1', headers=headers).json['next_cursor']
+    with count_queries() as statements:
+        client.get(f'/api/admin/orders/search?limit=1&total=none&cursor={cursor}', headers=headers)
+    assert any('orders.created_at <=' in statement for statement in statements)
@@ -0,0 +1,98 @@
+# tests/test_pricing.py
+import pytest
+from app import db
+from app.api.payment import routes as payment_routes
+from app.models.order import Order, CartItem
+from app.models.pricing import PriceCatalog, PricingError, cart_totals, invalidate_prices, unit_price
+
+@pytest.fixture(autouse=True)
+def prices(app):
+    # 既定（'*', '*'）3000円に加えて、XLは3500円、XLの黒は3800円
+    db.session.add_all([
+        PriceCatalog(size='XL', color='*', unit_price=3500),
+        PriceCatalog(size='XL', color='Black', unit_price=3800),
+    ])
+    db.session.commit()
+    invalidate_prices()
+    yield
+    invalidate_prices()
+
+def test_unit_price_lookup(app, count_queries):
+    with count_queries() as statements:
+        assert unit_price('M', 'White') == 3000
+        assert unit_price('XL', 'White') == 3500
+        assert unit_price('XL', 'Black') == 3800
+    # 価格表はキャッシュから参照
+    assert len(statements) == 1
+
+    PriceCatalog.query.filter_by(size='*', color='*').delete()
+    db.session.commit()
+    assert unit_price('M', 'White') == 3000
+    invalidate_prices()
+    assert unit_price('M', 'White') is None
+
+def test_cart_totals(app, count_queries, seed_cart):
+    seed_cart(1, 3)
+    items = CartItem.query.order_by(CartItem.id).all()
+    items[1].size = 'XL'
+    items[2].size, items[2].color, items[2].quantity = 'XL', 'Black', 2
+    db.session.commit()
+
+    with count_queries() as statements:
+        totals = cart_totals(1)
+    assert len(statements) == 1
+    assert totals == {'item_count': 3, 'quantity': 4, 'subtotal': 3000 + 3500 + 3800 * 2, 'shipping': 500,
+                      'total': 3000 + 3500 + 3800 * 2 + 500}
+
+    assert cart_totals(2) == {'item_count': 0, 'quantity': 0, 'subtotal': 0, 'shipping': 0, 'total': 0}
+    assert cart_totals(1, item_ids=[items[0].id])['total'] == 3500
+
+    app.config['FREE_SHIPPING_MIN_SUBTOTAL'] = 10000
+    assert cart_totals(1)['shipping'] == 0
+
+    PriceCatalog.query.filter_by(size='*', color='*').delete()
+    db.session.commit()
+    with pytest.raises(PricingError):
+        cart_totals(1)
+
+def test_payment_and_order_use_same_totals(client, auth_token, monkeypatch, seed_cart):
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    monkeypatch.setattr(payment_routes.StripeService, 'create_payment_intent', staticmethod(
+        lambda amount: {'client_secret': 'secret', 'payment_intent_id': 'pi_1'}
+    ))
+    monkeypatch.setattr(payment_routes.StripeService, 'get_payment_intent', staticmethod(
+        lambda payment_id: {'id': payment_id, 'status': 'succeeded', 'amount': 3000 + 3500 * 3 + 500}
+    ))
+    monkeypatch.setattr(payment_routes.EmailService, 'send_order_confirmation', staticmethod(lambda **kwargs: True))
+    seed_cart(1, 2)
+    CartItem.query.filter_by(id=2).update({'size': 'XL', 'quantity': 3})
+    db.session.commit()
+
+    response = client.post('/api/payment/create-payment', headers=headers, json={})
+    assert response.status_code == 200, response.data
+    assert response.json['amount'] == 3000 + 3500 * 3 + 500
+
+    response = client.post('/api/payment/confirm-payment', headers=headers, json={
+        'payment_intent_id': 'pi_1', 'shipping_address': {'name': 'Test'}
+    })
+    assert response.status_code == 200, response.data
+    order = db.session.get(Order, response.json['order_id'])
+    assert order.total_amount == 3000 + 3500 * 3 + 500
+    assert sorted(item.price for item in order.items) == [3000, 3500]
+
+def test_add_to_cart_requires_price(client, auth_token, seed_cart):
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    seed_cart(1, 1)
+    response = client.post('/api/cart/add', headers=headers, json={
+        'design_id': 1, 'quantity': 1, 'size': 'XL', 'color': 'Black'
+    })
+    assert response.status_code == 201, response.data
+    assert response.json['cart_item']['unit_price'] == 3800
+
+    PriceCatalog.query.filter_by(size='*', color='*').delete()
+    db.session.commit()
+    invalidate_prices()
+    response = client.post('/api/cart/add', headers=headers, json={
+        'design_id': 1, 'quantity': 1, 'size': 'M', 'color': 'White'
+    })
+    assert response.status_code == 400
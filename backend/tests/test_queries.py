@@ -0,0 +1,86 @@
+# tests/test_queries.py
+import pytest
+from app import db
+from app.models.design import Design
+from app.models.order import Order, CartItem
+
+def statements_for(client, count_queries, url, token):
+    db.session.expunge_all()
+    with count_queries() as statements:
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200, response.data
+    return len(statements)
+
+@pytest.mark.parametrize('count', [1, 10])
+def test_get_cart_query_count(client, auth_token, count_queries, count, seed_cart):
+    seed_cart(1, count)
+    # ETag用のバージョン1クエリ + 本体1クエリ
+    assert statements_for(client, count_queries, '/api/cart/items', auth_token) == 2
+
+def test_get_cart_item_query_count(client, auth_token, count_queries, seed_cart):
+    seed_cart(1, 3)
+    assert statements_for(client, count_queries, '/api/cart/items/2', auth_token) == 2
+
+@pytest.mark.parametrize('count', [1, 10])
+def test_order_details_query_count(client, auth_token, admin_token, count_queries, count, seed_order):
+    order_id = seed_order(1, count)
+    assert statements_for(client, count_queries, f'/api/orders/{order_id}', auth_token) == 3  # ETag用のバージョンを含む
+    assert statements_for(client, count_queries, f'/api/admin/orders/{order_id}', admin_token) == 2
+
+@pytest.mark.parametrize('orders', [1, 5])
+def test_customer_orders_query_count(client, auth_token, count_queries, orders, seed_order):
+    for _ in range(orders):
+        seed_order(1, 3)
+    assert statements_for(client, count_queries, '/api/payment/orders', auth_token) == 2
+
+@pytest.mark.parametrize('orders', [1, 5])
+def test_customer_orders_summary_query_count(client, auth_token, count_queries, orders, seed_order):
+    for _ in range(orders):
+        seed_order(1, 3)
+    # 注文1クエリ + アイテムの集計1クエリ
+    assert statements_for(client, count_queries, '/api/payment/orders?view=summary', auth_token) == 2
+
+def test_customer_orders_summary_and_expand(client, auth_token, seed_order):
+    headers = {'Authorization': f'Bearer {auth_token}'}
+    order_id = seed_order(1, 3)
+    db.session.get(Design, 1).renditions = {'256': 'https://example.com/0_w256.webp', '128': 'https://example.com/0_w128.webp'}
+    empty_order = Order(user_id=1, total_amount=0, status='pending', shipping_address={'name': 'Test'})
+    other_order = Order(user_id=2, total_amount=0, status='pending', shipping_address={'name': 'Other'})
+    db.session.add_all([empty_order, other_order])
+    db.session.commit()
+
+    response = client.get('/api/payment/orders?view=summary', headers=headers)
+    orders = {order['id']: order for order in response.json['orders']}
+    assert 'items' not in orders[order_id]
+    assert orders[order_id]['item_count'] == 3
+    assert orders[order_id]['quantity'] == 3
+    assert orders[order_id]['thumbnail']['design_id'] == 1
+    assert orders[order_id]['thumbnail']['url'] == 'https://example.com/0_w128.webp'
+    assert orders[empty_order.id]['item_count'] == 0
+    assert orders[empty_order.id]['thumbnail'] is None
+
+    assert client.get('/api/payment/orders?view=compact', headers=headers).status_code == 400
+
+    # 展開した注文だけアイテムを取得（他のユーザーの注文は含まない）
+    response = client.get(f'/api/payment/orders/items?ids={order_id},{other_order.id}', headers=headers)
+    assert response.status_code == 200
+    assert [order['id'] for order in response.json['orders']] == [order_id]
+    items = response.json['orders'][0]['items']
+    assert [item['design']['prompt'] for item in items] == ['design 0', 'design 1', 'design 2']
+
+    assert client.get('/api/payment/orders/items?ids=a', headers=headers).status_code == 400
+
+def test_serialize_orders_matches_to_dict(app, seed_cart, seed_order):
+    from app.models.serializers import serialize_orders, serialize_cart_items
+    order_ids = [seed_order(1, 3), seed_order(1, 2)]
+    seed_cart(1, 2)
+    orders = Order.query.filter(Order.id.in_(order_ids)).order_by(Order.id).all()
+    assert serialize_orders(orders) == [order.to_dict() for order in orders]
+    assert serialize_cart_items(1) == [item.to_dict() for item in CartItem.query.filter_by(user_id=1).order_by(CartItem.id)]
+
+@pytest.mark.parametrize('orders', [1, 5])
+def test_admin_stats_query_count(client, admin_token, count_queries, orders, seed_order):
+    for _ in range(orders):
+        seed_order(1, 3)
+    # 集計 + ユーザー数 + 直近の注文 + アイテム・デザイン
+    assert statements_for(client, count_queries, '/api/admin/stats', admin_token) == 4
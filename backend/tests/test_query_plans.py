@@ -0,0 +1,31 @@
+# tests/test_query_plans.py
+import pytest
+from app import db
+from app.models.hot_queries import HOT_QUERIES, full_scans
+
+@pytest.fixture
+def seeded(app, seed_cart, seed_order):
+    from app.models.user import User
+    for i in range(1, 4):
+        user = User(username=f'user{i}', email=f'user{i}@test.com')
+        user.set_password('password')
+        db.session.add(user)
+    db.session.commit()
+    for user_id in range(1, 4):
+        seed_cart(user_id, 3)
+        for _ in range(3):
+            seed_order(user_id, 2)
+    db.session.execute(db.text("UPDATE orders SET payment_id = 'pi_' || id"))
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+@pytest.mark.parametrize('name', sorted(HOT_QUERIES))
+def test_hot_query_uses_index(seeded, name):
+    statement = HOT_QUERIES[name]()
+    assert full_scans(statement) == [], f'{name} falls back to a full table scan'
+
+def test_full_scan_is_detected(seeded):
+    from sqlalchemy import select
+    from app.models.order import OrderItem
+    # インデックスのない列での絞り込みは検出される
+    assert full_scans(select(OrderItem).where(OrderItem.color == 'White')) == ['order_items']
@@ -0,0 +1,49 @@
+# tests/test_sql_metrics.py
+import pytest
+from sqlalchemy import event
+from app import create_app, db
+from app.models.user import User
+from app.utils.sql_metrics import sql_metrics, normalize_statement, NPlusOneDetected
+from config import TestConfig
+
+def test_normalize_statement():
+    assert normalize_statement("SELECT * FROM users\n WHERE id IN (?, ?, ?) AND name = 'a'") == \
+        normalize_statement('SELECT * FROM users WHERE id IN (?) AND name = ?')
+
+def test_server_timing_and_metrics(app, client, auth_token):
+    sql_metrics.reset()
+    response = client.get('/api/designs/designs', headers={'Authorization': f'Bearer {auth_token}'})
+    assert response.status_code == 200
+    # ETag用のバージョン + 一覧
+    assert response.headers['Server-Timing'].startswith('db;desc="2 queries";dur=')
+
+    metrics = sql_metrics.snapshot()['designs.get_user_designs']
+    assert metrics['requests'] == 1
+    assert metrics['max_statements'] == 2
+    assert any(slow['statement'].startswith('SELECT designs.id') for slow in metrics['slowest'])
+
+def test_n_plus_one_is_detected(app, client):
+    for i in range(12):
+        db.session.add(User(username=f'user{i}', email=f'user{i}@test.com', password_hash='x'))
+    db.session.commit()
+
+    @app.route('/n-plus-one')
+    def n_plus_one():
+        # 1件ずつ取得する（N+1）
+        return {'users': [db.session.get(User, user_id).username for user_id in range(1, 13)]}
+
+    db.session.expunge_all()
+    with pytest.raises(NPlusOneDetected):
+        client.get('/n-plus-one')
+
+def test_disabled_has_no_hooks():
+    class DisabledConfig(TestConfig):
+        SQL_METRICS_ENABLED = False
+
+    app = create_app(DisabledConfig)
+    with app.app_context():
+        assert not event.contains(db.engine, 'before_cursor_execute', sql_metrics._before_cursor_execute)
+        db.create_all()
+        response = app.test_client().post('/api/auth/login', json={'username': 'nobody', 'password': 'x'})
+        assert 'Server-Timing' not in response.headers
+        db.drop_all()